@@ -1,21 +1,103 @@
+import io
+import uuid
+from functools import partial
+
 import streamlit as st
 import pandas as pd
 
-from data_model import EconomicState, PolicyInput
-from visual import plot_metric
+import instrumentation
+from comparison import DIVERGENCE_ATOL, DIVERGENCE_RTOL, compare_runs
+from crisis_analytics import analyze_store
+from crisis_map import MODES, crisis_boundary_map
+from data_model import EconomicState, PolicyInput, POLICY_FIELDS
+from engine_registry import BATCH, SCALAR, available_engines, engine_fingerprint, get_engine
+from ensemble_store import list_stores, open_in_root, results_root
+from policy_optimizer import DEFAULT_BOUNDS, EXOGENOUS_FIELDS, GOALS, optimize_policy
+from sim_cache import SimulationCache, shared_cache
+from session_store import SessionHistory, load_scenario, save_scenario, shared_sessions
+from sim_service import ServiceOverloaded, SimulationClient, shared_service
+from simulation import simulate
+from stop_rules import crisis_flags
+from sweep import GridSpec, sweep
+from visual import append_points, cached_figure, plot_heatmap, plot_metric, plot_overlay, plot_spaghetti
 
 # -------------------------------------------------------
 # ✅ 엔진 선택 기능
 # -------------------------------------------------------
-engine_version = st.sidebar.selectbox(
+engines = {info.name: info for info in available_engines(SCALAR)}
+engine_key = st.sidebar.selectbox(
     "엔진 버전 선택",
-    ["기본 엔진 (v1)", "상호작용 강화 엔진 (v2)"]
+    list(engines),
+    format_func=lambda name: engines[name].label,
+    key="engine",
 )
+engine_version = engines[engine_key].label
+
+# 계측은 엔진 함수를 프로세스 전체에서 교체하므로 운영자 설정(ECON_SIM_DIAGNOSTICS)으로만 켠다.
+# update_one_year를 가져오기 전에 적용
+diagnostics = instrumentation.enable_from_env()
+
+update_one_year = get_engine(engine_key).update_one_year
+# 결과 캐시 키에 엔진 구성 해시를 넣어 같은 이름으로 다른 계수 세트를 다시 등록해도 이전 결과를 쓰지 않게 한다
+engine_hash = engine_fingerprint(engine_key)
+
+
+# -------------------------------------------------------
+# ✅ 시뮬레이션 캐시 (동일 입력 재계산 방지)
+# -------------------------------------------------------
+# 크기는 운영자 설정(ECON_SIM_CACHE_ENTRIES / ECON_SIM_CACHE_MB)으로만 정한다.
+# 공유 캐시는 모든 세션이 함께 쓰므로 한 세션이 줄이거나 비우지 못하게 사이드바에서는 바꾸지 않는다
+st.sidebar.markdown("---")
+st.sidebar.header("캐시 설정")
+share_cache = st.sidebar.checkbox("세션 간 캐시 공유", value=True)
 
-if engine_version == "기본 엔진 (v1)":
-    from sim_engine import update_one_year
+if share_cache:
+    cache = shared_cache()
 else:
-    from sim_engine_v2 import update_one_year
+    if "sim_cache" not in st.session_state:
+        st.session_state.sim_cache = SimulationCache(shared_cache().max_entries, shared_cache().max_bytes)
+    cache = st.session_state.sim_cache
+st.sidebar.caption(
+    f"최대 {cache.max_entries:,}개"
+    + (f" · {cache.max_bytes / 1024 ** 2:,.0f}MB" if cache.max_bytes else "")
+    + " (운영자 설정)"
+)
+
+
+# -------------------------------------------------------
+# ✅ 시뮬레이션 서비스 (동시 세션 요청을 묶어 배치 실행)
+# -------------------------------------------------------
+use_service = st.sidebar.checkbox("세션 간 요청 묶음 실행 (동시 사용자 많을 때)", value=True)
+service_timeout = st.sidebar.number_input("요청 제한 시간 (초)", min_value=0.5, max_value=120.0, value=10.0, step=0.5)
+client = SimulationClient(shared_service(), timeout=float(service_timeout)) if use_service else None
+
+
+RESULT_CHARTS = (
+    ("gdp", "GDP 추이", "royalblue"),
+    ("inflation", "물가상승률 추이", "firebrick"),
+    ("unemployment", "실업률 추이", "forestgreen"),
+    ("growth", "경제성장률 추이", "darkorange"),
+)
+
+
+def result_figures(results: SessionHistory):
+    """
+    결과 그래프를 세션에 보관하고, 새로 추가된 연도만 기존 트레이스에 이어 붙인다.
+    (그래프 형태가 바뀌어야 하면 그 지표만 다시 그림, 초기화 시에는 reset_results가 그래프를 비움)
+    """
+    figures = st.session_state.setdefault("result_figures", {})
+    plotted = st.session_state.get("result_plotted", 0)
+    n = len(results)
+
+    # 새로 추가된 구간만 읽는다 (디스크로 내보낸 오래된 연도는 다시 그릴 때만 읽음)
+    year = results.since("year", plotted)
+    for metric, title, color in RESULT_CHARTS:
+        fig = figures.get(metric)
+        if fig is not None and (plotted == n or append_points(fig, year, results.since(metric, plotted))):
+            continue
+        figures[metric] = plot_metric(results.to_dataframe(), metric, title, color)
+    st.session_state.result_plotted = n
+    return figures
 
 
 # -------------------------------------------------------
@@ -26,18 +108,20 @@ def crisis_advisor(state: EconomicState):
     suggestions = []
 
     crisis = False
+    # 임계값은 엔진 위기 트리거(CrisisRules)와 공유
+    unemployment_crisis, inflation_crisis, growth_crisis = crisis_flags(state)
 
-    if state.unemployment > 12:
+    if unemployment_crisis:
         crisis = True
         messages.append("실업률이 매우 높습니다.")
         suggestions.append("금리 인하, 정부지출 확대, 기업투자 촉진이 필요합니다.")
 
-    if state.inflation > 6:
+    if inflation_crisis:
         crisis = True
         messages.append("물가가 과도하게 상승하고 있습니다.")
         suggestions.append("금리 인상, 환율 안정, 유가 안정 정책이 필요합니다.")
 
-    if state.growth < -1:
+    if growth_crisis:
         crisis = True
         messages.append("성장률이 급격히 하락했습니다.")
         suggestions.append("금리 인하, 정부지출 확대, 소비자 신뢰 회복 정책이 필요합니다.")
@@ -51,33 +135,32 @@ def crisis_advisor(state: EconomicState):
 # -------------------------------------------------------
 # ✅ 정책 추천 AI
 # -------------------------------------------------------
-def recommend_policy(goal: str):
-    if goal == "성장률 상승":
-        return [
-            "금리를 인하하세요.",
-            "정부지출을 확대하세요.",
-            "기업투자 지수를 높이세요.",
-            "생산성 향상 정책을 강화하세요.",
-            "글로벌 수요 개선을 위한 수출 지원 정책을 고려하세요.",
-        ]
-
-    if goal == "물가 안정":
-        return [
-            "금리를 인상하세요.",
-            "환율 안정을 위한 외환시장 개입을 고려하세요.",
-            "전기요금 및 에너지 가격을 안정시키세요.",
-            "정부지출을 과도하게 늘리지 마세요.",
-        ]
-
-    if goal == "실업률 감소":
-        return [
-            "금리를 인하하세요.",
-            "기업투자 지수를 높이세요.",
-            "정부지출을 확대해 고용을 창출하세요.",
-            "소비자 신뢰 회복 정책을 시행하세요.",
-        ]
-
-    return ["목표를 선택해주세요."]
+POLICY_LABELS = {
+    "interest_rate": "기준금리 (%)",
+    "corporate_tax": "법인세율 (%)",
+    "electricity_cost": "공업용 전기요금 (원/kWh)",
+    "exchange_rate": "원-달러 환율",
+    "government_spending_ratio": "정부지출 비율 (GDP 대비 %)",
+    "consumer_confidence": "소비자 신뢰지수",
+    "corporate_investment": "기업 투자지수",
+    "global_demand": "글로벌 수요",
+    "oil_price": "유가 (달러/배럴)",
+    "productivity": "생산성 지수",
+}
+
+
+def recommend_policy(goal: str, state: EconomicState, policy: PolicyInput, mode: str,
+                     engine: str, years: int, fix_exogenous: bool = True):
+    """
+    엔진으로 후보 정책 집단을 평가해 목표를 가장 잘 달성하는 정책 값을 찾는다.
+    fix_exogenous=True이면 환율·유가 등 외생 변수는 현재 입력값으로 고정.
+    """
+    bounds = {
+        name: bound
+        for name, bound in DEFAULT_BOUNDS.items()
+        if not (fix_exogenous and name in EXOGENOUS_FIELDS)
+    }
+    return optimize_policy(state, policy, goal, mode, years=years, engine=engine, bounds=bounds)
 
 
 # -------------------------------------------------------
@@ -90,8 +173,24 @@ if "current_state" not in st.session_state:
         unemployment=14.5,
         growth=2.5,
     )
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 if "results" not in st.session_state:
-    st.session_state.results = []
+    # 연도별 결과·정책을 열 배열로 누적 (최근 연도만 메모리에, 오래된 연도는 세션 파일로)
+    st.session_state.results = shared_sessions().open(st.session_state.session_id)
+if "initial_state" not in st.session_state:
+    st.session_state.initial_state = st.session_state.current_state
+
+# 이 세션을 사용 중으로 표시하고, 오래 쓰지 않은 다른 세션의 기록은 디스크로 내보낸다
+shared_sessions().touch(st.session_state.session_id)
+shared_sessions().evict_idle()
+
+
+def reset_results():
+    st.session_state.results.clear()
+    st.session_state.initial_state = st.session_state.current_state
+    st.session_state.pop("result_figures", None)
+    st.session_state.result_plotted = 0
 
 
 # -------------------------------------------------------
@@ -117,7 +216,7 @@ if st.sidebar.button("초기값 적용"):
         unemployment=unemployment_init,
         growth=growth_init,
     )
-    st.session_state.results.clear()
+    reset_results()
 
 st.sidebar.markdown("---")
 
@@ -128,6 +227,7 @@ st.sidebar.markdown("---")
 mode = st.sidebar.selectbox(
     "경제 모델 모드 선택",
     ["안정형", "현실형", "위기형"],
+    key="mode",
 )
 
 st.sidebar.markdown("---")
@@ -171,14 +271,42 @@ policy = PolicyInput(
 # -------------------------------------------------------
 # ✅ 시뮬레이션 실행 / 초기화 버튼
 # -------------------------------------------------------
-col1, col2 = st.columns(2)
+col1, col2, col3 = st.columns(3)
 with col1:
     if st.button("1년 시뮬레이션 진행"):
-        next_state = update_one_year(st.session_state.current_state, policy, mode)
-        st.session_state.results.append(next_state.to_series(len(st.session_state.results) + 1))
-        st.session_state.current_state = next_state
+        state = st.session_state.current_state
+        try:
+            next_state = cache.get_or_compute(
+                ("update_one_year", engine_key, engine_hash, mode, state, policy),
+                lambda: client.step(state, policy, mode, engine_key) if client else update_one_year(state, policy, mode),
+            )
+        except (TimeoutError, ServiceOverloaded) as e:
+            st.error(f"시뮬레이션 서비스가 혼잡합니다: {e}")
+        else:
+            st.session_state.results.append(next_state, policy=policy)
+            st.session_state.current_state = next_state
 
 with col2:
+    horizon = st.number_input("시뮬레이션 기간 (년)", min_value=1, max_value=500, value=10, step=1)
+    if st.button(f"{int(horizon)}년 시뮬레이션 진행"):
+        state = st.session_state.current_state
+        start_year = len(st.session_state.results) + 1
+        try:
+            run = cache.get_or_compute(
+                ("simulate", engine_key, engine_hash, mode, state, policy, int(horizon), start_year),
+                lambda: (
+                    client.simulate(state, policy, mode, int(horizon), engine_key, start_year)
+                    if client
+                    else simulate(state, policy, mode, int(horizon), engine=engine_key, start_year=start_year)
+                ),
+            )
+        except (TimeoutError, ServiceOverloaded) as e:
+            st.error(f"시뮬레이션 서비스가 혼잡합니다: {e}")
+        else:
+            st.session_state.results.extend(run.year, run.gdp, run.inflation, run.unemployment, run.growth, policy=policy)
+            st.session_state.current_state = run.final_state
+
+with col3:
     if st.button("전체 초기화"):
         st.session_state.current_state = EconomicState(
             gdp=gdp_init,
@@ -186,7 +314,7 @@ with col2:
             unemployment=unemployment_init,
             growth=growth_init,
         )
-        st.session_state.results.clear()
+        reset_results()
 
 
 # -------------------------------------------------------
@@ -195,24 +323,24 @@ with col2:
 st.header("시뮬레이션 결과 (연 단위)")
 st.info(f"현재 사용 중인 엔진: {engine_version}")
 
-if st.session_state.results:
-    df = pd.DataFrame(st.session_state.results)
+results = st.session_state.results
+if len(results):
+    # 버퍼의 열 배열을 복사 없이 감싼 DataFrame
+    df = results.to_dataframe()
     st.dataframe(df.set_index("year"), use_container_width=True)
 
-    st.subheader("GDP 추이")
-    st.plotly_chart(plot_metric(df, "gdp", "GDP 추이", "royalblue"), use_container_width=True)
-
-    st.subheader("물가상승률 추이")
-    st.plotly_chart(plot_metric(df, "inflation", "물가상승률 추이", "firebrick"), use_container_width=True)
-
-    st.subheader("실업률 추이")
-    st.plotly_chart(plot_metric(df, "unemployment", "실업률 추이", "forestgreen"), use_container_width=True)
-
-    st.subheader("경제성장률 추이")
-    st.plotly_chart(plot_metric(df, "growth", "경제성장률 추이", "darkorange"), use_container_width=True)
-
-    csv = df.to_csv(index=False).encode("utf-8")
-    st.download_button("CSV 다운로드", data=csv, file_name="simulation_results.csv", mime="text/csv")
+    figures = result_figures(results)
+    for metric, title, _ in RESULT_CHARTS:
+        st.subheader(title)
+        st.plotly_chart(figures[metric], use_container_width=True)
+
+    # CSV는 다운로드 버튼을 눌렀을 때만 만든다
+    st.download_button(
+        "CSV 다운로드",
+        data=lambda: results.to_dataframe().to_csv(index=False).encode("utf-8"),
+        file_name="simulation_results.csv",
+        mime="text/csv",
+    )
 
     # ---------------------------------------------------
     # ✅ 위기 감지 AI
@@ -231,13 +359,405 @@ if st.session_state.results:
     st.markdown("---")
     st.subheader("🎯 정책 추천 AI")
 
-    goal = st.selectbox("정책 목표를 선택하세요:", ["성장률 상승", "물가 안정", "실업률 감소"])
+    goal = st.selectbox("정책 목표를 선택하세요:", list(GOALS))
+    goal_years = st.number_input("평가 기간 (년)", min_value=1, max_value=50, value=5, step=1)
+    fix_exogenous = st.checkbox("외생 변수(환율·유가·글로벌 수요 등)는 현재 값으로 고정", value=True)
 
     if st.button("정책 추천 받기"):
-        recs = recommend_policy(goal)
+        rec = recommend_policy(
+            goal, st.session_state.current_state, policy, mode, engine_key, int(goal_years), fix_exogenous
+        )
         st.write("### ✅ 추천 정책")
-        for r in recs:
-            st.write("- " + r)
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "현재 값": [getattr(policy, name) for name in POLICY_FIELDS],
+                    "추천 값": [getattr(rec.policy, name) for name in POLICY_FIELDS],
+                },
+                index=[POLICY_LABELS[name] for name in POLICY_FIELDS],
+            ),
+            use_container_width=True,
+        )
+        st.caption(f"후보 {rec.evaluations}개 평가 · {rec.generations}세대 · {rec.elapsed:.2f}초")
+
+        st.write(f"### 추천 정책 적용 시 {int(goal_years)}년 예상 경로")
+        st.dataframe(rec.trajectory.to_dataframe().set_index("year"), use_container_width=True)
 
 else:
-    st.write("아직 시뮬레이션이 실행되지 않았습니다.")
\ No newline at end of file
+    st.write("아직 시뮬레이션이 실행되지 않았습니다.")
+
+
+# -------------------------------------------------------
+# ✅ 엔진·모드 비교 (조합 전부를 한 번의 배치 실행으로)
+# -------------------------------------------------------
+st.markdown("---")
+st.subheader("⚖️ 엔진·모드 비교")
+
+with st.expander("현재 상태와 정책으로 여러 엔진·모드를 한 번에 실행해 겹쳐 보기"):
+    batch_engines = {info.name: info for info in available_engines(BATCH)}
+    cc1, cc2, cc3 = st.columns(3)
+    with cc1:
+        compare_engines = st.multiselect(
+            "엔진", list(batch_engines), default=list(batch_engines),
+            format_func=lambda name: batch_engines[name].label, key="compare_engines",
+        )
+    with cc2:
+        compare_modes = st.multiselect("모드", list(MODES), default=list(MODES), key="compare_modes")
+    with cc3:
+        compare_years = st.number_input("기간 (년)", min_value=1, max_value=500, value=30, step=1, key="compare_years")
+
+    if st.button("비교 실행"):
+        if not compare_engines or not compare_modes:
+            st.warning("엔진과 모드를 하나 이상 선택하세요.")
+        else:
+            st.session_state.compare_request = (
+                tuple(compare_engines),
+                tuple(compare_modes),
+                st.session_state.current_state,
+                policy,
+                int(compare_years),
+            )
+
+    if "compare_request" in st.session_state:
+        c_engines, c_modes, c_state, c_policy, c_years = st.session_state.compare_request
+        comparison = cache.get_or_compute(
+            ("compare", c_engines, tuple(engine_fingerprint(e) for e in c_engines), c_modes, c_state, c_policy, c_years),
+            lambda: compare_runs(c_state, c_policy, c_years, engines=c_engines, modes=c_modes),
+        )
+        labels = {combo: f"{combo[0]} · {combo[1]}" for combo in comparison.combos}
+        baseline = st.selectbox("기준 조합", list(comparison.combos), format_func=labels.get, key="compare_baseline")
+        divergence = comparison.divergence_years(baseline)
+        st.caption(
+            f"{len(comparison.combos)}개 조합 × {c_years}년 · 분기 연도: 기준과의 차이가 처음으로 "
+            f"{DIVERGENCE_ATOL:g} + {DIVERGENCE_RTOL:.0%} × |기준 값|을 넘는 해"
+        )
+
+        for metric, title, _ in RESULT_CHARTS:
+            marks = {labels[combo]: year for combo, year in divergence[metric].items() if year >= 0}
+            st.plotly_chart(
+                cached_figure(
+                    plot_overlay,
+                    comparison.year,
+                    {labels[combo]: comparison.series(metric, combo) for combo in comparison.combos},
+                    title=title,
+                    y_title=metric,
+                    markers=marks,
+                ),
+                use_container_width=True,
+            )
+
+        st.write("#### 기준 대비 분기 연도 (-1: 기간 내 분기 없음)")
+        st.dataframe(divergence, use_container_width=True)
+        st.write(f"#### {int(comparison.year[-1])}년 기준 대비 차이")
+        st.dataframe(comparison.differences(baseline).iloc[-1].unstack(0), use_container_width=True)
+        st.download_button(
+            "비교 결과 CSV 다운로드",
+            data=lambda: comparison.to_frame().to_csv().encode("utf-8"),
+            file_name="comparison.csv",
+            mime="text/csv",
+        )
+
+
+# -------------------------------------------------------
+# ✅ 2차원 정책 스윕 (히트맵)
+# -------------------------------------------------------
+METRIC_LABELS = {
+    "gdp": "GDP",
+    "inflation": "물가상승률",
+    "unemployment": "실업률",
+    "growth": "경제성장률",
+}
+
+st.markdown("---")
+st.subheader("🗺️ 2차원 정책 스윕")
+
+with st.expander("두 정책 변수를 바꿔 가며 N년 후 지표를 히트맵으로 보기"):
+    sx, sy = st.columns(2)
+    with sx:
+        x_field = st.selectbox("X축 변수", POLICY_FIELDS, index=0, format_func=POLICY_LABELS.get)
+        x_lo, x_hi = DEFAULT_BOUNDS[x_field]
+        x_range = st.slider("X축 범위", float(x_lo), float(x_hi), (float(x_lo), float(x_hi)))
+    with sy:
+        y_field = st.selectbox("Y축 변수", POLICY_FIELDS, index=4, format_func=POLICY_LABELS.get)
+        y_lo, y_hi = DEFAULT_BOUNDS[y_field]
+        y_range = st.slider("Y축 범위", float(y_lo), float(y_hi), (float(y_lo), float(y_hi)))
+
+    sweep_metric = st.selectbox("지표", list(METRIC_LABELS), index=3, format_func=METRIC_LABELS.get)
+    sweep_years = st.number_input("기간 (년)", min_value=1, max_value=200, value=10, step=1, key="sweep_years")
+    resolution = st.slider("격자 해상도", 10, 500, 100, 10)
+
+    if st.button("스윕 실행"):
+        if x_field == y_field:
+            st.warning("X축과 Y축에 서로 다른 변수를 선택하세요.")
+        else:
+            st.session_state.sweep_request = (
+                GridSpec(x_field, *x_range, resolution, y_field, *y_range, resolution),
+                int(sweep_years),
+            )
+
+    if "sweep_request" in st.session_state:
+        grid, years = st.session_state.sweep_request
+        # 같은 조건이면 캐시된 결과를 재사용하므로 재실행 비용이 거의 없음
+        result = sweep(st.session_state.current_state, policy, mode, years, grid, engine=engine_key)
+        st.plotly_chart(
+            plot_heatmap(
+                result.x_values,
+                result.y_values,
+                result.values[sweep_metric],
+                title=f"{years}년 후 {METRIC_LABELS[sweep_metric]}",
+                x_title=POLICY_LABELS[grid.x_field],
+                y_title=POLICY_LABELS[grid.y_field],
+                colorbar_title=sweep_metric,
+            ),
+            use_container_width=True,
+        )
+
+
+# -------------------------------------------------------
+# ✅ 위기 악순환 경계 지도 (적응형 해상도)
+# -------------------------------------------------------
+st.markdown("---")
+st.subheader("🧭 위기 악순환 경계 지도")
+
+with st.expander("두 정책 변수 공간에서 모드별로 위기 악순환에 빠지는 영역 찾기"):
+    bx, by = st.columns(2)
+    with bx:
+        map_x = st.selectbox("X축 변수", POLICY_FIELDS, index=0, format_func=POLICY_LABELS.get, key="map_x")
+        mx_lo, mx_hi = DEFAULT_BOUNDS[map_x]
+        map_x_range = st.slider("X축 범위", float(mx_lo), float(mx_hi), (float(mx_lo), float(mx_hi)), key="map_x_range")
+    with by:
+        map_y = st.selectbox("Y축 변수", POLICY_FIELDS, index=4, format_func=POLICY_LABELS.get, key="map_y")
+        my_lo, my_hi = DEFAULT_BOUNDS[map_y]
+        map_y_range = st.slider("Y축 범위", float(my_lo), float(my_hi), (float(my_lo), float(my_hi)), key="map_y_range")
+
+    map_modes = st.multiselect("모드", list(MODES), default=list(MODES), key="map_modes")
+    mc1, mc2, mc3 = st.columns(3)
+    with mc1:
+        map_years = st.number_input("기간 (년)", min_value=1, max_value=200, value=20, step=1, key="map_years")
+    with mc2:
+        map_persist = st.number_input("연속 위기 햇수 (악순환 기준)", min_value=1, max_value=50, value=5, step=1,
+                                      key="map_persist")
+    with mc3:
+        map_depth = st.slider("최대 해상도 (2^n)", 5, 10, 9, key="map_depth")
+
+    if st.button("경계 지도 계산"):
+        if map_x == map_y:
+            st.warning("X축과 Y축에 서로 다른 변수를 선택하세요.")
+        elif not map_modes:
+            st.warning("모드를 하나 이상 선택하세요.")
+        else:
+            st.session_state.crisis_map_request = (
+                (map_x, map_y),
+                {map_x: map_x_range, map_y: map_y_range},
+                tuple(map_modes),
+                int(map_years),
+                int(map_persist),
+                int(map_depth),
+            )
+
+    if "crisis_map_request" in st.session_state:
+        map_fields, map_bounds, modes_sel, years, persist, depth = st.session_state.crisis_map_request
+        boundary_map = crisis_boundary_map(
+            st.session_state.current_state, policy, map_fields, map_bounds,
+            modes=modes_sel, years=years, persist=persist, engine=engine_key, max_depth=depth,
+        )
+        st.caption(
+            f"엔진 평가 {boundary_map.evaluations:,}회 "
+            f"(같은 해상도 균일 격자 {boundary_map.uniform_evaluations:,}회의 "
+            f"{boundary_map.evaluations / boundary_map.uniform_evaluations:.1%})"
+        )
+        # 화면 표시는 최대 256×256으로 줄여서 그림
+        xs, ys = boundary_map.axis_values(min(depth, 8))
+        for tab, name in zip(st.tabs(list(modes_sel)), modes_sel):
+            with tab:
+                st.plotly_chart(
+                    plot_heatmap(
+                        xs,
+                        ys,
+                        boundary_map.to_grid(name, min(depth, 8)),
+                        title=f"{name}: 악순환 영역 {boundary_map.crisis_share(name):.1%} (1 = 악순환, 0.5 = 경계)",
+                        x_title=POLICY_LABELS[map_fields[0]],
+                        y_title=POLICY_LABELS[map_fields[1]],
+                        colorbar_title="악순환",
+                        colorscale="RdBu_r",
+                    ),
+                    use_container_width=True,
+                )
+
+
+# -------------------------------------------------------
+# ✅ 저장된 앙상블 보기 (batch_runner / ensemble_store 결과)
+# -------------------------------------------------------
+st.markdown("---")
+st.subheader("🗄️ 저장된 앙상블")
+
+with st.expander("디스크에 저장된 대규모 시나리오 결과를 필요한 부분만 읽어 보기"):
+    # 서버의 결과 디렉터리(ECON_SIM_RESULTS_DIR) 아래 저장소만 고를 수 있다
+    store_names = list_stores()
+    st.caption(f"결과 디렉터리: {results_root()}")
+    store_path = st.selectbox("저장소", [""] + store_names, format_func=lambda name: name or "(선택 안 함)")
+    if store_path:
+        try:
+            store = open_in_root(store_path)
+        except (FileNotFoundError, ValueError) as exc:
+            st.warning(str(exc))
+            store = None
+
+        if store is not None and len(store):
+            st.caption(
+                f"시나리오 {len(store):,}개 · {store.n_years}년 · 청크 {len(store.chunks)}개 · "
+                f"약 {store.nbytes / 1024 ** 2:,.0f}MB"
+            )
+            store_metric = st.selectbox("지표", list(METRIC_LABELS), index=3, format_func=METRIC_LABELS.get, key="store_metric")
+            paths_cap = st.slider("표시할 최대 경로 수", 10, 1000, 200, 10)
+            idx, paths = store.sample_paths(store_metric, paths_cap)
+            st.plotly_chart(
+                cached_figure(
+                    plot_spaghetti,
+                    store.year,
+                    paths,
+                    title=f"{METRIC_LABELS[store_metric]} 경로 (전체 {len(store):,}개 중 {len(idx):,}개)",
+                    y_title=store_metric,
+                    cache=cache,
+                ),
+                use_container_width=True,
+            )
+
+            scenario_index = st.number_input("시나리오 번호", min_value=0, max_value=len(store) - 1, value=0, step=1)
+            st.dataframe(store.scenario_frame(int(scenario_index)).set_index("year"), use_container_width=True)
+
+            if st.button("위기 분석 실행"):
+                analysis = analyze_store(store)
+                summary = analysis.summary()["any"]
+                st.write(
+                    f"위기 경험 비율 {summary['ever']:.1%} · 평균 지속 {summary['mean_duration']:.1f}년 · "
+                    f"회복률 {summary['recovery_rate']:.1%}"
+                )
+                st.line_chart(analysis.probability_frame().set_index("year"))
+        elif store is not None:
+            st.write("저장소가 비어 있습니다.")
+
+
+# -------------------------------------------------------
+# ✅ 엔진 진단
+# -------------------------------------------------------
+STAGE_LABELS = {
+    "params": "파라미터 준비·반환",
+    "potential": "잠재성장률",
+    "deviations": "중립값 대비 편차",
+    "expectation": "기대 인플레이션",
+    "consumption": "소비 지수 (C)",
+    "investment": "투자 지수 (I)",
+    "growth": "성장률",
+    "inflation": "물가",
+    "unemployment": "실업률",
+    "feedback": "피드백",
+    "crisis": "위기 트리거",
+    "final": "최종값·변동폭 제한",
+}
+
+if diagnostics:
+    st.markdown("---")
+    st.subheader("🩺 엔진 진단")
+    profile = instrumentation.report().get(engine_key)
+    if profile is None or profile.calls == 0:
+        st.write("아직 계측된 엔진 호출이 없습니다. (캐시에서 가져온 결과는 집계되지 않습니다)")
+    else:
+        st.caption(f"{engine_version} · 호출 {profile.calls:,}회 (서버 프로세스 전체 누적)")
+        stages = pd.DataFrame(profile.stage_table())
+        stages["stage"] = stages["stage"].map(lambda name: STAGE_LABELS.get(name, name))
+        stages["ms"] = stages.pop("seconds") * 1000
+        d1, d2 = st.columns(2)
+        with d1:
+            st.write("단계별 누적 시간")
+            st.dataframe(stages.set_index("stage"), use_container_width=True)
+        with d2:
+            st.write("위기 트리거 발동")
+            st.dataframe(pd.DataFrame(profile.branch_table()).set_index("trigger"), use_container_width=True)
+            st.write("변동폭 제한 포화 (하한/상한)")
+            st.dataframe(pd.DataFrame(profile.clamp_table()).set_index("clamp"), use_container_width=True)
+    if st.button("진단 집계 초기화"):
+        instrumentation.reset()
+        st.rerun()
+
+
+# -------------------------------------------------------
+# ✅ 시나리오 저장 / 불러오기
+# -------------------------------------------------------
+def restore_scenario():
+    """
+    업로드한 시나리오 파일로 세션을 되돌린다 (위젯 값을 바꾸므로 버튼 콜백에서 실행).
+    """
+    uploaded = st.session_state.get("scenario_upload")
+    if uploaded is None:
+        st.session_state.scenario_message = ("warning", "불러올 시나리오 파일(.npz)을 먼저 선택하세요.")
+        return
+    try:
+        uploaded.seek(0)
+        scenario = load_scenario(uploaded)
+    except (OSError, ValueError, KeyError) as e:
+        st.session_state.scenario_message = ("error", f"시나리오를 불러오지 못했습니다: {e}")
+        return
+    if scenario.engine in engines:
+        st.session_state.engine = scenario.engine
+    st.session_state.mode = scenario.mode
+    st.session_state.results = scenario.to_history(shared_sessions(), st.session_state.session_id)
+    st.session_state.initial_state = scenario.initial_state
+    st.session_state.current_state = scenario.final_state
+    st.session_state.init_gdp = scenario.initial_state.gdp
+    st.session_state.init_inflation = scenario.initial_state.inflation
+    st.session_state.init_unemployment = scenario.initial_state.unemployment
+    st.session_state.init_growth = scenario.initial_state.growth
+    st.session_state.pop("result_figures", None)
+    st.session_state.result_plotted = 0
+    st.session_state.scenario_message = ("success", f"{len(scenario)}년 시나리오를 불러왔습니다: {uploaded.name}")
+
+
+def scenario_file(initial_state, engine, mode, history) -> bytes:
+    """
+    현재 시나리오를 .npz 바이트로 (다운로드 버튼을 누를 때 생성).
+    """
+    buffer = io.BytesIO()
+    save_scenario(buffer, initial_state, engine, mode, history)
+    return buffer.getvalue()
+
+
+# 시나리오 파일은 서버 디스크가 아니라 사용자 브라우저로 내려받고 올린다
+st.sidebar.markdown("---")
+st.sidebar.header("시나리오 저장 / 불러오기")
+st.sidebar.download_button(
+    "시나리오 저장 (.npz)",
+    data=partial(scenario_file, st.session_state.initial_state, engine_key, mode, st.session_state.results),
+    file_name="scenario.npz",
+    mime="application/octet-stream",
+    on_click="ignore",
+)
+st.sidebar.file_uploader("시나리오 파일 (.npz)", type=["npz"], key="scenario_upload")
+st.sidebar.button("불러오기", on_click=restore_scenario)
+if "scenario_message" in st.session_state:
+    kind, message = st.session_state.pop("scenario_message")
+    getattr(st.sidebar, kind)(message)
+
+
+# -------------------------------------------------------
+# ✅ 캐시 통계
+# -------------------------------------------------------
+cache_stats = cache.stats()
+st.sidebar.caption(
+    f"캐시 적중 {cache_stats.hits} · 미스 {cache_stats.misses} · 적중률 {cache_stats.hit_rate:.0%} · "
+    f"항목 {cache_stats.entries} · 제거 {cache_stats.evictions} · 약 {cache_stats.bytes / 1024:.0f}KB"
+)
+if client:
+    service_stats = client.service.stats()
+    st.sidebar.caption(
+        f"서비스 대기열 {service_stats.queue_depth} (최대 {service_stats.max_queue_depth}) · "
+        f"평균 배치 {service_stats.mean_batch_size:.1f}건 · "
+        f"지연 p50 {service_stats.latency_p50_ms:.1f}ms / p99 {service_stats.latency_p99_ms:.1f}ms · "
+        f"시간 초과 {service_stats.timed_out} · 거부 {service_stats.rejected}"
+    )
+session_stats = shared_sessions().stats()
+st.sidebar.caption(
+    f"세션 기록 {session_stats.sessions}개 · 메모리 {session_stats.resident_years}년 "
+    f"(약 {session_stats.resident_bytes / 1024:.0f}KB) · 디스크 {session_stats.spilled_years}년 · "
+    f"유휴 정리 {session_stats.evictions}회"
+)
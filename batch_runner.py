@@ -0,0 +1,411 @@
+"""
+시나리오 파일을 읽어 배치 엔진으로 실행하고 궤적을 파일로 내보내는 명령행 실행기.
+
+사용법:
+    python batch_runner.py scenarios.csv -o results.parquet [--chunk-size 10000] [--workers 4]
+
+입력 (CSV / JSONL / Parquet, 한 행 = 한 시나리오):
+    scenario_id                         (없으면 입력 순서 번호)
+    engine, mode, years                 (없으면 --engine / --mode / --years)
+    gdp, inflation, unemployment, growth  초기 상태 (없으면 기본 초기값)
+    interest_rate, ..., productivity    정책 (없으면 기본 정책)
+      - 숫자: 전 기간 동일
+      - 연도별 값: JSONL/Parquet는 리스트, CSV는 "1.5;1.5;2.0" 처럼 ';'로 구분.
+        기간보다 짧으면 마지막 값을 유지한다.
+
+출력 (CSV / Parquet, 한 행 = 시나리오 × 연도):
+    scenario_id, engine, mode, year, gdp, inflation, unemployment, growth
+출력 경로에 확장자가 없거나 --output-format store이면 ensemble_store 저장소(디렉터리)에 쓴다.
+(저장소는 연도 축이 하나이므로 모든 시나리오의 기간이 같아야 함)
+
+입력은 chunk_size 행씩 읽고, 동시에 처리 중인 청크 수를 제한해
+입력 파일 크기와 관계없이 메모리 사용량이 일정하다. 출력 순서는 입력 순서와 같다.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator
+
+import numpy as np
+
+from data_model import EconomicState, PolicyInput, StateBatch, PolicyBatch, POLICY_FIELDS, STATE_FIELDS
+from simulation import TRAJECTORY_COLUMNS, simulate_batch
+
+
+DEFAULT_STATE = EconomicState(gdp=10_000_000.0, inflation=1.2, unemployment=14.5, growth=2.5)
+DEFAULT_POLICY = PolicyInput(
+    interest_rate=1.5,
+    corporate_tax=25.0,
+    electricity_cost=100.0,
+    exchange_rate=1200.0,
+    government_spending_ratio=20.0,
+    consumer_confidence=100,
+    corporate_investment=100,
+    global_demand=100,
+    oil_price=70.0,
+    productivity=100,
+)
+
+OUTPUT_COLUMNS = ("scenario_id", "engine", "mode") + TRAJECTORY_COLUMNS
+
+# CSV에서 연도별 정책 값 구분자
+SCHEDULE_SEPARATOR = ";"
+
+
+# -------------------------------------------------------
+# 입력 (청크 단위 스트리밍)
+# -------------------------------------------------------
+def _pyarrow():
+    """Parquet 입출력용 pyarrow를 가져온다 (없으면 설치 안내와 함께 ImportError)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError(
+            "Parquet 입출력에는 pyarrow가 필요합니다: pip install pyarrow (또는 CSV / JSONL 사용)"
+        ) from exc
+    return pa, pq
+
+
+def _input_format(path: str, fmt: str = None) -> str:
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    return "csv"
+
+
+def read_scenarios(path: str, chunk_size: int = 10_000, fmt: str = None) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    시나리오 파일을 chunk_size 행씩 읽어 {열 이름: 배열} dict로 돌려준다.
+    """
+    fmt = _input_format(path, fmt)
+    if fmt == "parquet":
+        _, pq = _pyarrow()
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield {name: batch.column(name).to_numpy(zero_copy_only=False) for name in batch.schema.names}
+        return
+
+    import pandas as pd
+
+    if fmt == "jsonl":
+        reader = pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False, precise_float=True)
+    elif fmt == "csv":
+        reader = pd.read_csv(path, chunksize=chunk_size, float_precision="round_trip")
+    else:
+        raise ValueError(f"지원하지 않는 입력 형식: {fmt!r} (csv / jsonl / parquet)")
+
+    with reader:
+        for frame in reader:
+            yield {name: frame[name].to_numpy() for name in frame.columns}
+
+
+# -------------------------------------------------------
+# 청크 실행
+# -------------------------------------------------------
+def _text_column(chunk, name: str, default: str, n: int) -> np.ndarray:
+    if name not in chunk:
+        return np.full(n, default, dtype=object)
+    col = chunk[name].astype(object)
+    missing = np.array([v is None or v != v for v in col], dtype=bool)
+    col[missing] = default
+    return col.astype(str)
+
+
+def _numeric_column(col, default: float) -> np.ndarray:
+    col = np.asarray(col, dtype=np.float64)
+    return np.where(np.isnan(col), default, col)
+
+
+def _state_column(chunk, name: str, n: int) -> np.ndarray:
+    if name not in chunk:
+        return np.full(n, getattr(DEFAULT_STATE, name))
+    return _numeric_column(chunk[name], getattr(DEFAULT_STATE, name))
+
+
+def _schedule_value(value, years: int, field: str) -> np.ndarray:
+    """
+    한 시나리오의 정책 값(숫자 / 리스트 / "a;b;c")을 길이 years 배열로 변환 (빈 값은 기본 정책).
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        value = getattr(DEFAULT_POLICY, field)
+    if isinstance(value, str):
+        value = [float(v) for v in value.split(SCHEDULE_SEPARATOR) if v.strip()]
+    values = np.atleast_1d(np.asarray(value, dtype=np.float64))
+    if len(values) == 0:
+        raise ValueError(f"{field}: 빈 정책 스케줄")
+    if len(values) > years:
+        raise ValueError(f"{field}: 정책 스케줄 길이({len(values)})가 시뮬레이션 기간({years}년)보다 깁니다.")
+    out = np.empty(years)
+    out[: len(values)] = values
+    out[len(values):] = values[-1]
+    return out
+
+
+def _policy_schedule(chunk, idx: np.ndarray, years: int) -> list:
+    """
+    시나리오 idx의 연도별 PolicyBatch 리스트 (숫자 열은 전 기간 같은 배열을 공유).
+    """
+    constant, per_year = {}, {}
+    for name in POLICY_FIELDS:
+        if name not in chunk:
+            constant[name] = np.full(len(idx), getattr(DEFAULT_POLICY, name))
+            continue
+        col = chunk[name][idx]
+        if col.dtype != object:
+            constant[name] = _numeric_column(col, getattr(DEFAULT_POLICY, name))
+            continue
+        table = np.empty((years, len(idx)))
+        for j, value in enumerate(col):
+            table[:, j] = _schedule_value(value, years, name)
+        per_year[name] = table
+
+    if not per_year:
+        return [PolicyBatch(**constant)] * years
+    return [
+        PolicyBatch(**constant, **{name: table[t] for name, table in per_year.items()})
+        for t in range(years)
+    ]
+
+
+def run_chunk(chunk: Dict[str, np.ndarray], default_engine: str = "v1", default_mode: str = "현실형",
+              default_years: int = 10, id_offset: int = 0) -> Dict[str, np.ndarray]:
+    """
+    시나리오 청크 하나를 실행해 출력 열 dict를 반환 (행 = 시나리오 × 연도, 입력 순서 유지).
+    같은 (엔진, 기간) 시나리오끼리 묶어 배치로 실행하고, 모드는 시나리오별 배열로 넘긴다.
+    """
+    n = len(next(iter(chunk.values()))) if chunk else 0
+    engines = _text_column(chunk, "engine", default_engine, n)
+    modes = _text_column(chunk, "mode", default_mode, n)
+    if "years" in chunk:
+        years = np.asarray(chunk["years"], dtype=np.float64)
+        years = np.where(np.isnan(years), default_years, years).astype(np.int64)
+    else:
+        years = np.full(n, default_years, dtype=np.int64)
+    if np.any(years < 0):
+        raise ValueError("years는 0 이상이어야 합니다.")
+    ids = chunk["scenario_id"] if "scenario_id" in chunk else np.arange(id_offset, id_offset + n)
+    states = {name: _state_column(chunk, name, n) for name in STATE_FIELDS}
+
+    # 시나리오 i의 출력 시작 위치
+    starts = np.cumsum(years) - years
+    total = int(years.sum())
+    out = {name: np.empty(total) for name in STATE_FIELDS}
+    out["year"] = np.empty(total, dtype=np.int64)
+
+    keys = np.char.add(np.char.add(engines.astype(str), "\0"), years.astype(str))
+    for key in np.unique(keys):
+        idx = np.flatnonzero(keys == key)
+        engine, horizon = engines[idx[0]], int(years[idx[0]])
+        if horizon == 0:
+            continue
+        traj = simulate_batch(
+            StateBatch(**{name: col[idx] for name, col in states.items()}),
+            _policy_schedule(chunk, idx, horizon),
+            modes[idx],
+            horizon,
+            engine=engine,
+        )
+        # (years, n_group) → 시나리오별 연속 구간
+        pos = (starts[idx][:, None] + np.arange(horizon)[None, :]).ravel()
+        for name in STATE_FIELDS:
+            out[name][pos] = traj.metric(name).T.ravel()
+        out["year"][pos] = np.tile(traj.year, len(idx))
+
+    out["scenario_id"] = np.repeat(ids, years)
+    out["engine"] = np.repeat(engines, years)
+    out["mode"] = np.repeat(modes, years)
+    return {name: out[name] for name in OUTPUT_COLUMNS}
+
+
+def _run_task(task):
+    chunk, options, id_offset = task
+    return run_chunk(chunk, id_offset=id_offset, **options)
+
+
+# -------------------------------------------------------
+# 출력 (청크 단위 스트리밍)
+# -------------------------------------------------------
+class ResultWriter:
+    """
+    출력 열 dict를 청크 단위로 CSV / Parquet 파일 또는 ensemble_store 저장소에 이어 쓴다.
+    """
+
+    def __init__(self, path: str, fmt: str = None, attrs: dict = None):
+        ext = os.path.splitext(path)[1].lower()
+        if fmt is None:
+            fmt = "parquet" if ext in (".parquet", ".pq") else "store" if ext == "" else "csv"
+        if fmt not in ("csv", "parquet", "store"):
+            raise ValueError(f"지원하지 않는 출력 형식: {fmt!r} (csv / parquet / store)")
+        if fmt == "parquet":
+            _pyarrow()  # 계산을 시작하기 전에 확인
+        self.fmt = fmt
+        self.path = path
+        self.attrs = attrs
+        self.rows = 0
+        self._writer = None
+        self._file = None
+        self._store = None
+
+    def _write_store(self, columns: Dict[str, np.ndarray]):
+        from ensemble_store import EnsembleStore
+
+        year = columns["year"]
+        n = int(np.count_nonzero(year == 1))
+        if n == 0:
+            return
+        horizon = len(year) // n
+        if n * horizon != len(year) or not np.array_equal(
+            year.reshape(n, horizon), np.broadcast_to(np.arange(1, horizon + 1), (n, horizon))
+        ):
+            raise ValueError("저장소 출력은 모든 시나리오의 기간(years)이 같아야 합니다.")
+        if self._store is None:
+            self._store = EnsembleStore.create(self.path, years=horizon, attrs=self.attrs, exist_ok=True)
+        if horizon != self._store.n_years:
+            raise ValueError(f"저장소 기간({self._store.n_years}년)과 다른 기간({horizon}년)의 시나리오가 있습니다.")
+
+        first = np.arange(0, len(year), horizon)
+        self._store.append(
+            {name: columns[name].reshape(n, horizon).T for name in STATE_FIELDS},
+            engine=columns["engine"][first],
+            mode=columns["mode"][first],
+            labels={"scenario_id": columns["scenario_id"][first]},
+        )
+
+    def write(self, columns: Dict[str, np.ndarray]):
+        if self.fmt == "store":
+            self._write_store(columns)
+        elif self.fmt == "parquet":
+            pa, pq = _pyarrow()
+            table = pa.table({name: columns[name] for name in OUTPUT_COLUMNS})
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            import pandas as pd
+
+            if self._file is None:
+                self._file = open(self.path, "w", encoding="utf-8", newline="")
+            pd.DataFrame(columns, columns=list(OUTPUT_COLUMNS), copy=False).to_csv(
+                self._file, index=False, header=self.rows == 0
+            )
+        self.rows += len(columns["year"])
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        elif self.fmt == "csv" and self.rows == 0:
+            # 빈 입력이어도 헤더만 있는 파일을 남긴다
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(",".join(OUTPUT_COLUMNS) + "\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -------------------------------------------------------
+# 실행
+# -------------------------------------------------------
+def run_file(input_path: str, output_path: str, chunk_size: int = 10_000, workers: int = None,
+             engine: str = "v1", mode: str = "현실형", years: int = 10,
+             input_format: str = None, output_format: str = None, progress=None) -> Dict[str, float]:
+    """
+    시나리오 파일 전체를 실행해 결과 파일로 쓴다.
+    - workers: 프로세스 수 (None이면 CPU 수, 0 또는 1이면 현재 프로세스에서 실행)
+    - progress: 청크가 끝날 때마다 (시나리오 수, 출력 행 수)로 호출되는 함수
+    동시에 처리 중인 청크는 최대 workers * 2개로 제한된다.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    options = {"default_engine": engine, "default_mode": mode, "default_years": years}
+
+    def tasks():
+        offset = 0
+        for chunk in read_scenarios(input_path, chunk_size, input_format):
+            yield chunk, options, offset
+            offset += len(next(iter(chunk.values()))) if chunk else 0
+
+    started = time.perf_counter()
+    scenarios = 0
+    with ResultWriter(output_path, output_format, attrs={"source": os.path.abspath(input_path)}) as writer:
+
+        def emit(task, columns):
+            nonlocal scenarios
+            scenarios += len(next(iter(task[0].values()))) if task[0] else 0
+            writer.write(columns)
+            if progress is not None:
+                progress(scenarios, writer.rows)
+
+        if workers <= 1:
+            for task in tasks():
+                emit(task, _run_task(task))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for task in tasks():
+                    pending.append((task, pool.submit(_run_task, task)))
+                    if len(pending) >= workers * 2:
+                        done, future = pending.popleft()
+                        emit(done, future.result())
+                while pending:
+                    done, future = pending.popleft()
+                    emit(done, future.result())
+
+    return {"scenarios": scenarios, "rows": writer.rows, "elapsed": time.perf_counter() - started}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="경제 시뮬레이터 시나리오 일괄 실행")
+    parser.add_argument("input", help="시나리오 파일 (.csv / .jsonl / .parquet)")
+    parser.add_argument("--output", "-o", required=True, help="결과 파일 (.csv / .parquet) 또는 저장소 디렉터리")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="한 번에 읽고 실행할 시나리오 수")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--engine", default="v1", help="engine 열이 없을 때 사용할 엔진")
+    parser.add_argument("--mode", default="현실형", help="mode 열이 없을 때 사용할 모드")
+    parser.add_argument("--years", type=int, default=10, help="years 열이 없을 때 사용할 기간")
+    parser.add_argument("--input-format", choices=("csv", "jsonl", "parquet"), default=None)
+    parser.add_argument("--output-format", choices=("csv", "parquet", "store"), default=None)
+    parser.add_argument("--quiet", "-q", action="store_true")
+    args = parser.parse_args(argv)
+
+    def progress(scenarios, rows):
+        print(f"\r시나리오 {scenarios:,} · 출력 {rows:,}행", end="", file=sys.stderr, flush=True)
+
+    try:
+        stats = run_file(
+            args.input,
+            args.output,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            engine=args.engine,
+            mode=args.mode,
+            years=args.years,
+            input_format=args.input_format,
+            output_format=args.output_format,
+            progress=None if args.quiet else progress,
+        )
+    except ImportError as exc:
+        print(f"오류: {exc}", file=sys.stderr)
+        return 1
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(
+        f"시나리오 {stats['scenarios']:,}개 · {stats['rows']:,}행 → {args.output} "
+        f"({stats['elapsed']:.2f}초)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+엔진·배치 경로·렌더링 파이프라인 성능 벤치마크.
+
+사용법:
+    python benchmark.py run --output bench.json [--quick] [--filter scalar]
+    python benchmark.py compare baseline.json bench.json [--threshold 0.15]
+
+compare는 기준 대비 중앙값이 threshold 이상 느려진 항목이나 현재 결과에 없는 기준 항목이
+있으면 종료 코드 1을 반환한다.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from data_model import EconomicState, PolicyInput, StateBatch, PolicyBatch
+from engine_params import MODES
+from engine_registry import available_engines, BATCH, SCALAR
+
+
+INITIAL_STATE = EconomicState(gdp=10_000_000.0, inflation=1.2, unemployment=14.5, growth=2.5)
+POLICY = PolicyInput(
+    interest_rate=1.5,
+    corporate_tax=25.0,
+    electricity_cost=100.0,
+    exchange_rate=1200.0,
+    government_spending_ratio=20.0,
+    consumer_confidence=100,
+    corporate_investment=100,
+    global_demand=100,
+    oil_price=70.0,
+    productivity=100,
+)
+
+
+# -------------------------------------------------------
+# 측정
+# -------------------------------------------------------
+def measure(fn: Callable[[], object], repeat: int, min_time: float) -> Dict[str, float]:
+    """
+    fn 한 번 실행 시간의 최솟값/중앙값 (초). 한 측정이 min_time 이상 걸리도록 반복 횟수를 정한다.
+    """
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+    samples = [timer.timeit(number) / number for _ in range(repeat)]
+    return {"min_s": min(samples), "median_s": statistics.median(samples), "number": number}
+
+
+def _cases(quick: bool) -> List[Tuple[str, Callable[[], object], Dict]]:
+    """
+    (이름, 함수, 부가정보) 목록. 부가정보의 "items"는 1회 실행당 처리량 계산에 사용.
+    """
+    from simulation import resolve_engine, simulate
+
+    cases = []
+    horizon = 50 if quick else 200
+    batch_sizes = (1_000, 10_000) if quick else (1_000, 10_000, 100_000)
+    mc_paths = (5_000,) if quick else (10_000, 100_000)
+
+    # 1) 스칼라 1년 호출: 엔진 × 모드
+    for info in available_engines(SCALAR):
+        update = resolve_engine(info.name).update_one_year
+        for mode in MODES:
+            cases.append((
+                f"scalar/{info.name}/{mode}",
+                lambda update=update, mode=mode: update(INITIAL_STATE, POLICY, mode),
+                {"items": 1},
+            ))
+
+    # 2) 다년 시뮬레이션
+    for info in available_engines(SCALAR):
+        cases.append((
+            f"horizon/{info.name}/{horizon}y",
+            lambda name=info.name: simulate(INITIAL_STATE, POLICY, "현실형", horizon, engine=name),
+            {"items": horizon},
+        ))
+
+    # 3) 배치 1년 처리량 (모드 혼합)
+    rng = np.random.default_rng(0)
+    for info in available_engines(BATCH):
+        update_batch = resolve_engine(info.name).update_one_year_batch
+        for n in batch_sizes:
+            states = StateBatch.from_states([INITIAL_STATE] * n)
+            policies = PolicyBatch.from_policy(POLICY)
+            policies.interest_rate = rng.uniform(0.0, 10.0, n)
+            modes = np.array(MODES)[rng.integers(0, len(MODES), n)]
+            cases.append((
+                f"batch/{info.name}/{n}",
+                lambda u=update_batch, s=states, p=policies, m=modes: u(s, p, m),
+                {"items": n},
+            ))
+
+    # 4) 몬테카를로 (30년, 단일 프로세스로 측정해 머신 간 비교 가능하게)
+    from monte_carlo import run_monte_carlo
+
+    for n in mc_paths:
+        cases.append((
+            f"monte_carlo/v2/{n}x30y",
+            lambda n=n: run_monte_carlo(INITIAL_STATE, POLICY, "현실형", 30, n, engine="v2", seed=0, workers=1),
+            {"items": n * 30},
+        ))
+
+    # 5) 렌더링 경로 (Streamlit 없이): DataFrame 생성, 그래프 생성
+    try:
+        import pandas as pd
+        from visual import plot_metric
+    except ImportError:
+        pd = None
+
+    if pd is not None:
+        run = simulate(INITIAL_STATE, POLICY, "현실형", horizon, engine="v1")
+        records = run.to_dicts()
+        df = run.to_dataframe()
+        cases.append((f"render/dataframe_from_dicts/{horizon}y", lambda: pd.DataFrame(records), {"items": horizon}))
+        cases.append((f"render/dataframe_columnar/{horizon}y", run.to_dataframe, {"items": horizon}))
+        cases.append((
+            f"render/plot_metric/{horizon}y",
+            lambda: plot_metric(df, "growth", "경제성장률 추이", "darkorange"),
+            {"items": horizon},
+        ))
+        cases.append((
+            f"render/to_csv/{horizon}y",
+            lambda: df.to_csv(index=False).encode("utf-8"),
+            {"items": horizon},
+        ))
+
+    return cases
+
+
+def run_benchmarks(quick: bool = False, name_filter: str = None, repeat: int = 5, min_time: float = 0.05) -> Dict:
+    results = {}
+    for name, fn, extra in _cases(quick):
+        if name_filter and name_filter not in name:
+            continue
+        stats = measure(fn, repeat=repeat, min_time=min_time)
+        stats["items_per_s"] = extra["items"] / stats["median_s"] if stats["median_s"] > 0 else None
+        results[name] = stats
+        print(f"{name:<45} {stats['median_s'] * 1e6:>12.1f} us  ({stats['items_per_s']:,.0f} items/s)", flush=True)
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "quick": quick,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.15) -> List[Dict]:
+    """
+    항목별 중앙값 비율(current / baseline)을 계산. ratio > 1 + threshold면 회귀로 표시.
+    - 기준에만 있는 항목은 missing (current_s/ratio는 None)
+    - 현재 결과에만 있는 항목은 new (baseline_s/ratio는 None, 판정에서 제외)
+    """
+    rows = []
+    for name, base in baseline["results"].items():
+        cur = current["results"].get(name)
+        if cur is None:
+            rows.append({
+                "name": name,
+                "baseline_s": base["median_s"],
+                "current_s": None,
+                "ratio": None,
+                "regression": False,
+                "status": "missing",
+            })
+            continue
+        ratio = cur["median_s"] / base["median_s"]
+        regression = ratio > 1.0 + threshold
+        rows.append({
+            "name": name,
+            "baseline_s": base["median_s"],
+            "current_s": cur["median_s"],
+            "ratio": ratio,
+            "regression": regression,
+            "status": "regression" if regression else "ok",
+        })
+    for name, cur in current["results"].items():
+        if name not in baseline["results"]:
+            rows.append({
+                "name": name,
+                "baseline_s": None,
+                "current_s": cur["median_s"],
+                "ratio": None,
+                "regression": False,
+                "status": "new",
+            })
+    return rows
+
+
+def _format_us(seconds) -> str:
+    return f"{seconds * 1e6:>12.1f}" if seconds is not None else f"{'-':>12}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="경제 시뮬레이터 성능 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="벤치마크 실행 후 JSON 저장")
+    run_p.add_argument("--output", "-o", default="bench.json")
+    run_p.add_argument("--quick", action="store_true", help="작은 크기로 빠르게 실행")
+    run_p.add_argument("--filter", default=None, help="이름에 이 문자열이 포함된 항목만 실행")
+    run_p.add_argument("--repeat", type=int, default=5)
+    run_p.add_argument("--min-time", type=float, default=0.05)
+
+    cmp_p = sub.add_parser("compare", help="기준 결과와 비교해 회귀 여부 판정")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--threshold", type=float, default=0.15, help="허용 속도 저하 비율 (0.15 = 15%%)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run_benchmarks(args.quick, args.filter, args.repeat, args.min_time)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    rows = compare(baseline, current, args.threshold)
+    for row in rows:
+        ratio = f"x{row['ratio']:.2f}" if row["ratio"] is not None else "  -  "
+        print(f"{row['name']:<45} {_format_us(row['baseline_s'])} -> {_format_us(row['current_s'])} us  {ratio}  {row['status'].upper()}")
+    regressions = [row for row in rows if row["regression"]]
+    missing = [row for row in rows if row["status"] == "missing"]
+    if regressions:
+        print(f"회귀 {len(regressions)}건 (허용 {args.threshold:.0%})")
+    if missing:
+        print(f"현재 결과에 없는 기준 항목 {len(missing)}건")
+    if regressions or missing:
+        return 1
+    print("회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,551 @@
+"""
+과거 거시 지표에 맞춘 엔진 계수 보정.
+
+- load_history: 연도별 실제 지표(성장률·물가·실업률, 선택적으로 GDP와 정책 변수) CSV를 읽는다.
+  첫 행이 초기 상태, 이후 각 행이 그 해의 실제 결과와 그 해에 적용된 정책이다.
+- Calibrator: 지정한 계수(자유 파라미터)를 바꿔 가며 시뮬레이션 경로와 실제 경로의 손실을 계산.
+  후보 K개를 계수 배열로 묶어 배치 엔진으로 한 번에 평가하고, 이미 평가한 벡터는 캐시에서 꺼낸다.
+- fit: 여러 시작점에서 준뉴턴(BFGS, 중앙 차분 기울기) 국소 최적화를 프로세스 풀로 병렬 실행.
+- 결과는 엔진 구성(JSON)으로 저장하고 engine_registry.load_engine_config로 불러와 엔진처럼 사용.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, is_dataclass, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from batch_runner import DEFAULT_POLICY, DEFAULT_STATE
+from data_model import EconomicState, PolicyBatch, StateBatch, POLICY_FIELDS, STATE_FIELDS
+from engine_registry import ConfiguredEngine, get_engine, register_configured, save_engine_config
+from sim_cache import stable_hash
+
+
+DEFAULT_METRICS = ("growth", "inflation", "unemployment")
+
+
+# -------------------------------------------------------
+# 과거 데이터
+# -------------------------------------------------------
+@dataclass
+class HistoricalData:
+    """
+    연도별 실제 지표와 정책 (각 배열 길이 = 기간 + 1, 0번째 행이 초기 상태).
+    - state: {STATE_FIELDS: 배열} (초기 행 이외의 NaN은 손실 계산에서 제외)
+    - policy: {POLICY_FIELDS: 배열} (CSV에 없는 정책은 기본값, 빈 칸은 직전 값)
+    """
+    year: np.ndarray
+    state: Dict[str, np.ndarray]
+    policy: Dict[str, np.ndarray]
+    source: Optional[str] = None
+
+    def __len__(self):
+        return len(self.year) - 1
+
+    @property
+    def initial_state(self) -> EconomicState:
+        return EconomicState(**{name: float(self.state[name][0]) for name in STATE_FIELDS})
+
+    def policy_batches(self) -> List[PolicyBatch]:
+        """
+        시뮬레이션 t년차(1..기간)에 적용할 정책 (길이 1 배열이라 후보 수에 맞춰 브로드캐스트).
+        """
+        return [
+            PolicyBatch(**{name: self.policy[name][t : t + 1] for name in POLICY_FIELDS})
+            for t in range(1, len(self.year))
+        ]
+
+
+def load_history(path: str, start=None, end=None) -> HistoricalData:
+    """
+    과거 지표 CSV를 읽는다.
+    - 필수 열: inflation, unemployment, growth (gdp·year·정책 열은 선택)
+    - start / end: year 열 기준으로 기간을 자른다 (양 끝 포함)
+    """
+    df = pd.read_csv(path, float_precision="round_trip")
+    if "year" not in df.columns:
+        df.insert(0, "year", np.arange(len(df)))
+    df = df.sort_values("year", kind="stable")
+    if start is not None:
+        df = df[df["year"] >= start]
+    if end is not None:
+        df = df[df["year"] <= end]
+    if len(df) < 2:
+        raise ValueError("보정에는 초기 상태와 최소 1년의 실제 지표가 필요합니다.")
+
+    missing = [name for name in DEFAULT_METRICS if name not in df.columns]
+    if missing:
+        raise ValueError(f"과거 데이터에 필요한 열이 없습니다: {missing}")
+
+    state = {}
+    for name in STATE_FIELDS:
+        if name in df.columns:
+            state[name] = df[name].to_numpy(dtype=float)
+        else:
+            state[name] = np.full(len(df), np.nan)
+            state[name][0] = getattr(DEFAULT_STATE, name)
+        if not np.isfinite(state[name][0]):
+            raise ValueError(f"첫 행(초기 상태)의 {name} 값이 비어 있습니다.")
+
+    policy = {}
+    for name in POLICY_FIELDS:
+        if name in df.columns:
+            policy[name] = df[name].astype(float).ffill().fillna(getattr(DEFAULT_POLICY, name)).to_numpy()
+        else:
+            policy[name] = np.full(len(df), getattr(DEFAULT_POLICY, name))
+
+    return HistoricalData(year=df["year"].to_numpy(), state=state, policy=policy, source=os.path.abspath(path))
+
+
+# -------------------------------------------------------
+# 계수 경로 ("w_oil_inf", "feedback.growth_from_unemp")
+# -------------------------------------------------------
+def get_coefficient(coefficients, path: str):
+    value = coefficients
+    for part in path.split("."):
+        if not is_dataclass(value) or part not in {f.name for f in fields(value)}:
+            raise ValueError(f"{type(coefficients).__name__}에 없는 계수: {path!r}")
+        value = getattr(value, part)
+    if is_dataclass(value):
+        raise ValueError(f"{path!r}는 계수 블록입니다. 개별 계수를 지정하세요.")
+    return value
+
+
+def with_coefficients(coefficients, values: Dict[str, object]):
+    """
+    경로별 값을 바꾼 계수 세트 (값으로 배열을 주면 후보별 계수를 가진 세트가 된다).
+    """
+    top, nested = {}, {}
+    for path, value in values.items():
+        head, _, rest = path.partition(".")
+        if rest:
+            nested.setdefault(head, {})[rest] = value
+        else:
+            top[head] = value
+    for head, sub in nested.items():
+        top[head] = with_coefficients(getattr(coefficients, head), sub)
+    return replace(coefficients, **top)
+
+
+def default_bounds(value: float) -> Tuple[float, float]:
+    """
+    기본 탐색 범위: 부호가 바뀔 수 있도록 기본값 ± 2|기본값| (기본값이 0이면 ±1).
+    """
+    if value == 0:
+        return (-1.0, 1.0)
+    return (value - 2 * abs(value), value + 2 * abs(value))
+
+
+# -------------------------------------------------------
+# 평가 캐시
+# -------------------------------------------------------
+class EvaluationCache:
+    """
+    파라미터 벡터 → 손실. 바이트 단위로 같은 벡터만 적중하며 max_entries를 넘으면 오래된 것부터 삭제.
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def lookup(self, X: np.ndarray):
+        """
+        (K, d) 후보의 캐시된 손실 (없으면 NaN)과 미적중 행 인덱스.
+        """
+        out = np.full(len(X), np.nan)
+        keys = [row.tobytes() for row in X]
+        missing = []
+        for i, key in enumerate(keys):
+            value = self._data.get(key)
+            if value is None:
+                missing.append(i)
+            else:
+                out[i] = value
+        self.hits += len(X) - len(missing)
+        self.misses += len(missing)
+        return out, keys, np.array(missing, dtype=np.intp)
+
+    def store(self, keys, values):
+        for key, value in zip(keys, values):
+            self._data[key] = float(value)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+
+# 프로세스별 캐시 (Calibrator.key 기준). 같은 워커에서 실행되는 시작점끼리 공유된다.
+_caches: Dict[str, EvaluationCache] = {}
+
+
+# -------------------------------------------------------
+# 손실 계산
+# -------------------------------------------------------
+class Calibrator:
+    """
+    과거 데이터에 대한 계수 보정 문제.
+    - engine: 기반 엔진 이름 (등록된 계수 구성이면 그 계수에서 출발)
+    - mode: 시뮬레이션 모드. 보정되는 값은 모드 배율 적용 전 원본 계수
+    - free: 자유 파라미터 경로 목록
+    - bounds: {경로: (하한, 상한)} (없으면 default_bounds)
+    - metrics / weights: 손실에 쓰는 지표와 가중치. 지표별로 실제 값의 표준편차로 나눈
+      오차 제곱의 평균을 가중합한다 (GDP는 로그 차이)
+    """
+
+    def __init__(
+        self,
+        data: HistoricalData,
+        free: Sequence[str],
+        engine: str = "v1",
+        mode: str = "현실형",
+        bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+        metrics: Sequence[str] = DEFAULT_METRICS,
+        weights: Optional[Dict[str, float]] = None,
+        cache_size: int = 100_000,
+    ):
+        if not free:
+            raise ValueError("자유 파라미터를 하나 이상 지정하세요.")
+        unknown = set(metrics) - set(STATE_FIELDS)
+        if unknown:
+            raise ValueError(f"알 수 없는 지표: {sorted(unknown)}")
+
+        self.data = data
+        self.engine = engine
+        self.mode = mode
+        self.free = tuple(free)
+        self.metrics = tuple(metrics)
+        self.weights = np.array([(weights or {}).get(name, 1.0) for name in self.metrics])
+        self.cache_size = cache_size
+
+        base = self.base_coefficients
+        self.initial = np.array([float(get_coefficient(base, path)) for path in self.free])
+        bounds = bounds or {}
+        limits = np.array([bounds.get(path) or default_bounds(v) for path, v in zip(self.free, self.initial)], dtype=float)
+        self.lower, self.upper = limits[:, 0], limits[:, 1]
+        if np.any(self.lower >= self.upper):
+            raise ValueError("탐색 범위의 하한은 상한보다 작아야 합니다.")
+
+        self._actual = np.stack([self._transform(name, data.state[name][1:]) for name in self.metrics])
+        self._valid = np.isfinite(self._actual)
+        scale = np.array([np.std(row[ok]) if ok.any() else 1.0 for row, ok in zip(self._actual, self._valid)])
+        self._scale = np.where(scale > 0, scale, 1.0)
+
+        self.key = stable_hash(
+            "calibration", engine, mode, base, self.free, self.metrics, self.weights,
+            self.lower, self.upper, data.year, data.state, data.policy,
+        )
+
+    @property
+    def base_module(self):
+        engine = get_engine(self.engine)
+        return engine.module if isinstance(engine, ConfiguredEngine) else engine
+
+    @property
+    def base_coefficients(self):
+        engine = get_engine(self.engine)
+        return engine.coefficients if isinstance(engine, ConfiguredEngine) else engine.DEFAULT_COEFFICIENTS
+
+    @property
+    def base_engine(self) -> str:
+        engine = get_engine(self.engine)
+        return engine.base if isinstance(engine, ConfiguredEngine) else self.engine
+
+    @property
+    def cache(self) -> EvaluationCache:
+        cache = _caches.get(self.key)
+        if cache is None:
+            cache = _caches[self.key] = EvaluationCache(self.cache_size)
+        return cache
+
+    @staticmethod
+    def _transform(metric, values):
+        return np.log(values) if metric == "gdp" else values
+
+    def coefficients(self, x) -> object:
+        """
+        파라미터 벡터 (d,)의 계수 세트.
+        """
+        return with_coefficients(self.base_coefficients, {path: float(v) for path, v in zip(self.free, x)})
+
+    def simulate(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        후보 (K, d)의 시뮬레이션 경로 {지표: (기간, K)}. 후보별 계수를 배열로 묶어 한 번에 실행.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        k = len(X)
+        module = self.base_module
+        coefficients = with_coefficients(self.base_coefficients, {path: X[:, j] for j, path in enumerate(self.free)})
+        # 배열 계수는 해시할 수 없으므로 캐시를 거치지 않고 호출
+        params = module.compile_params.__wrapped__(self.mode, coefficients)
+
+        initial = self.data.initial_state
+        states = StateBatch(**{name: np.full(k, getattr(initial, name)) for name in STATE_FIELDS})
+        out = {name: np.empty((len(self.data), k)) for name in STATE_FIELDS}
+        with np.errstate(all="ignore"):
+            for t, policies in enumerate(self.data.policy_batches()):
+                states = module.update_one_year_batch(states, policies, self.mode, params=params)
+                for name in STATE_FIELDS:
+                    out[name][t] = getattr(states, name)
+        return out
+
+    def _evaluate(self, X: np.ndarray) -> np.ndarray:
+        paths = self.simulate(X)
+        loss = np.zeros(len(X))
+        with np.errstate(all="ignore"):
+            for m, name in enumerate(self.metrics):
+                error = (self._transform(name, paths[name]) - self._actual[m][:, None]) / self._scale[m]
+                valid = self._valid[m][:, None]
+                loss = loss + self.weights[m] * np.where(valid, error * error, 0.0).sum(axis=0) / max(valid.sum(), 1)
+        return np.where(np.isfinite(loss), loss, np.inf)
+
+    def loss(self, X: np.ndarray) -> np.ndarray:
+        """
+        후보 (K, d)의 손실 (K,). 캐시에 없는 후보만 모아 한 번에 평가.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        cache = self.cache
+        out, keys, missing = cache.lookup(X)
+        if len(missing):
+            values = self._evaluate(X[missing])
+            out[missing] = values
+            cache.store([keys[i] for i in missing], values)
+        return out
+
+    def fit(
+        self,
+        starts: int = 8,
+        seed: Optional[int] = 0,
+        workers: Optional[int] = None,
+        max_iter: int = 200,
+        tol: float = 1e-10,
+    ) -> "CalibrationResult":
+        """
+        다중 시작점 국소 최적화. 첫 시작점은 현재 계수, 나머지는 탐색 범위 안의 균등 난수.
+        workers가 None이면 CPU 수, 0/1이면 현재 프로세스에서 순서대로 실행.
+        """
+        started = time.perf_counter()
+        rng = np.random.default_rng(seed)
+        span = self.upper - self.lower
+        unit = rng.random((max(starts, 1), len(self.free)))
+        unit[0] = np.clip((self.initial - self.lower) / span, 0.0, 1.0)
+
+        tasks = [(self, u, max_iter, tol) for u in unit]
+        workers = os.cpu_count() if workers is None else workers
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                runs = list(pool.map(_run_start, tasks))
+        else:
+            runs = [_run_start(task) for task in tasks]
+
+        best = min(runs, key=lambda run: run.loss)
+        return CalibrationResult(
+            engine=self.base_engine,
+            mode=self.mode,
+            free=self.free,
+            x=best.x,
+            loss=best.loss,
+            initial_loss=float(self.loss(self.initial[None])[0]),
+            coefficients=self.coefficients(best.x),
+            starts=runs,
+            evaluations=sum(run.evaluations for run in runs),
+            cache_hits=sum(run.cache_hits for run in runs),
+            elapsed=time.perf_counter() - started,
+            years=len(self.data),
+            source=self.data.source,
+        )
+
+
+# -------------------------------------------------------
+# 국소 최적화
+# -------------------------------------------------------
+@dataclass
+class StartResult:
+    x0: np.ndarray
+    x: np.ndarray
+    loss: float
+    iterations: int
+    evaluations: int
+    cache_hits: int
+
+
+def local_search(f, u0: np.ndarray, max_iter: int = 200, tol: float = 1e-10, h: float = 1e-6, line_steps: int = 8):
+    """
+    [0, 1]^d 단위 좌표에서의 투영 준뉴턴(BFGS) 탐색.
+    - 기울기: 중앙 차분 2d개 점을 한 번에 평가 (경계에서는 한쪽 차분)
+    - 선 탐색: 보폭 2, 1, 1/2, ... line_steps개를 한 번에 평가해 최선 선택 (범위 밖은 경계로 투영)
+    - 내리막 방향이 아니거나 선 탐색이 실패하면 헤시안 근사를 초기화하고 경사 방향으로 재시도
+    - 개선이 tol(상대) 미만이면 종료
+    """
+    d = len(u0)
+    eye = np.eye(d) * h
+    u = np.clip(u0, 0.0, 1.0)
+    fu = float(f(u[None])[0])
+    H = None
+    previous = None
+    iteration = 0
+
+    def gradient(u):
+        plus = np.clip(u + eye, 0.0, 1.0)
+        minus = np.clip(u - eye, 0.0, 1.0)
+        values = f(np.vstack([plus, minus]))
+        with np.errstate(invalid="ignore"):
+            g = (values[:d] - values[d:]) / (plus - minus).diagonal()
+        return np.where(np.isfinite(g), g, 0.0)
+
+    for iteration in range(1, max_iter + 1):
+        grad = gradient(u)
+        # 경계 밖을 향하는 성분은 고정
+        active = ((u <= 0.0) & (grad > 0)) | ((u >= 1.0) & (grad < 0))
+        grad[active] = 0.0
+        norm = np.linalg.norm(grad)
+        if norm == 0:
+            break
+
+        if previous is not None and H is not None:
+            s, g_old = previous
+            y = grad - g_old
+            sy = s @ y
+            if sy > 1e-16:
+                rho = 1.0 / sy
+                V = np.eye(d) - rho * np.outer(s, y)
+                H = V @ H @ V.T + rho * np.outer(s, s)
+        if H is None:
+            H = np.eye(d) * (0.1 / norm)
+
+        direction = -(H @ grad)
+        direction[active] = 0.0
+        if direction @ grad >= 0:
+            H = np.eye(d) * (0.1 / norm)
+            direction = -(H @ grad)
+
+        steps = 2.0 ** (1 - np.arange(line_steps))
+        candidates = np.clip(u + steps[:, None] * direction, 0.0, 1.0)
+        losses = f(candidates)
+        j = int(np.argmin(losses))
+        if losses[j] < fu:
+            improvement = fu - losses[j]
+            previous = (candidates[j] - u, grad)
+            u, fu = candidates[j], float(losses[j])
+            if improvement <= tol * max(abs(fu), 1.0):
+                break
+        elif previous is None:
+            # 초기 경사 방향으로도 줄지 않음: 이미 (수치적으로) 최소점
+            break
+        else:
+            H, previous = None, None
+    return u, fu, iteration
+
+
+def _run_start(task) -> StartResult:
+    calibrator, u0, max_iter, tol = task
+    lower, span = calibrator.lower, calibrator.upper - calibrator.lower
+    cache = calibrator.cache
+    hits, misses = cache.hits, cache.misses
+
+    u, loss, iterations = local_search(lambda U: calibrator.loss(lower + U * span), u0, max_iter, tol)
+    return StartResult(
+        x0=lower + u0 * span,
+        x=lower + u * span,
+        loss=loss,
+        iterations=iterations,
+        evaluations=cache.misses - misses,
+        cache_hits=cache.hits - hits,
+    )
+
+
+# -------------------------------------------------------
+# 결과
+# -------------------------------------------------------
+@dataclass
+class CalibrationResult:
+    """
+    보정 결과.
+    - x / params: 최적 자유 파라미터 값
+    - loss / initial_loss: 최적 손실과 보정 전(현재 계수) 손실
+    - coefficients: 최적 값을 반영한 전체 계수 세트
+    - evaluations / cache_hits: 실제 시뮬레이션한 후보 수와 캐시 적중 수 (시작점 합계)
+    """
+    engine: str
+    mode: str
+    free: Tuple[str, ...]
+    x: np.ndarray
+    loss: float
+    initial_loss: float
+    coefficients: object
+    starts: List[StartResult]
+    evaluations: int
+    cache_hits: int
+    elapsed: float
+    years: int
+    source: Optional[str] = None
+
+    @property
+    def params(self) -> Dict[str, float]:
+        return {path: float(v) for path, v in zip(self.free, self.x)}
+
+    def register(self, name: str, label: str = None):
+        """
+        보정된 계수 세트를 엔진으로 등록 (get_engine(name) / simulate(..., engine=name)으로 사용).
+        """
+        return register_configured(name, self.engine, self.coefficients, label)
+
+    def save(self, path: str, name: str = None, label: str = None):
+        """
+        엔진 구성 JSON으로 저장 (engine_registry.load_engine_config로 불러와 등록).
+        """
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        meta = {
+            "calibration": {
+                "mode": self.mode,
+                "params": self.params,
+                "loss": self.loss,
+                "initial_loss": self.initial_loss,
+                "years": self.years,
+                "source": self.source,
+            }
+        }
+        save_engine_config(path, name, self.engine, self.coefficients, label, meta)
+
+
+# -------------------------------------------------------
+# CLI
+# -------------------------------------------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="과거 지표에 맞춘 엔진 계수 보정")
+    parser.add_argument("history", help="과거 지표 CSV (year, gdp, inflation, unemployment, growth, 정책 열)")
+    parser.add_argument("--free", required=True, help="보정할 계수 경로 (쉼표 구분, 예: w_oil_inf,feedback.infl_from_fx)")
+    parser.add_argument("--output", "-o", required=True, help="엔진 구성 JSON 경로")
+    parser.add_argument("--name", default=None, help="엔진 이름 (기본: 출력 파일 이름)")
+    parser.add_argument("--engine", default="v1")
+    parser.add_argument("--mode", default="현실형")
+    parser.add_argument("--start", type=int, default=None, help="사용할 첫 연도")
+    parser.add_argument("--end", type=int, default=None, help="사용할 마지막 연도")
+    parser.add_argument("--starts", type=int, default=8, help="시작점 수")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    data = load_history(args.history, args.start, args.end)
+    calibrator = Calibrator(data, [p.strip() for p in args.free.split(",") if p.strip()], args.engine, args.mode)
+    result = calibrator.fit(starts=args.starts, seed=args.seed, workers=args.workers)
+    result.save(args.output, args.name)
+
+    for path, value in result.params.items():
+        print(f"{path:32s} {value: .6f}")
+    print(
+        f"손실 {result.initial_loss:.6g} → {result.loss:.6g} · 평가 {result.evaluations:,}회 "
+        f"(캐시 적중 {result.cache_hits:,}) · {result.elapsed:.2f}초 → {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+엔진·모드 조합 비교 실행.
+
+같은 초기 상태와 정책(스케줄)을 선택한 (엔진, 모드) 조합 전부에 한 번에 돌린다.
+- 엔진 하나의 조합이 SCALAR_COMBOS개 미만이면 (보통의 비교 패널: 엔진 2개 × 모드 3개) 조합마다
+  스칼라 커널로 실행한다. 배치 커널 호출 한 번의 고정 비용(상태 배치 생성 포함)이 스칼라 한 해의
+  약 20배라, 6개 조합을 스칼라로 돌리는 비용은 simulate 6번과 같고 배치로 돌리는 것보다 약 7배 빠르다
+- 조합이 많으면 조합 하나 = 배치의 시나리오 하나로 해마다 엔진별로 커널을 한 번만 호출.
+  명세로 생성한 엔진은 모드별 파라미터를 슬롯마다 시나리오별 값 배열로 합쳐 넘기므로
+  (커널이 원소별 연산만 함) 모드가 섞여 있어도 나눠 실행하지 않는다
+- 어느 쪽이든 결과는 조합별 단독 실행과 같다
+- 결과는 연도 × (지표, 엔진, 모드) 다중 인덱스 표로 정렬되고, 기준 조합 대비 차이와
+  처음으로 허용 오차를 넘는 연도(분기 연도)를 계산한다
+"""
+import itertools
+from dataclasses import dataclass
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from data_model import EconomicState, PolicyInput, PolicyBatch, StateBatch, STATE_FIELDS
+from engine_params import MODES
+from model_spec import EngineParams
+from simulation import resolve_engine, simulate
+
+
+COLUMN_LEVELS = ("metric", "engine", "mode")
+
+# 엔진 하나의 조합이 이보다 적으면 배치 대신 조합별 스칼라 실행
+# (500년 기준 배치 커널 호출 한 번 ≈ 0.17 ms, 스칼라 한 해 ≈ 0.007 ms)
+SCALAR_COMBOS = 24
+
+# 분기 판정: |값 - 기준| > atol + rtol × |기준| (GDP는 rtol, 비율 지표는 atol이 주로 작용)
+DIVERGENCE_RTOL = 0.01
+DIVERGENCE_ATOL = 0.1
+
+
+@dataclass
+class Comparison:
+    """
+    (엔진, 모드) 조합별 궤적.
+    - combos: 조합 순서 (values의 열 순서)
+    - values[metric]: (years, 조합 수) 배열
+    - baseline: 차이·분기 연도의 기본 기준 조합
+    """
+    year: np.ndarray
+    combos: Tuple[Tuple[str, str], ...]
+    values: Dict[str, np.ndarray]
+    initial: EconomicState
+    baseline: Tuple[str, str]
+
+    def __len__(self):
+        return len(self.year)
+
+    def _column(self, combo) -> int:
+        try:
+            return self.combos.index(tuple(combo))
+        except ValueError:
+            raise ValueError(f"비교에 없는 조합: {combo!r}") from None
+
+    def _columns(self, metrics):
+        import pandas as pd
+
+        return pd.MultiIndex.from_tuples(
+            [(metric, engine, mode) for metric in metrics for engine, mode in self.combos],
+            names=COLUMN_LEVELS,
+        )
+
+    def series(self, metric: str, combo) -> np.ndarray:
+        return self.values[metric][:, self._column(combo)]
+
+    def to_frame(self, metrics: Sequence[str] = STATE_FIELDS):
+        """
+        연도 인덱스 × (지표, 엔진, 모드) 다중 인덱스 열의 표.
+        """
+        import pandas as pd
+
+        data = np.hstack([self.values[metric] for metric in metrics]) if len(self.year) else np.empty((0, 0))
+        return pd.DataFrame(data, index=pd.Index(self.year, name="year"), columns=self._columns(metrics))
+
+    def differences(self, baseline=None, metrics: Sequence[str] = STATE_FIELDS, relative: bool = False):
+        """
+        기준 조합 대비 차이 (to_frame과 같은 모양, 기준 조합 열은 0).
+        relative면 기준 값 대비 비율 (기준이 0이면 NaN).
+        """
+        import pandas as pd
+
+        base = self._column(baseline or self.baseline)
+        parts = []
+        for metric in metrics:
+            values = self.values[metric]
+            diff = values - values[:, base:base + 1]
+            if relative:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    diff = np.where(values[:, base:base + 1] != 0, diff / np.abs(values[:, base:base + 1]), np.nan)
+            parts.append(diff)
+        data = np.hstack(parts) if len(self.year) else np.empty((0, 0))
+        return pd.DataFrame(data, index=pd.Index(self.year, name="year"), columns=self._columns(metrics))
+
+    def divergence_years(
+        self,
+        baseline=None,
+        metrics: Sequence[str] = STATE_FIELDS,
+        rtol: float = DIVERGENCE_RTOL,
+        atol: float = DIVERGENCE_ATOL,
+    ):
+        """
+        조합별·지표별로 기준 조합과 처음 |차이| > atol + rtol × |기준|이 되는 연도 (끝까지 없으면 -1).
+        반환: (엔진, 모드) 인덱스 × 지표 열의 표
+        """
+        import pandas as pd
+
+        base = self._column(baseline or self.baseline)
+        out = {}
+        for metric in metrics:
+            values = self.values[metric]
+            reference = values[:, base:base + 1]
+            apart = np.abs(values - reference) > atol + rtol * np.abs(reference)
+            apart |= np.isnan(values) != np.isnan(reference)
+            hit = apart.any(axis=0)
+            out[metric] = np.where(hit, self.year[np.argmax(apart, axis=0)] if len(self.year) else -1, -1)
+        index = pd.MultiIndex.from_tuples(self.combos, names=COLUMN_LEVELS[1:])
+        return pd.DataFrame(out, index=index)
+
+    def final(self):
+        """
+        마지막 해 지표 표 ((엔진, 모드) 인덱스 × 지표).
+        """
+        import pandas as pd
+
+        index = pd.MultiIndex.from_tuples(self.combos, names=COLUMN_LEVELS[1:])
+        return pd.DataFrame({metric: self.values[metric][-1] for metric in STATE_FIELDS}, index=index)
+
+
+# -------------------------------------------------------
+# 실행
+# -------------------------------------------------------
+def _stacked_params(module, modes: np.ndarray):
+    """
+    모드별 EngineParams를 슬롯마다 시나리오별 값 배열로 합친 파라미터.
+    명세로 생성한 엔진(compile_params가 EngineParams를 반환)이 아니면 None (모드 배열로 나눠 실행).
+    """
+    compile_params = getattr(module, "compile_params", None)
+    if compile_params is None:
+        return None
+    uniq, inverse = np.unique(modes, return_inverse=True)
+    per_mode = [compile_params(str(mode)) for mode in uniq]
+    if not all(isinstance(p, EngineParams) for p in per_mode):
+        return None
+    table = np.array([p.values for p in per_mode], dtype=np.float64)   # (모드 수, 슬롯 수)
+    return EngineParams(mode=tuple(modes), values=tuple(table[inverse.reshape(-1)].T))
+
+
+def _policy_batches(policy_or_schedule, years):
+    """
+    PolicyInput / PolicyBatch(매년 동일) 또는 연도별 시퀀스를 연도별 PolicyBatch 리스트로.
+    """
+    if isinstance(policy_or_schedule, (PolicyInput, PolicyBatch)):
+        if years is None:
+            raise ValueError("정책이 하나면 기간(years)을 지정해야 합니다.")
+        schedule = [policy_or_schedule] * years
+    else:
+        schedule = list(policy_or_schedule)
+        if years is not None and len(schedule) != years:
+            raise ValueError(f"정책 스케줄 길이({len(schedule)})가 시뮬레이션 기간({years}년)과 다릅니다.")
+    batches, last = [], None
+    for policy in schedule:
+        # 같은 정책 객체가 이어지면 배치를 다시 만들지 않는다
+        if policy is not last:
+            batch = PolicyBatch.from_policy(policy) if isinstance(policy, PolicyInput) else policy
+            last = policy
+        batches.append(batch)
+    return batches
+
+
+def _policy_inputs(schedule):
+    """
+    연도별 PolicyBatch가 모두 정책 하나면 연도별 PolicyInput 리스트 (스칼라 실행용), 아니면 None.
+    """
+    inputs, last = [], None
+    for batch in schedule:
+        if batch is not last:
+            if len(batch) != 1:
+                return None
+            policy, last = batch.to_policies()[0], batch
+        inputs.append(policy)
+    return inputs
+
+
+def compare_runs(
+    state: EconomicState,
+    policy_or_schedule,
+    years: int = None,
+    engines: Sequence[str] = ("v1", "v2"),
+    modes: Sequence[str] = MODES,
+    combos: Sequence[Tuple[str, str]] = None,
+    baseline: Tuple[str, str] = None,
+    start_year: int = 1,
+) -> Comparison:
+    """
+    state에서 policy_or_schedule로 (엔진, 모드) 조합 전부를 한 번의 배치 실행으로 시뮬레이션.
+    - combos를 주면 그 조합만, 아니면 engines × modes 전부
+    - baseline: 차이·분기 연도의 기준 (기본은 첫 조합)
+    """
+    combos = tuple(tuple(c) for c in (combos if combos is not None else itertools.product(engines, modes)))
+    if not combos:
+        raise ValueError("비교할 (엔진, 모드) 조합이 없습니다.")
+    if len(set(combos)) != len(combos):
+        raise ValueError("(엔진, 모드) 조합이 중복되었습니다.")
+    baseline = tuple(baseline) if baseline is not None else combos[0]
+    if baseline not in combos:
+        raise ValueError(f"기준 조합 {baseline!r}가 비교 조합에 없습니다.")
+
+    schedule = _policy_batches(policy_or_schedule, years)
+    years = len(schedule)
+    inputs = _policy_inputs(schedule)
+
+    # 엔진별로 조합을 모아 조합이 적으면 스칼라로, 많으면 시나리오 하나씩 배정한 배치로
+    values = {name: np.empty((years, len(combos))) for name in STATE_FIELDS}
+    groups = []
+    for engine in dict.fromkeys(engine for engine, _ in combos):
+        idx = np.array([i for i, c in enumerate(combos) if c[0] == engine])
+        module = resolve_engine(engine)
+        if inputs is not None and len(idx) < SCALAR_COMBOS:
+            for i in idx:
+                result = simulate(state, inputs, combos[i][1], years, module)
+                for name in STATE_FIELDS:
+                    values[name][:, i] = getattr(result, name)
+            continue
+        modes_arr = np.array([combos[i][1] for i in idx], dtype=object)
+        states = StateBatch(**{name: np.full(len(idx), float(getattr(state, name)))
+                               for name in STATE_FIELDS})
+        groups.append([module, idx, modes_arr, _stacked_params(module, modes_arr), states])
+
+    for t, policies in enumerate(schedule if groups else ()):
+        for group in groups:
+            module, idx, modes_arr, params, states = group
+            if params is not None:
+                states = module.update_one_year_batch(states, policies, modes_arr, params=params)
+            else:
+                states = module.update_one_year_batch(states, policies, modes_arr)
+            group[4] = states
+            for name in STATE_FIELDS:
+                values[name][t, idx] = getattr(states, name)
+
+    return Comparison(
+        year=np.arange(start_year, start_year + years, dtype=np.int64),
+        combos=combos,
+        values=values,
+        initial=state,
+        baseline=baseline,
+    )
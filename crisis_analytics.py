@@ -0,0 +1,314 @@
+"""
+시나리오 묶음(연도 × 시나리오) 궤적 전체에 대한 위기 이벤트 분석.
+
+app.crisis_advisor와 같은 위기 기준(CrisisRules 임계값)을 배열 연산으로 한 번에 적용해
+- 이벤트 표: 시나리오, 유형, 발생 연도, 지속 기간, 최대 심각도, 회복 연도
+- 집계: 연도별 위기 확률, 위기 경험 비율, 평균 지속 기간, 첫 위기까지 기간
+- 그룹(정책 패키지)별 위기 위험 순위
+를 계산한다. 파이썬 반복문은 위기 유형(4개)에 대해서만 돈다.
+"""
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+
+from engine_params import CrisisRules
+from stop_rules import DEFAULT_CRISIS_RULES, crisis_flags
+
+
+CRISIS_TYPES = ("unemployment", "inflation", "growth", "any")
+
+
+def crisis_severity(state, rules: CrisisRules = DEFAULT_CRISIS_RULES) -> Dict[str, np.ndarray]:
+    """
+    유형별 임계값 초과 폭 (%p, 양수일 때 위기). "any"는 세 유형 중 최댓값.
+    """
+    severity = {
+        "unemployment": np.asarray(state.unemployment) - rules.unemployment_threshold,
+        "inflation": np.asarray(state.inflation) - rules.inflation_threshold,
+        "growth": rules.growth_threshold - np.asarray(state.growth),
+    }
+    severity["any"] = np.maximum(np.maximum(severity["unemployment"], severity["inflation"]), severity["growth"])
+    return severity
+
+
+# -------------------------------------------------------
+# 결과
+# -------------------------------------------------------
+@dataclass
+class CrisisEvents:
+    """
+    위기 이벤트 표 (이벤트 하나 = 한 시나리오에서 위기가 연속된 구간).
+    - scenario: 시나리오 번호
+    - kind: CRISIS_TYPES 내 번호
+    - onset_year: 위기가 시작된 연도
+    - duration: 위기가 지속된 햇수
+    - peak_severity: 구간 내 임계값 최대 초과 폭 (%p)
+    - recovery_year: 위기가 해제된 첫 연도 (기간 끝까지 지속되면 -1)
+    """
+    scenario: np.ndarray
+    kind: np.ndarray
+    onset_year: np.ndarray
+    duration: np.ndarray
+    peak_severity: np.ndarray
+    recovery_year: np.ndarray
+
+    def __len__(self):
+        return len(self.scenario)
+
+    @property
+    def recovered(self) -> np.ndarray:
+        return self.recovery_year >= 0
+
+    def of_type(self, kind: str) -> "CrisisEvents":
+        mask = self.kind == CRISIS_TYPES.index(kind)
+        return CrisisEvents(**{name: getattr(self, name)[mask] for name in self.__dataclass_fields__})
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        frame = pd.DataFrame(
+            {name: getattr(self, name) for name in self.__dataclass_fields__},
+            copy=False,
+        )
+        frame["kind"] = pd.Categorical.from_codes(self.kind, CRISIS_TYPES)
+        return frame
+
+
+@dataclass
+class CrisisAnalysis:
+    """
+    위기 분석 결과.
+    - events: 이벤트 표
+    - year: 연도 배열
+    - probability: 유형별 연도별 위기 확률 (위기 상태인 시나리오 비율)
+    - crisis_years: 유형별 시나리오별 위기 햇수
+    - first_onset: 유형별 시나리오별 첫 위기 연도 (위기가 없으면 -1)
+    """
+    events: CrisisEvents
+    year: np.ndarray
+    n_scenarios: int
+    probability: Dict[str, np.ndarray]
+    crisis_years: Dict[str, np.ndarray]
+    first_onset: Dict[str, np.ndarray]
+
+    def ever(self, kind: str = "any") -> float:
+        """
+        기간 중 한 번이라도 위기를 겪은 시나리오 비율.
+        """
+        return float(np.mean(self.first_onset[kind] >= 0)) if self.n_scenarios else 0.0
+
+    def mean_duration(self, kind: str = "any", completed_only: bool = False) -> float:
+        events = self.events.of_type(kind)
+        duration = events.duration[events.recovered] if completed_only else events.duration
+        return float(duration.mean()) if len(duration) else 0.0
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        유형별 요약 통계.
+        """
+        out = {}
+        for kind in CRISIS_TYPES:
+            events = self.events.of_type(kind)
+            onset = self.first_onset[kind]
+            hit = onset >= 0
+            out[kind] = {
+                "ever": self.ever(kind),
+                "events_per_scenario": len(events) / self.n_scenarios if self.n_scenarios else 0.0,
+                "mean_duration": self.mean_duration(kind),
+                "mean_duration_completed": self.mean_duration(kind, completed_only=True),
+                "recovery_rate": float(events.recovered.mean()) if len(events) else 0.0,
+                "mean_peak_severity": float(events.peak_severity.mean()) if len(events) else 0.0,
+                "expected_crisis_years": float(self.crisis_years[kind].mean()) if self.n_scenarios else 0.0,
+                "mean_first_onset": float(onset[hit].mean()) if hit.any() else float("nan"),
+            }
+        return out
+
+    def probability_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame({"year": self.year, **self.probability}, copy=False)
+
+
+# -------------------------------------------------------
+# 분석
+# -------------------------------------------------------
+def _runs(flags: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (years, N) bool 배열에서 시나리오별로 True가 연속된 구간을 찾는다.
+    반환: (시나리오, 시작 인덱스, 끝 인덱스(미포함)) — 시나리오, 시작 순으로 정렬
+    """
+    years, n = flags.shape
+    padded = np.zeros((n, years + 2), dtype=np.int8)
+    padded[:, 1:-1] = flags.T
+    edges = np.diff(padded, axis=1)
+    scenario, start = np.nonzero(edges == 1)
+    _, end = np.nonzero(edges == -1)
+    return scenario, start, end
+
+
+def _segment_max(values: np.ndarray, scenario: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """
+    (years, N) 값에서 구간 [start, end)별 최댓값 (np.maximum.reduceat 한 번으로 계산).
+    """
+    years, n = values.shape
+    if len(scenario) == 0:
+        return np.empty(0)
+    # 행 끝에 -inf 열을 붙여 end == years인 구간도 같은 행 안에서 끝나게 함
+    flat = np.full((n, years + 1), -np.inf)
+    flat[:, :years] = values.T
+    flat = flat.ravel()
+    row = scenario * (years + 1)
+    bounds = np.empty(2 * len(scenario), dtype=np.intp)
+    bounds[0::2] = row + start
+    bounds[1::2] = row + end
+    return np.maximum.reduceat(flat, bounds)[0::2]
+
+
+@dataclass
+class _Columns:
+    """
+    crisis_flags / crisis_severity에 넘길 (years, N) 지표 묶음.
+    """
+    unemployment: np.ndarray
+    inflation: np.ndarray
+    growth: np.ndarray
+
+
+def analyze_crises(trajectory, rules: CrisisRules = DEFAULT_CRISIS_RULES, year=None) -> CrisisAnalysis:
+    """
+    궤적 묶음의 위기 이벤트와 집계를 계산.
+    - trajectory: BatchTrajectory 또는 unemployment / inflation / growth 속성이 (years, N) 배열인 객체
+    - year: 연도 배열 (생략하면 trajectory.year, 그것도 없으면 1부터)
+    """
+    unemployment = np.asarray(trajectory.unemployment, dtype=np.float64)
+    if unemployment.ndim == 1:
+        unemployment = unemployment[:, None]
+    years, n = unemployment.shape
+    if year is None:
+        year = getattr(trajectory, "year", None)
+    year = np.arange(1, years + 1, dtype=np.int64) if year is None else np.asarray(year, dtype=np.int64)
+
+    state = _Columns(
+        unemployment=unemployment,
+        inflation=np.asarray(trajectory.inflation, dtype=np.float64).reshape(years, n),
+        growth=np.asarray(trajectory.growth, dtype=np.float64).reshape(years, n),
+    )
+    u_flag, i_flag, g_flag = crisis_flags(state, rules)
+    flags = {"unemployment": u_flag, "inflation": i_flag, "growth": g_flag, "any": u_flag | i_flag | g_flag}
+    severity = crisis_severity(state, rules)
+
+    # 회복 연도 조회용: 인덱스 years는 -1 (기간 끝까지 지속)
+    recovery_lookup = np.append(year, -1)
+
+    parts = []
+    probability, crisis_years, first_onset = {}, {}, {}
+    for code, kind in enumerate(CRISIS_TYPES):
+        flag = flags[kind]
+        scenario, start, end = _runs(flag)
+        parts.append((
+            scenario,
+            np.full(len(scenario), code, dtype=np.int8),
+            year[start],
+            (end - start).astype(np.int64),
+            _segment_max(severity[kind], scenario, start, end),
+            recovery_lookup[end],
+        ))
+
+        probability[kind] = flag.mean(axis=1) if n else np.zeros(years)
+        crisis_years[kind] = flag.sum(axis=0)
+        any_hit = flag.any(axis=0)
+        first_onset[kind] = np.where(any_hit, year[np.argmax(flag, axis=0)] if years else -1, -1)
+
+    events = CrisisEvents(*(np.concatenate(cols) for cols in zip(*parts)))
+    return CrisisAnalysis(
+        events=events,
+        year=year,
+        n_scenarios=n,
+        probability=probability,
+        crisis_years=crisis_years,
+        first_onset=first_onset,
+    )
+
+
+def risk_by_group(analysis: CrisisAnalysis, groups, kind: str = "any") -> Dict[str, np.ndarray]:
+    """
+    시나리오별 그룹 라벨(예: 정책 패키지 이름)로 위기 위험을 집계하고
+    기대 위기 햇수 → 위기 경험 비율 순으로 위험이 낮은 그룹부터 정렬.
+    반환: group, scenarios, ever, expected_crisis_years, mean_duration, mean_peak_severity
+    """
+    groups = np.asarray(groups)
+    if len(groups) != analysis.n_scenarios:
+        raise ValueError(f"그룹 라벨 수({len(groups)})가 시나리오 수({analysis.n_scenarios})와 다릅니다.")
+    labels, code = np.unique(groups, return_inverse=True)
+    code = code.reshape(-1)
+    k = len(labels)
+
+    count = np.bincount(code, minlength=k)
+    ever = np.bincount(code, weights=analysis.first_onset[kind] >= 0, minlength=k) / count
+    crisis_years = np.bincount(code, weights=analysis.crisis_years[kind], minlength=k) / count
+
+    events = analysis.events.of_type(kind)
+    event_code = code[events.scenario]
+    event_count = np.bincount(event_code, minlength=k)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        duration = np.bincount(event_code, weights=events.duration, minlength=k) / event_count
+        peak = np.bincount(event_code, weights=events.peak_severity, minlength=k) / event_count
+    duration = np.where(event_count > 0, duration, 0.0)
+    peak = np.where(event_count > 0, peak, 0.0)
+
+    order = np.lexsort((ever, crisis_years))
+    return {
+        "group": labels[order],
+        "scenarios": count[order],
+        "ever": ever[order],
+        "expected_crisis_years": crisis_years[order],
+        "mean_duration": duration[order],
+        "mean_peak_severity": peak[order],
+    }
+
+
+def combine_analyses(parts) -> CrisisAnalysis:
+    """
+    연속된 시나리오 구간별 분석 결과를 하나로 합친다 (시나리오 번호는 구간 순서대로 이어짐).
+    """
+    parts = list(parts)
+    if not parts:
+        raise ValueError("합칠 분석 결과가 없습니다.")
+    total = sum(part.n_scenarios for part in parts)
+
+    events, offset = [], 0
+    for part in parts:
+        ev = part.events
+        events.append((ev.scenario + offset, ev.kind, ev.onset_year, ev.duration, ev.peak_severity, ev.recovery_year))
+        offset += part.n_scenarios
+
+    probability = {}
+    for kind in CRISIS_TYPES:
+        weighted = np.zeros_like(parts[0].probability[kind])
+        for part in parts:
+            weighted = weighted + part.probability[kind] * part.n_scenarios
+        probability[kind] = weighted / total if total else weighted
+
+    return CrisisAnalysis(
+        events=CrisisEvents(*(np.concatenate(cols) for cols in zip(*events))),
+        year=parts[0].year,
+        n_scenarios=total,
+        probability=probability,
+        crisis_years={kind: np.concatenate([p.crisis_years[kind] for p in parts]) for kind in CRISIS_TYPES},
+        first_onset={kind: np.concatenate([p.first_onset[kind] for p in parts]) for kind in CRISIS_TYPES},
+    )
+
+
+def analyze_store(store, rules: CrisisRules = DEFAULT_CRISIS_RULES) -> CrisisAnalysis:
+    """
+    ensemble_store.EnsembleStore를 청크 단위로 분석 (저장소 전체를 메모리에 올리지 않음).
+    """
+    parts = [
+        analyze_crises(_Columns(cols["unemployment"], cols["inflation"], cols["growth"]), rules, year=store.year)
+        for _, cols in store.iter_chunks()
+    ]
+    if not parts:
+        empty = np.empty((store.n_years, 0))
+        return analyze_crises(_Columns(empty, empty, empty), rules, year=store.year)
+    return combine_analyses(parts)
@@ -0,0 +1,355 @@
+"""
+정책 공간의 위기 악순환 경계 지도 (적응형 해상도).
+
+2~3개 정책 변수로 이루어진 상자를 쿼드트리(2차원)·옥트리(3차원)로 나누며
+셀의 꼭짓점이 모두 같은 판정(악순환 / 아님)이면 그 셀은 더 나누지 않고,
+판정이 섞인 셀만 max_depth까지 쪼갠다. 균일 격자로 (2^max_depth + 1)^d 점을 돌리는 대신
+경계 근처 점만 평가하므로 평가 횟수가 경계 길이(면적)에 비례한다.
+
+- 점 판정: years년 시뮬레이션 후 마지막 persist년 동안 위기 트리거(stop_rules.in_crisis)가
+  계속 걸려 있으면 악순환
+- 꼭짓점은 해상도 2^max_depth의 정수 격자 위에 있어 이웃 셀끼리 공유되고, 한 번 평가한 점은 다시 돌리지 않는다
+- 같은 깊이의 새 점은 모드를 섞어 (시나리오별 모드 배열) 한 번의 배치 엔진 실행으로 평가
+- 한계: base_depth 셀보다 작아 꼭짓점에 걸리지 않는 섬은 놓칠 수 있다
+"""
+from dataclasses import dataclass
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from data_model import EconomicState, PolicyInput, PolicyBatch, POLICY_FIELDS
+from engine_params import MODES
+from engine_registry import engine_fingerprint
+from policy_optimizer import DEFAULT_BOUNDS
+from sim_cache import SimulationCache
+from simulation import as_state_batch, resolve_engine
+from stop_rules import in_crisis
+
+
+# 셀 판정
+SAFE = 0
+CRISIS = 1
+BOUNDARY = -1    # max_depth에서도 꼭짓점 판정이 섞인 셀
+
+CACHE_SIZE = 16
+
+_cache = SimulationCache(max_entries=CACHE_SIZE, max_bytes=None)
+
+
+# -------------------------------------------------------
+# 점 판정
+# -------------------------------------------------------
+def crisis_spiral(states, policies, mode, years: int, persist: int = 5, engine="v1") -> np.ndarray:
+    """
+    시나리오별 위기 악순환 여부: years년 중 마지막 persist년 연속 위기 상태인지.
+    궤적은 저장하지 않고 연속 위기 햇수만 센다.
+    """
+    update_batch = resolve_engine(engine).update_one_year_batch
+    states = as_state_batch(states)
+    streak = None
+    for _ in range(years):
+        states = update_batch(states, policies, mode)
+        hit = np.asarray(in_crisis(states))
+        streak = np.where(hit, (0 if streak is None else streak) + 1, 0)
+    if streak is None:
+        return np.zeros(len(policies), dtype=bool)
+    return streak >= min(persist, years)
+
+
+# -------------------------------------------------------
+# 결과
+# -------------------------------------------------------
+@dataclass
+class BoundaryMap:
+    """
+    적응형 경계 지도.
+    - fields / lower / upper: 정책 변수와 범위
+    - resolution: 가장 고운 격자의 축당 셀 수 (2^max_depth)
+    - cell_*: 잎 셀 (모드 번호, 정수 격자 위 아래쪽 꼭짓점, 깊이, 판정 SAFE / CRISIS / BOUNDARY)
+    - point_*: 평가한 점 (모드 번호, 정책 값 (k, d), 악순환 여부)
+    - evaluations: 시뮬레이션한 점 수 (점마다 years년)
+    """
+    fields: Tuple[str, ...]
+    lower: np.ndarray
+    upper: np.ndarray
+    modes: Tuple[str, ...]
+    engine: str
+    years: int
+    persist: int
+    max_depth: int
+    cell_mode: np.ndarray
+    cell_corner: np.ndarray
+    cell_level: np.ndarray
+    cell_label: np.ndarray
+    point_mode: np.ndarray
+    point_value: np.ndarray
+    point_crisis: np.ndarray
+    evaluations: int
+
+    @property
+    def resolution(self) -> int:
+        return 2 ** self.max_depth
+
+    @property
+    def uniform_evaluations(self) -> int:
+        """
+        같은 해상도의 균일 격자에 필요한 점 수.
+        """
+        return len(self.modes) * (self.resolution + 1) ** len(self.fields)
+
+    def _mode_index(self, mode) -> int:
+        return self.modes.index(mode) if isinstance(mode, str) else int(mode)
+
+    def _cells(self, mode, label=None) -> np.ndarray:
+        mask = self.cell_mode == self._mode_index(mode)
+        if label is not None:
+            mask &= self.cell_label == label
+        return np.flatnonzero(mask)
+
+    def _to_value(self, lattice: np.ndarray) -> np.ndarray:
+        return self.lower + (self.upper - self.lower) * lattice / self.resolution
+
+    def boundary(self, mode) -> np.ndarray:
+        """
+        경계 셀 중심의 정책 값 (k, d).
+        """
+        rows = self._cells(mode, BOUNDARY)
+        size = (self.resolution >> self.cell_level[rows])[:, None]
+        return self._to_value(self.cell_corner[rows] + size / 2)
+
+    def crisis_share(self, mode) -> float:
+        """
+        상자 부피 중 악순환 영역의 비율 (경계 셀은 절반으로 계산).
+        """
+        rows = self._cells(mode)
+        volume = (0.5 ** self.cell_level[rows].astype(np.float64)) ** len(self.fields)
+        weight = np.where(self.cell_label[rows] == CRISIS, 1.0, np.where(self.cell_label[rows] == BOUNDARY, 0.5, 0.0))
+        return float((volume * weight).sum())
+
+    def axis_values(self, depth: int = None):
+        """
+        to_grid 격자의 축별 셀 중심 값 (fields 순서).
+        """
+        depth = self.max_depth if depth is None else depth
+        n = 2 ** depth
+        return [lo + (hi - lo) * (np.arange(n) + 0.5) / n for lo, hi in zip(self.lower, self.upper)]
+
+    def to_grid(self, mode, depth: int = None) -> np.ndarray:
+        """
+        잎 셀을 해상도 2^depth 격자에 칠한 배열 (악순환 1, 아님 0, 경계 0.5).
+        축 순서는 fields의 역순이라 2차원이면 (y, x)로 plot_heatmap에 바로 넘길 수 있다.
+        """
+        depth = self.max_depth if depth is None else min(depth, self.max_depth)
+        d = len(self.fields)
+        shift = self.max_depth - depth
+        grid = np.full((2 ** depth,) * d, np.nan)
+        rows = self._cells(mode)
+        value = np.where(self.cell_label[rows] == BOUNDARY, 0.5, self.cell_label[rows].astype(np.float64))
+        # 거친 셀부터 칠해 고운 셀이 덮어쓰게 함
+        for level in np.unique(self.cell_level[rows]):
+            sel = self.cell_level[rows] == level
+            extent = max((self.resolution >> int(level)) >> shift, 1)
+            start = self.cell_corner[rows][sel] >> shift
+            offsets = np.stack(np.meshgrid(*[np.arange(extent)] * d, indexing="ij"), axis=-1).reshape(-1, d)
+            idx = (start[:, None, :] + offsets[None, :, :]).reshape(-1, d)
+            grid[tuple(idx[:, ::-1].T)] = np.repeat(value[sel], len(offsets))
+        return grid
+
+    def to_dataframe(self):
+        """
+        경계 셀 표 (모드, 셀 중심의 정책 값, 깊이).
+        """
+        import pandas as pd
+
+        rows = np.flatnonzero(self.cell_label == BOUNDARY)
+        size = (self.resolution >> self.cell_level[rows])[:, None]
+        center = self._to_value(self.cell_corner[rows] + size / 2)
+        return pd.DataFrame({
+            "mode": np.asarray(self.modes, dtype=object)[self.cell_mode[rows]],
+            **{name: center[:, j] for j, name in enumerate(self.fields)},
+            "level": self.cell_level[rows],
+        })
+
+
+# -------------------------------------------------------
+# 적응형 세분
+# -------------------------------------------------------
+class _Evaluator:
+    """
+    정수 격자 점 (모드 번호, 좌표)의 판정을 키 정렬 배열에 모아 두고, 새 점만 배치로 평가.
+    """
+
+    def __init__(self, state, policy, fields, lower, upper, modes, years, persist, engine, resolution, chunk_size):
+        self.state, self.fields, self.modes = state, fields, modes
+        self.lower, self.upper = lower, upper
+        self.years, self.persist, self.engine = years, persist, engine
+        self.resolution, self.chunk_size = resolution, chunk_size
+        self.fixed = {name: getattr(policy, name) for name in POLICY_FIELDS if name not in fields}
+        self.keys = np.empty(0, dtype=np.int64)
+        self.labels = np.empty(0, dtype=bool)
+
+    def encode(self, mode: np.ndarray, lattice: np.ndarray) -> np.ndarray:
+        key = mode.astype(np.int64)
+        for j in range(lattice.shape[1]):
+            key = key * (self.resolution + 1) + lattice[:, j]
+        return key
+
+    def decode(self, key: np.ndarray):
+        d = len(self.fields)
+        lattice = np.empty((len(key), d), dtype=np.int64)
+        for j in range(d - 1, -1, -1):
+            key, lattice[:, j] = np.divmod(key, self.resolution + 1)
+        return key, lattice
+
+    def value(self, lattice: np.ndarray) -> np.ndarray:
+        return self.lower + (self.upper - self.lower) * lattice / self.resolution
+
+    def lookup(self, keys: np.ndarray) -> np.ndarray:
+        new = np.setdiff1d(keys, self.keys)
+        if len(new):
+            self.evaluate(new)
+        return self.labels[np.searchsorted(self.keys, keys)]
+
+    def evaluate(self, keys: np.ndarray):
+        mode, lattice = self.decode(keys)
+        values = self.value(lattice)
+        labels = np.empty(len(keys), dtype=bool)
+        mode_names = np.asarray(self.modes, dtype=object)
+        for start in range(0, len(keys), self.chunk_size):
+            sl = slice(start, start + self.chunk_size)
+            policies = PolicyBatch(**self.fixed, **{name: values[sl, j] for j, name in enumerate(self.fields)})
+            modes = mode_names[mode[sl]]
+            labels[sl] = crisis_spiral(self.state, policies, modes if len(self.modes) > 1 else self.modes[0],
+                                       self.years, self.persist, self.engine)
+        order = np.argsort(np.concatenate([self.keys, keys]), kind="stable")
+        self.keys = np.concatenate([self.keys, keys])[order]
+        self.labels = np.concatenate([self.labels, labels])[order]
+
+
+def _near(ev: _Evaluator, cell_mode, cell, mixed, size) -> np.ndarray:
+    """
+    같은 깊이에서 면을 맞댄 이웃 셀 중 판정이 섞인 셀이 있는지 (경계가 꼭짓점 사이로 빠져나가
+    꼭짓점 판정이 같아진 셀을 잡기 위함).
+    """
+    targets = ev.encode(cell_mode[mixed], cell[mixed])
+    near = np.zeros(len(cell), dtype=bool)
+    for j in range(cell.shape[1]):
+        for sign in (-1, 1):
+            neighbor = cell.copy()
+            neighbor[:, j] += sign * size
+            inside = (neighbor[:, j] >= 0) & (neighbor[:, j] < ev.resolution)
+            near[inside] |= np.isin(ev.encode(cell_mode[inside], neighbor[inside]), targets)
+    return near
+
+
+def _run_map(state, policy, fields, lower, upper, modes, years, persist, engine, base_depth, max_depth, halo,
+             chunk_size):
+    d = len(fields)
+    resolution = 2 ** max_depth
+    ev = _Evaluator(state, policy, fields, lower, upper, modes, years, persist, engine, resolution, chunk_size)
+    corners = np.stack(np.meshgrid(*[np.arange(2)] * d, indexing="ij"), axis=-1).reshape(-1, d)
+
+    # base_depth 균일 격자의 셀에서 출발 (모드마다)
+    n_base = 2 ** base_depth
+    base = np.stack(np.meshgrid(*[np.arange(n_base)] * d, indexing="ij"), axis=-1).reshape(-1, d)
+    size = resolution >> base_depth
+    cell = np.tile(base * size, (len(modes), 1))
+    cell_mode = np.repeat(np.arange(len(modes)), len(base))
+
+    leaves = []
+    for level in range(base_depth, max_depth + 1):
+        size = resolution >> level
+        points = (cell[:, None, :] + corners[None, :, :] * size).reshape(-1, d)
+        keys = ev.encode(np.repeat(cell_mode, len(corners)), points)
+        labels = ev.lookup(keys).reshape(len(cell), len(corners))
+        mixed = labels.any(axis=1) & ~labels.all(axis=1)
+
+        if level == max_depth:
+            split = np.zeros(len(cell), dtype=bool)
+            leaves.append((cell_mode[mixed], cell[mixed], np.full(mixed.sum(), level), np.full(mixed.sum(), BOUNDARY)))
+        else:
+            split = mixed | (_near(ev, cell_mode, cell, mixed, size) if halo else False)
+        same = ~mixed & ~split
+        leaves.append((cell_mode[same], cell[same], np.full(same.sum(), level), np.where(labels[same, 0], CRISIS, SAFE)))
+        if level == max_depth:
+            break
+        # 판정이 섞인 셀 (halo면 그 이웃 셀도)만 2^d개로 나눈다
+        half = size // 2
+        cell = (cell[split][:, None, :] + corners[None, :, :] * half).reshape(-1, d)
+        cell_mode = np.repeat(cell_mode[split], len(corners))
+        if not len(cell):
+            break
+
+    point_mode, point_lattice = ev.decode(ev.keys)
+    return BoundaryMap(
+        fields=tuple(fields),
+        lower=lower,
+        upper=upper,
+        modes=tuple(modes),
+        engine=engine if isinstance(engine, str) else getattr(engine, "__name__", str(engine)),
+        years=years,
+        persist=persist,
+        max_depth=max_depth,
+        cell_mode=np.concatenate([part[0] for part in leaves]).astype(np.int8),
+        cell_corner=np.concatenate([part[1] for part in leaves]).astype(np.int64),
+        cell_level=np.concatenate([part[2] for part in leaves]).astype(np.int64),
+        cell_label=np.concatenate([part[3] for part in leaves]).astype(np.int8),
+        point_mode=point_mode.astype(np.int8),
+        point_value=ev.value(point_lattice),
+        point_crisis=ev.labels.copy(),
+        evaluations=len(ev.keys),
+    )
+
+
+def crisis_boundary_map(
+    state: EconomicState,
+    policy: PolicyInput,
+    fields: Sequence[str],
+    bounds: Dict[str, Tuple[float, float]] = None,
+    modes: Sequence[str] = MODES,
+    years: int = 20,
+    persist: int = 5,
+    engine: str = "v1",
+    base_depth: int = 3,
+    max_depth: int = 9,
+    halo: bool = True,
+    chunk_size: int = 50_000,
+    use_cache: bool = True,
+) -> BoundaryMap:
+    """
+    fields(정책 변수 2~3개)의 범위에서 모드별 위기 악순환 영역과 경계를 적응형으로 찾는다.
+    - bounds: 변수별 (최솟값, 최댓값) (생략하면 policy_optimizer.DEFAULT_BOUNDS)
+    - policy: fields 이외 변수의 고정 값
+    - base_depth: 처음 균일하게 나눌 깊이 (이보다 작은 섬은 놓칠 수 있음)
+    - max_depth: 최대 깊이 (해상도 2^max_depth)
+    - halo: 판정이 섞인 셀의 이웃 셀도 나눈다 (평가 횟수가 늘지만 가는 영역을 덜 놓침)
+    """
+    fields = tuple(fields)
+    if len(fields) not in (2, 3):
+        raise ValueError(f"정책 변수는 2개 또는 3개여야 합니다: {fields}")
+    for name in fields:
+        if name not in POLICY_FIELDS:
+            raise ValueError(f"PolicyInput에 없는 변수: {name}")
+    if len(set(fields)) != len(fields):
+        raise ValueError("정책 변수가 중복되었습니다.")
+    if not 0 <= base_depth <= max_depth:
+        raise ValueError("0 ≤ base_depth ≤ max_depth 이어야 합니다.")
+    modes = tuple(modes)
+    if not modes:
+        raise ValueError("모드를 하나 이상 선택하세요.")
+    bounds = {**DEFAULT_BOUNDS, **(bounds or {})}
+    lower = np.array([bounds[name][0] for name in fields], dtype=np.float64)
+    upper = np.array([bounds[name][1] for name in fields], dtype=np.float64)
+
+    args = (state, policy, fields, lower, upper, modes, years, persist, engine, base_depth, max_depth, halo, chunk_size)
+    if use_cache:
+        fixed = tuple((name, getattr(policy, name)) for name in POLICY_FIELDS if name not in fields)
+        # 엔진은 이름 대신 구성 해시로 (계수 세트를 바꿔 다시 등록하면 새로 계산)
+        key = ("crisis_map", engine_fingerprint(engine), modes, state, fixed, fields, tuple(lower), tuple(upper),
+               years, persist, base_depth, max_depth, halo)
+        return _cache.get_or_compute(key, lambda: _run_map(*args))
+    return _run_map(*args)
+
+
+def clear_cache():
+    _cache.clear()
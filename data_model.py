@@ -1,7 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class EconomicState:
     """
     한 시점의 거시 경제 상태.
@@ -28,8 +30,11 @@ class EconomicState:
             "growth": self.growth,
         }
 
+    def freeze(self) -> "FrozenEconomicState":
+        return FrozenEconomicState(*(getattr(self, name) for name in STATE_FIELDS))
 
-@dataclass
+
+@dataclass(slots=True)
 class PolicyInput:
     """
     정책 및 외생 변수 입력.
@@ -55,4 +60,323 @@ class PolicyInput:
     corporate_investment: float
     global_demand: float
     oil_price: float
-    productivity: float
\ No newline at end of file
+    productivity: float
+
+    def freeze(self) -> "FrozenPolicyInput":
+        return FrozenPolicyInput(*(getattr(self, name) for name in POLICY_FIELDS))
+
+
+# -------------------------------------------------------
+# 불변 버전 (해시 가능: 캐시 키·집합 원소로 쓰거나 여러 곳에서 공유할 때)
+# -------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class FrozenEconomicState:
+    """
+    EconomicState의 불변 버전. 엔진에 EconomicState 대신 그대로 넘길 수 있다.
+    """
+    gdp: float
+    inflation: float
+    unemployment: float
+    growth: float
+
+    to_series = EconomicState.to_series
+
+    def thaw(self) -> EconomicState:
+        return EconomicState(*(getattr(self, name) for name in STATE_FIELDS))
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenPolicyInput:
+    """
+    PolicyInput의 불변 버전.
+    """
+    interest_rate: float
+    corporate_tax: float
+    electricity_cost: float
+    exchange_rate: float
+
+    government_spending_ratio: float
+    consumer_confidence: float
+    corporate_investment: float
+    global_demand: float
+    oil_price: float
+    productivity: float
+
+    def thaw(self) -> PolicyInput:
+        return PolicyInput(*(getattr(self, name) for name in POLICY_FIELDS))
+
+
+STATE_FIELDS = tuple(f.name for f in fields(EconomicState))
+POLICY_FIELDS = tuple(f.name for f in fields(PolicyInput))
+
+# 구조화 배열(레코드) 레이아웃: 필드당 float64 하나
+STATE_DTYPE = np.dtype([(name, np.float64) for name in STATE_FIELDS])
+POLICY_DTYPE = np.dtype([(name, np.float64) for name in POLICY_FIELDS])
+
+
+# -------------------------------------------------------
+# 레코드 뷰 (읽기 전용, 복사 없음)
+# -------------------------------------------------------
+def _field(name: str):
+    def get(self):
+        return float(self._source[name][self._index])
+
+    return property(get)
+
+
+class EconomicStateView:
+    """
+    STATE_DTYPE 구조화 배열(또는 지표별 열을 [이름]으로 돌려주는 객체)의
+    한 행을 복사 없이 EconomicState처럼 읽는 읽기 전용 뷰.
+    엔진의 update_one_year에 EconomicState 대신 그대로 넘길 수 있다.
+    """
+    __slots__ = ("_source", "_index")
+
+    gdp = _field("gdp")
+    inflation = _field("inflation")
+    unemployment = _field("unemployment")
+    growth = _field("growth")
+
+    def __init__(self, source, index: int):
+        self._source = source
+        self._index = index
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in STATE_FIELDS)
+        return f"EconomicStateView({values})"
+
+    def to_state(self) -> EconomicState:
+        return EconomicState(*(getattr(self, name) for name in STATE_FIELDS))
+
+    def to_series(self, year: int):
+        return {"year": year, **{name: getattr(self, name) for name in STATE_FIELDS}}
+
+
+class PolicyInputView:
+    """
+    POLICY_DTYPE 구조화 배열의 한 행을 복사 없이 PolicyInput처럼 읽는 읽기 전용 뷰.
+    """
+    __slots__ = ("_source", "_index")
+
+    interest_rate = _field("interest_rate")
+    corporate_tax = _field("corporate_tax")
+    electricity_cost = _field("electricity_cost")
+    exchange_rate = _field("exchange_rate")
+
+    government_spending_ratio = _field("government_spending_ratio")
+    consumer_confidence = _field("consumer_confidence")
+    corporate_investment = _field("corporate_investment")
+    global_demand = _field("global_demand")
+    oil_price = _field("oil_price")
+    productivity = _field("productivity")
+
+    def __init__(self, source, index: int):
+        self._source = source
+        self._index = index
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in POLICY_FIELDS)
+        return f"PolicyInputView({values})"
+
+    def to_policy(self) -> PolicyInput:
+        return PolicyInput(*(getattr(self, name) for name in POLICY_FIELDS))
+
+
+def states_to_records(states) -> np.ndarray:
+    """
+    EconomicState 목록을 STATE_DTYPE 구조화 배열로 변환.
+    """
+    return np.array([tuple(getattr(s, name) for name in STATE_FIELDS) for s in states], dtype=STATE_DTYPE)
+
+
+def policies_to_records(policies) -> np.ndarray:
+    """
+    PolicyInput 목록을 POLICY_DTYPE 구조화 배열로 변환.
+    """
+    return np.array([tuple(getattr(p, name) for name in POLICY_FIELDS) for p in policies], dtype=POLICY_DTYPE)
+
+
+def _as_column(values) -> np.ndarray:
+    return np.atleast_1d(np.asarray(values, dtype=np.float64))
+
+
+@dataclass
+class StateBatch:
+    """
+    시나리오 N개의 경제 상태를 지표별 배열로 묶은 구조 (struct-of-arrays).
+    각 필드는 길이 N의 float64 배열이며, i번째 원소가 i번째 시나리오의 값.
+    """
+    gdp: np.ndarray
+    inflation: np.ndarray
+    unemployment: np.ndarray
+    growth: np.ndarray
+
+    def __post_init__(self):
+        for name in STATE_FIELDS:
+            setattr(self, name, _as_column(getattr(self, name)))
+
+    def __len__(self):
+        return len(self.gdp)
+
+    @classmethod
+    def from_states(cls, states):
+        states = list(states)
+        return cls(**{name: [getattr(s, name) for s in states] for name in STATE_FIELDS})
+
+    @classmethod
+    def from_records(cls, records: np.ndarray):
+        """
+        STATE_DTYPE 구조화 배열의 필드를 복사 없이 열로 사용.
+        """
+        return cls(**{name: records[name] for name in STATE_FIELDS})
+
+    def to_states(self):
+        columns = [getattr(self, name).tolist() for name in STATE_FIELDS]
+        return [EconomicState(*row) for row in zip(*columns)]
+
+
+@dataclass
+class PolicyBatch:
+    """
+    시나리오 N개의 정책 입력을 변수별 배열로 묶은 구조 (struct-of-arrays).
+    길이 1인 필드는 모든 시나리오에 브로드캐스트된다.
+    """
+    interest_rate: np.ndarray
+    corporate_tax: np.ndarray
+    electricity_cost: np.ndarray
+    exchange_rate: np.ndarray
+
+    government_spending_ratio: np.ndarray
+    consumer_confidence: np.ndarray
+    corporate_investment: np.ndarray
+    global_demand: np.ndarray
+    oil_price: np.ndarray
+    productivity: np.ndarray
+
+    def __post_init__(self):
+        for name in POLICY_FIELDS:
+            setattr(self, name, _as_column(getattr(self, name)))
+
+    def __len__(self):
+        return max(len(getattr(self, name)) for name in POLICY_FIELDS)
+
+    @classmethod
+    def from_policies(cls, policies):
+        policies = list(policies)
+        return cls(**{name: [getattr(p, name) for p in policies] for name in POLICY_FIELDS})
+
+    @classmethod
+    def from_records(cls, records: np.ndarray):
+        """
+        POLICY_DTYPE 구조화 배열의 필드를 복사 없이 열로 사용.
+        """
+        return cls(**{name: records[name] for name in POLICY_FIELDS})
+
+    @classmethod
+    def from_policy(cls, policy: PolicyInput):
+        """
+        단일 정책을 길이 1 배치로 변환 (전체 시나리오에 공통 적용).
+        """
+        return cls(**{name: getattr(policy, name) for name in POLICY_FIELDS})
+
+    def to_policies(self):
+        n = len(self)
+        columns = [np.broadcast_to(getattr(self, name), (n,)).tolist() for name in POLICY_FIELDS]
+        return [PolicyInput(*row) for row in zip(*columns)]
+
+
+# -------------------------------------------------------
+# 연도별 궤적 버퍼
+# -------------------------------------------------------
+class TrajectoryBuffer:
+    """
+    연도별 경제 상태를 타입이 정해진 열 배열(year: int64, 지표: float64)에 누적하는 버퍼.
+    - 용량이 차면 두 배로 늘려 append가 평균 O(1)
+    - 연도당 EconomicState / dict 객체를 만들지 않음 (1년 = 40바이트)
+    - to_dataframe()은 열 배열을 복사하지 않고 감싼다
+    """
+
+    def __init__(self, capacity: int = 64):
+        capacity = max(int(capacity), 1)
+        self._year = np.empty(capacity, dtype=np.int64)
+        self._columns = {name: np.empty(capacity) for name in STATE_FIELDS}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._year)
+
+    def _reserve(self, needed: int):
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, 2 * self.capacity)
+        year = np.empty(capacity, dtype=np.int64)
+        year[:self._size] = self._year[:self._size]
+        self._year = year
+        for name, col in self._columns.items():
+            grown = np.empty(capacity)
+            grown[:self._size] = col[:self._size]
+            self._columns[name] = grown
+
+    def append(self, state, year: int = None):
+        """
+        한 해의 상태를 추가. year를 생략하면 마지막 연도 + 1 (첫 해는 1).
+        """
+        if year is None:
+            year = int(self._year[self._size - 1]) + 1 if self._size else 1
+        self._reserve(self._size + 1)
+        i = self._size
+        self._year[i] = year
+        for name, col in self._columns.items():
+            col[i] = getattr(state, name)
+        self._size = i + 1
+
+    def extend(self, year, gdp, inflation, unemployment, growth):
+        """
+        여러 해를 열 배열로 한 번에 추가 (예: SimulationResult의 열).
+        """
+        year = np.asarray(year, dtype=np.int64)
+        n = len(year)
+        self._reserve(self._size + n)
+        end = self._size + n
+        self._year[self._size:end] = year
+        for name, values in zip(STATE_FIELDS, (gdp, inflation, unemployment, growth)):
+            self._columns[name][self._size:end] = values
+        self._size = end
+
+    def clear(self):
+        self._size = 0
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """
+        열 이름("year", "gdp", ...)으로 현재 길이만큼의 뷰를 반환 (복사 없음).
+        """
+        if name == "year":
+            return self._year[:self._size]
+        return self._columns[name][:self._size]
+
+    def state(self, index: int) -> EconomicStateView:
+        """
+        index번째 해의 상태 뷰 (index < 0이면 뒤에서부터).
+        버퍼가 커져도 최신 열을 읽으므로 유효하다.
+        """
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("TrajectoryBuffer 범위를 벗어났습니다.")
+        return EconomicStateView(self, index)
+
+    def columns(self):
+        return {"year": self["year"], **{name: self[name] for name in STATE_FIELDS}}
+
+    def to_dataframe(self):
+        """
+        현재 열 배열 뷰를 복사 없이 감싼 DataFrame.
+        (이후 append로 버퍼가 재할당되면 DataFrame은 이전 데이터를 계속 가리킴)
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.columns(), copy=False)
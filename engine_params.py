@@ -0,0 +1,225 @@
+import json
+from dataclasses import dataclass, fields, is_dataclass, replace
+
+import numpy as np
+
+from data_model import StateBatch, PolicyBatch, STATE_FIELDS, POLICY_FIELDS
+
+
+# -------------------------------------------------------
+# 모드별 계수 스케일
+# -------------------------------------------------------
+@dataclass(frozen=True)
+class ModeScales:
+    """
+    모드별 계수 배율.
+    - shock: 정책·외생 변수 충격의 크기
+    - feedback: 지표 간 피드백 강도
+    - crisis_trigger: 위기 트리거 발동 시 충격 크기
+    - potential: 잠재성장률 민감도
+    - expectation: 기대 인플레이션 민감도 (v2 전용)
+    """
+    shock: float = 1.0
+    feedback: float = 1.0
+    crisis_trigger: float = 1.0
+    potential: float = 1.0
+    expectation: float = 1.0
+
+
+MODES = ("안정형", "현실형", "위기형")
+
+MODE_SCALES = {
+    "안정형": ModeScales(shock=0.5, feedback=0.6, crisis_trigger=0.5, potential=0.7, expectation=0.5),
+    "현실형": ModeScales(shock=1.0, feedback=1.0, crisis_trigger=1.0, potential=1.0, expectation=1.0),
+    "위기형": ModeScales(shock=1.8, feedback=2.0, crisis_trigger=2.0, potential=1.5, expectation=1.5),
+}
+
+# 알 수 없는 모드는 현실형과 같은 배율
+DEFAULT_MODE_SCALES = ModeScales()
+
+
+def mode_scales(mode: str) -> ModeScales:
+    return MODE_SCALES.get(mode, DEFAULT_MODE_SCALES)
+
+
+# -------------------------------------------------------
+# 엔진 공통 계수 블록
+# -------------------------------------------------------
+@dataclass(frozen=True)
+class NeutralValues:
+    """
+    정책·외생 변수의 기준값 (편차 계산의 0점).
+    """
+    interest: float = 2.0
+    corp_tax: float = 25.0
+    elec_cost: float = 100.0
+    fx: float = 1200.0
+
+    gov_ratio: float = 20.0
+    confidence: float = 100.0
+    invest: float = 100.0
+    global_demand: float = 100.0
+    oil: float = 70.0
+    productivity: float = 100.0
+
+
+@dataclass(frozen=True)
+class PotentialGrowth:
+    """
+    잠재성장률 = base + Σ w × (지수 편차 / 10), [lower, upper]로 제한.
+    """
+    base: float = 2.5
+    w_productivity: float = 0.02
+    w_investment: float = 0.03
+    w_global: float = 0.02
+    lower: float = 0.5
+    upper: float = 6.0
+
+    def scaled(self, scale: float) -> "PotentialGrowth":
+        return replace(
+            self,
+            w_productivity=scale * self.w_productivity,
+            w_investment=scale * self.w_investment,
+            w_global=scale * self.w_global,
+        )
+
+
+@dataclass(frozen=True)
+class Feedback:
+    """
+    지표 간 피드백 계수 (feedback_scale 적용 전).
+    """
+    growth_from_unemp: float = -0.05
+    growth_from_infl: float = -0.06
+    growth_from_growth: float = -0.04
+    infl_from_fx: float = 0.30
+    infl_from_unemp: float = -0.12
+    unemp_from_growth: float = -0.20
+
+    def scaled(self, scale: float) -> "Feedback":
+        return Feedback(*(getattr(self, f.name) * scale for f in fields(self)))
+
+
+@dataclass(frozen=True)
+class CrisisRules:
+    """
+    위기 트리거 임계값과 발동 시 충격 크기 (crisis_trigger_scale 적용 전).
+    - 실업률 > unemployment_threshold
+    - 물가 > inflation_threshold
+    - 성장률 < growth_threshold
+    """
+    unemployment_threshold: float = 12.0
+    inflation_threshold: float = 6.0
+    growth_threshold: float = -1.0
+
+    unemp_growth_penalty: float = 0.5
+    unemp_unemp_spike: float = 0.3
+    infl_growth_penalty: float = 0.4
+    infl_infl_spike: float = 0.5
+    growth_growth_penalty: float = 0.6
+    growth_unemp_spike: float = 0.4
+
+    def scaled(self, scale: float) -> "CrisisRules":
+        return replace(
+            self,
+            unemp_growth_penalty=self.unemp_growth_penalty * scale,
+            unemp_unemp_spike=self.unemp_unemp_spike * scale,
+            infl_growth_penalty=self.infl_growth_penalty * scale,
+            infl_infl_spike=self.infl_infl_spike * scale,
+            growth_growth_penalty=self.growth_growth_penalty * scale,
+            growth_unemp_spike=self.growth_unemp_spike * scale,
+        )
+
+
+# -------------------------------------------------------
+# 선형 블록 계산
+# -------------------------------------------------------
+def linear(weights, values, start=None):
+    """
+    Σ w_i × v_i 를 왼쪽부터 순서대로 누적 (스칼라/NumPy 배열 모두 지원).
+    BLAS 내적은 합산 순서가 달라 결과가 미세하게 바뀌므로 사용하지 않는다.
+    """
+    it = iter(zip(weights, values))
+    if start is None:
+        w, v = next(it)
+        total = w * v
+    else:
+        total = start
+    for w, v in it:
+        total = total + w * v
+    return total
+
+
+# -------------------------------------------------------
+# 계수 세트 저장 / 불러오기
+# -------------------------------------------------------
+def coefficients_to_dict(coefficients) -> dict:
+    out = {}
+    for f in fields(coefficients):
+        value = getattr(coefficients, f.name)
+        out[f.name] = coefficients_to_dict(value) if is_dataclass(value) else value
+    return out
+
+
+def coefficients_from_dict(cls, data: dict):
+    """
+    dict(부분 지정 가능)로 계수 세트를 생성. 지정하지 않은 값은 기본값 사용.
+    """
+    unknown = set(data) - {f.name for f in fields(cls)}
+    if unknown:
+        raise ValueError(f"{cls.__name__}에 없는 계수: {sorted(unknown)}")
+
+    base = cls()
+    values = {}
+    for name, value in data.items():
+        current = getattr(base, name)
+        if is_dataclass(current):
+            values[name] = coefficients_from_dict(type(current), value)
+        else:
+            values[name] = float(value)
+    return replace(base, **values)
+
+
+def save_coefficients(coefficients, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(coefficients_to_dict(coefficients), f, ensure_ascii=False, indent=2)
+
+
+def load_coefficients(cls, path: str):
+    with open(path, encoding="utf-8") as f:
+        return coefficients_from_dict(cls, json.load(f))
+
+
+# -------------------------------------------------------
+# 시나리오별 모드가 섞인 배치 실행
+# -------------------------------------------------------
+def run_by_mode(kernel, params_for, states: StateBatch, policies: PolicyBatch, mode) -> StateBatch:
+    """
+    mode가 문자열이면 kernel을 한 번 호출하고, 시나리오별 모드 배열이면
+    모드별로 시나리오를 나눠 각 모드의 파라미터로 실행한 뒤 원래 순서로 합친다.
+    """
+    if isinstance(mode, str):
+        return kernel(states, policies, params_for(mode))
+
+    modes = np.atleast_1d(np.asarray(mode))
+    uniq, inverse = np.unique(modes, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    if len(uniq) == 1:
+        return kernel(states, policies, params_for(str(uniq[0])))
+
+    n = max(len(states), len(policies), len(modes))
+    state_cols = {name: np.broadcast_to(getattr(states, name), (n,)) for name in STATE_FIELDS}
+    policy_cols = {name: np.broadcast_to(getattr(policies, name), (n,)) for name in POLICY_FIELDS}
+    inverse = np.broadcast_to(inverse, (n,))
+
+    out = {name: np.empty(n) for name in STATE_FIELDS}
+    for code, m in enumerate(uniq):
+        idx = np.flatnonzero(inverse == code)
+        result = kernel(
+            StateBatch(**{name: col[idx] for name, col in state_cols.items()}),
+            PolicyBatch(**{name: col[idx] for name, col in policy_cols.items()}),
+            params_for(str(m)),
+        )
+        for name in STATE_FIELDS:
+            out[name][idx] = getattr(result, name)
+    return StateBatch(**out)
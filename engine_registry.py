@@ -0,0 +1,206 @@
+import importlib
+import threading
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, FrozenSet, List
+
+# 엔진 기능
+SCALAR = "scalar"          # update_one_year(state, policy, mode)
+BATCH = "batch"            # update_one_year_batch(states, policies, mode)
+STOCHASTIC = "stochastic"  # 배치 경로 기반 몬테카를로 실행 지원
+
+
+@dataclass(frozen=True)
+class EngineInfo:
+    """
+    등록된 엔진 정보.
+    - factory: 엔진 모듈(또는 같은 함수를 가진 객체)을 돌려주는 함수. 처음 사용할 때 한 번만 호출
+    """
+    name: str
+    version: str
+    label: str
+    capabilities: FrozenSet[str]
+    factory: Callable[[], object]
+
+    def supports(self, capability: str) -> bool:
+        return capability in self.capabilities
+
+
+_registry = {}
+_loaded = {}
+_fingerprints = {}
+_lock = threading.Lock()
+
+
+def register_engine(name: str, version: str, capabilities, factory: Callable[[], object], label: str = None):
+    """
+    엔진을 등록. 같은 이름으로 다시 등록하면 교체된다.
+    factory는 get_engine으로 처음 요청될 때까지 호출되지 않는다.
+    """
+    info = EngineInfo(
+        name=name,
+        version=version,
+        label=label or name,
+        capabilities=frozenset(capabilities),
+        factory=factory,
+    )
+    with _lock:
+        _registry[name] = info
+        _loaded.pop(name, None)
+        _fingerprints.pop(name, None)
+    return info
+
+
+def register_module(name: str, version: str, capabilities, module: str, label: str = None):
+    """
+    모듈 경로로 엔진을 등록 (지연 import).
+    """
+    return register_engine(name, version, capabilities, partial(importlib.import_module, module), label)
+
+
+def engine_info(name: str) -> EngineInfo:
+    try:
+        return _registry[name]
+    except KeyError:
+        raise ValueError(f"알 수 없는 엔진: {name!r} (가능: {', '.join(_registry)})") from None
+
+
+def get_engine(name: str):
+    """
+    이름으로 엔진을 가져온다. 처음 호출될 때 factory로 로드하고 이후에는 재사용.
+    """
+    engine = _loaded.get(name)
+    if engine is not None:
+        return engine
+    info = engine_info(name)
+    with _lock:
+        engine = _loaded.get(name)
+        if engine is None:
+            engine = info.factory()
+            _loaded[name] = engine
+    return engine
+
+
+def available_engines(capability: str = None) -> List[EngineInfo]:
+    """
+    등록된 엔진 목록 (capability를 주면 해당 기능을 지원하는 엔진만).
+    """
+    return [info for info in _registry.values() if capability is None or info.supports(capability)]
+
+
+# -------------------------------------------------------
+# 기본 엔진
+# -------------------------------------------------------
+register_module("v1", "1.0", {SCALAR, BATCH, STOCHASTIC}, "sim_engine", label="기본 엔진 (v1)")
+register_module("v2", "2.0", {SCALAR, BATCH, STOCHASTIC}, "sim_engine_v2", label="상호작용 강화 엔진 (v2)")
+
+
+# -------------------------------------------------------
+# 계수 세트를 고정한 엔진 구성
+# -------------------------------------------------------
+class ConfiguredEngine:
+    """
+    기반 엔진 + 계수 세트 (보정 결과 등).
+    엔진 모듈과 같은 함수(update_one_year / update_one_year_batch / compile_params)를 제공하므로
+    register_configured로 등록하면 다른 엔진처럼 이름으로 사용할 수 있다.
+    기반 엔진은 이름으로만 들고 있어 프로세스 풀로 넘길 수 있다.
+    """
+
+    def __init__(self, base: str, coefficients):
+        self.base = base
+        self.coefficients = coefficients
+
+    @property
+    def module(self):
+        return get_engine(self.base)
+
+    def compile_params(self, mode: str, coefficients=None):
+        return self.module.compile_params(mode, coefficients if coefficients is not None else self.coefficients)
+
+    def update_one_year(self, state, policy, mode, params=None):
+        return self.module.update_one_year(state, policy, mode, params if params is not None else self.compile_params(mode))
+
+    def update_one_year_batch(self, states, policies, mode, params=None):
+        if params is not None:
+            return self.module.update_one_year_batch(states, policies, mode, params=params)
+        from engine_params import run_by_mode
+
+        return run_by_mode(self._kernel, self.compile_params, states, policies, mode)
+
+    def _kernel(self, states, policies, params):
+        return self.module.update_one_year_batch(states, policies, params.mode, params=params)
+
+
+def register_configured(name: str, base: str, coefficients, label: str = None):
+    """
+    기반 엔진(base)에 계수 세트를 고정한 구성을 엔진으로 등록. 기능은 기반 엔진과 같다.
+    """
+    info = engine_info(base)
+    return register_engine(
+        name,
+        info.version,
+        info.capabilities,
+        partial(ConfiguredEngine, base, coefficients),
+        label or f"{name} ({info.label} 기반)",
+    )
+
+
+def save_engine_config(path: str, name: str, base: str, coefficients, label: str = None, meta: dict = None):
+    """
+    엔진 구성을 JSON으로 저장 (meta에는 보정 손실 등 부가 정보).
+    """
+    import json
+
+    from engine_params import coefficients_to_dict
+
+    config = {
+        "name": name,
+        "base": base,
+        "label": label,
+        "coefficients": coefficients_to_dict(coefficients),
+        "meta": meta or {},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+
+
+def engine_fingerprint(engine) -> str:
+    """
+    엔진 구성의 내용 해시 (결과 캐시 키용). 같은 이름으로 다른 계수 세트를 다시 등록하면 달라진다.
+    - 명세로 생성한 엔진: 명세 해시(생성기 해시 포함) + 기본 계수 세트
+    - ConfiguredEngine: 기반 엔진의 해시 + 계수 세트
+    - 그 밖: 등록 이름·버전 (모듈을 직접 넘기면 모듈 이름)
+    engine: 엔진 이름 또는 엔진 모듈
+    """
+    if isinstance(engine, str):
+        digest = _fingerprints.get(engine)
+        if digest is None:
+            digest = _fingerprints[engine] = _fingerprint(get_engine(engine), (engine, engine_info(engine).version))
+        return digest
+    return _fingerprint(engine, getattr(engine, "__name__", type(engine).__qualname__))
+
+
+def _fingerprint(module, identity) -> str:
+    from sim_cache import stable_hash
+
+    if isinstance(module, ConfiguredEngine):
+        return stable_hash("configured", engine_fingerprint(module.base), module.coefficients)
+    spec = getattr(module, "SPEC", None)
+    if spec is not None:
+        return stable_hash("spec", spec.spec_hash, getattr(module, "DEFAULT_COEFFICIENTS", None))
+    return stable_hash("engine", identity)
+
+
+def load_engine_config(path: str, name: str = None) -> EngineInfo:
+    """
+    save_engine_config로 저장한 구성을 읽어 엔진으로 등록 (name을 주면 그 이름으로).
+    """
+    import json
+
+    from engine_params import coefficients_from_dict
+
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    base = config["base"]
+    coefficients = coefficients_from_dict(get_engine(base).Coefficients, config["coefficients"])
+    return register_configured(name or config["name"], base, coefficients, config.get("label"))
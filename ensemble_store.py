@@ -0,0 +1,460 @@
+"""
+대규모 시나리오 묶음 궤적을 디스크에 저장하고 메모리 매핑으로 읽는 저장소.
+
+디렉터리 구조:
+    meta.json                   연도 축, 지표 목록, 청크 목록(시작 번호, 개수, 엔진, 모드, 정책, 시드)
+    chunk-<id>.npy              (지표, 연도, 시나리오) float64 배열
+    chunk-<id>.<라벨>.npy        시나리오별 라벨 (scenario_id, 정책 값 등, 선택)
+
+- 청크 하나 안에서의 지표·연도·시나리오 구간 조회는 np.memmap 뷰로 복사 없이 반환된다.
+- 여러 프로세스가 동시에 append할 수 있다. 각자 청크 파일을 쓴 뒤
+  잠금 파일로 보호된 구간에서 meta.json에 등록하며, 시나리오 번호는 등록 순서대로 붙는다.
+"""
+import json
+import os
+import time
+import uuid
+from bisect import bisect_right
+from dataclasses import asdict, dataclass, field, is_dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from data_model import PolicyBatch, StateBatch, POLICY_FIELDS, STATE_FIELDS
+from simulation import BatchTrajectory
+
+
+STORE_VERSION = 1
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+LOCK_TIMEOUT = 30.0
+
+# 앱에서 열 수 있는 저장소의 상위 디렉터리 (환경 변수로 변경 가능)
+RESULTS_DIR_ENV = "ECON_SIM_RESULTS_DIR"
+
+
+@dataclass
+class ChunkInfo:
+    """
+    청크 하나의 메타데이터.
+    - offset / count: 저장소 전체에서의 시작 시나리오 번호와 시나리오 수
+    - engine / mode / seed: 청크 공통 값 (시나리오마다 다르면 "mixed" 또는 None)
+    - policy: 청크 공통 정책 값 (시나리오별로 다른 필드는 "policy.<필드>" 라벨로 저장)
+    - labels: 시나리오별 라벨 이름 목록
+    """
+    file: str
+    offset: int
+    count: int
+    engine: Optional[str] = None
+    mode: Optional[str] = None
+    policy: Optional[Dict[str, float]] = None
+    seed: Optional[int] = None
+    labels: Tuple[str, ...] = ()
+    attrs: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def stop(self) -> int:
+        return self.offset + self.count
+
+
+# -------------------------------------------------------
+# 잠금 / 메타데이터 파일
+# -------------------------------------------------------
+class _Lock:
+    """
+    O_EXCL로 만드는 잠금 파일 (프로세스 간 상호 배제, 플랫폼 공통).
+    """
+
+    def __init__(self, path: str, timeout: float = LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return self
+            except FileExistsError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(
+                        f"저장소 잠금을 얻지 못했습니다: {self.path} "
+                        "(이전 작업이 비정상 종료했다면 잠금 파일을 삭제하세요)"
+                    ) from None
+                time.sleep(0.005)
+
+    def __exit__(self, *exc):
+        os.remove(self.path)
+
+
+def _write_json(path: str, data: dict):
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def _policy_meta(policy) -> Tuple[Optional[dict], Dict[str, np.ndarray]]:
+    """
+    정책을 (청크 공통 값 dict, 시나리오별 라벨 배열)로 나눈다.
+    """
+    if policy is None:
+        return None, {}
+    if isinstance(policy, PolicyBatch):
+        common, labels = {}, {}
+        for name in POLICY_FIELDS:
+            col = np.asarray(getattr(policy, name))
+            if col.shape[0] == 1 or np.all(col == col[0]):
+                common[name] = float(col[0])
+            else:
+                labels[f"policy.{name}"] = col
+        return common, labels
+    if is_dataclass(policy):
+        return {k: float(v) for k, v in asdict(policy).items()}, {}
+    return dict(policy), {}
+
+
+def _common(value) -> Optional[str]:
+    """
+    문자열이면 그대로, 배열이면 값이 하나뿐일 때 그 값, 아니면 "mixed".
+    """
+    if value is None or isinstance(value, str):
+        return value
+    uniq = np.unique(np.asarray(value))
+    return str(uniq[0]) if len(uniq) == 1 else "mixed"
+
+
+# -------------------------------------------------------
+# 저장소
+# -------------------------------------------------------
+class EnsembleStore:
+    """
+    years년 궤적을 청크 단위 .npy 파일로 저장하는 저장소.
+
+        store = EnsembleStore.create("runs/mc", years=100, start_year=1)
+        store.append(trajectory, engine="v2", mode="현실형", seed=0)
+
+        store = EnsembleStore.open("runs/mc")
+        store.read("growth", 1000, 2000, years=slice(0, 10))   # (10, 1000) 뷰
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._maps: Dict[str, np.ndarray] = {}
+        self.refresh()
+
+    # ----- 생성 / 열기 -----
+    @classmethod
+    def create(cls, path: str, years: int, start_year: int = 1, metrics=STATE_FIELDS,
+               attrs: dict = None, exist_ok: bool = False) -> "EnsembleStore":
+        """
+        빈 저장소를 만든다. exist_ok=True이고 같은 연도 축의 저장소가 이미 있으면 그대로 연다.
+        """
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            if not exist_ok:
+                raise FileExistsError(f"이미 저장소가 있습니다: {path}")
+            store = cls(path)
+            if store.n_years != years or store.start_year != start_year or store.metrics != tuple(metrics):
+                raise ValueError(f"기존 저장소의 연도·지표 구성이 다릅니다: {path}")
+            return store
+
+        os.makedirs(path, exist_ok=True)
+        with _Lock(os.path.join(path, LOCK_FILE)):
+            if not os.path.exists(meta_path):
+                _write_json(meta_path, {
+                    "version": STORE_VERSION,
+                    "years": int(years),
+                    "start_year": int(start_year),
+                    "metrics": list(metrics),
+                    "attrs": dict(attrs or {}),
+                    "chunks": [],
+                })
+        return cls(path)
+
+    @classmethod
+    def open(cls, path: str) -> "EnsembleStore":
+        if not os.path.exists(os.path.join(path, META_FILE)):
+            raise FileNotFoundError(f"저장소가 없습니다: {path}")
+        return cls(path)
+
+    def refresh(self):
+        """
+        meta.json을 다시 읽어 다른 프로세스가 추가한 청크를 반영.
+        """
+        with open(os.path.join(self.path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"지원하지 않는 저장소 버전: {meta.get('version')}")
+        self.n_years = meta["years"]
+        self.start_year = meta["start_year"]
+        self.metrics = tuple(meta["metrics"])
+        self.attrs = meta["attrs"]
+        self.chunks: List[ChunkInfo] = [
+            ChunkInfo(**{**chunk, "labels": tuple(chunk.get("labels", ()))}) for chunk in meta["chunks"]
+        ]
+        self._offsets = [chunk.offset for chunk in self.chunks]
+
+    # ----- 기본 정보 -----
+    def __len__(self):
+        return self.chunks[-1].stop if self.chunks else 0
+
+    @property
+    def year(self) -> np.ndarray:
+        return np.arange(self.start_year, self.start_year + self.n_years, dtype=np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self) * self.n_years * len(self.metrics) * 8
+
+    # ----- 쓰기 -----
+    def append(self, data, engine=None, mode=None, policy=None, seed: int = None,
+               labels: Dict[str, np.ndarray] = None, attrs: dict = None) -> ChunkInfo:
+        """
+        시나리오 묶음을 새 청크로 추가 (여러 프로세스에서 동시에 호출 가능).
+        - data: BatchTrajectory 또는 {지표: (years, N) 배열}
+        - engine / mode: 문자열 또는 시나리오별 배열 (배열이면 라벨로도 저장)
+        - policy: PolicyInput / dict / PolicyBatch (시나리오별로 다른 필드는 라벨로 저장)
+        - labels: 시나리오별 추가 라벨 {이름: (N,) 배열}
+        """
+        columns = {name: np.asarray(getattr(data, name) if not isinstance(data, dict) else data[name])
+                   for name in self.metrics}
+        shape = columns[self.metrics[0]].shape
+        if len(shape) != 2 or shape[0] != self.n_years:
+            raise ValueError(f"궤적 모양 {shape}이 (years={self.n_years}, N)과 다릅니다.")
+        n = shape[1]
+
+        labels = dict(labels or {})
+        for name, value in (("engine", engine), ("mode", mode)):
+            if value is not None and not isinstance(value, str):
+                labels[name] = np.asarray(value)
+        policy_common, policy_labels = _policy_meta(policy)
+        labels.update(policy_labels)
+
+        chunk_id = uuid.uuid4().hex[:16]
+        file = f"chunk-{chunk_id}.npy"
+        out = np.lib.format.open_memmap(
+            os.path.join(self.path, file), mode="w+", dtype=np.float64, shape=(len(self.metrics), self.n_years, n)
+        )
+        for m, name in enumerate(self.metrics):
+            out[m] = columns[name]
+        out.flush()
+        del out
+
+        for name, values in labels.items():
+            values = np.asarray(values)
+            if len(values) != n:
+                raise ValueError(f"라벨 {name!r} 길이({len(values)})가 시나리오 수({n})와 다릅니다.")
+            if values.dtype == object:
+                values = values.astype(str)
+            np.save(os.path.join(self.path, f"chunk-{chunk_id}.{name}.npy"), values, allow_pickle=False)
+
+        info = dict(
+            file=file,
+            count=n,
+            engine=_common(engine),
+            mode=_common(mode),
+            policy=policy_common,
+            seed=None if seed is None else int(seed),
+            labels=list(labels),
+            attrs=dict(attrs or {}),
+        )
+        meta_path = os.path.join(self.path, META_FILE)
+        with _Lock(os.path.join(self.path, LOCK_FILE)):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            last = meta["chunks"][-1] if meta["chunks"] else None
+            info["offset"] = last["offset"] + last["count"] if last else 0
+            meta["chunks"].append(info)
+            _write_json(meta_path, meta)
+
+        self.refresh()
+        return ChunkInfo(**{**info, "labels": tuple(info["labels"])})
+
+    # ----- 읽기 -----
+    def _map(self, chunk: ChunkInfo) -> np.ndarray:
+        mm = self._maps.get(chunk.file)
+        if mm is None:
+            mm = np.load(os.path.join(self.path, chunk.file), mmap_mode="r")
+            self._maps[chunk.file] = mm
+        return mm
+
+    def _metric_index(self, metric: str) -> int:
+        try:
+            return self.metrics.index(metric)
+        except ValueError:
+            raise ValueError(f"알 수 없는 지표: {metric!r} (가능: {', '.join(self.metrics)})") from None
+
+    def _span(self, start: int, stop: Optional[int]):
+        """
+        [start, stop) 구간과 겹치는 (청크, 청크 내 시작, 청크 내 끝) 목록.
+        """
+        total = len(self)
+        stop = total if stop is None else min(stop, total)
+        start = max(start, 0)
+        if start >= stop:
+            return []
+        out = []
+        i = bisect_right(self._offsets, start) - 1
+        while i < len(self.chunks) and self.chunks[i].offset < stop:
+            chunk = self.chunks[i]
+            out.append((chunk, max(start, chunk.offset) - chunk.offset, min(stop, chunk.stop) - chunk.offset))
+            i += 1
+        return out
+
+    def chunk(self, index: int) -> Dict[str, np.ndarray]:
+        """
+        청크 하나의 {지표: (years, count) memmap 뷰}.
+        """
+        mm = self._map(self.chunks[index])
+        return {name: mm[m] for m, name in enumerate(self.metrics)}
+
+    def iter_chunks(self) -> Iterator[Tuple[ChunkInfo, Dict[str, np.ndarray]]]:
+        """
+        청크 순서대로 (ChunkInfo, {지표: (years, count) memmap 뷰})를 내보낸다.
+        전체를 메모리에 올리지 않고 청크 단위로 처리할 때 사용.
+        """
+        for i, info in enumerate(self.chunks):
+            yield info, self.chunk(i)
+
+    def read(self, metric: str, start: int = 0, stop: int = None, years=slice(None)) -> np.ndarray:
+        """
+        지표 하나의 (연도, 시나리오) 배열. years는 연도 인덱스 slice / 배열.
+        구간이 청크 하나 안에 있으면 복사 없는 memmap 뷰, 여러 청크에 걸치면 이어 붙인 복사본.
+        """
+        m = self._metric_index(metric)
+        parts = [self._map(chunk)[m, years, a:b] for chunk, a, b in self._span(start, stop)]
+        if not parts:
+            return np.empty((len(self.year[years]), 0))
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts, axis=1)
+
+    def take(self, metric: str, scenarios, years=slice(None)) -> np.ndarray:
+        """
+        임의의 시나리오 번호 배열에 대한 (연도, 시나리오) 배열 (필요한 청크만 읽음).
+        """
+        m = self._metric_index(metric)
+        scenarios = np.asarray(scenarios, dtype=np.int64)
+        out = np.empty((len(self.year[years]), len(scenarios)))
+        which = np.searchsorted(self._offsets, scenarios, side="right") - 1
+        for i in np.unique(which):
+            pick = np.flatnonzero(which == i)
+            chunk = self.chunks[i]
+            out[:, pick] = self._map(chunk)[m, years][:, scenarios[pick] - chunk.offset]
+        return out
+
+    def label(self, name: str, start: int = 0, stop: int = None) -> np.ndarray:
+        """
+        시나리오별 라벨. engine/mode는 라벨이 없으면 청크 공통 값으로 채운다.
+        """
+        parts = []
+        for chunk, a, b in self._span(start, stop):
+            if name in chunk.labels:
+                values = np.load(os.path.join(self.path, chunk.file[:-4] + f".{name}.npy"), mmap_mode="r")
+                parts.append(values[a:b])
+            elif name in ("engine", "mode", "seed"):
+                parts.append(np.full(b - a, getattr(chunk, name), dtype=object))
+            elif name.startswith("policy.") and chunk.policy is not None:
+                parts.append(np.full(b - a, chunk.policy.get(name[len("policy."):], np.nan)))
+            else:
+                raise KeyError(f"청크 {chunk.file}에 라벨 {name!r}이 없습니다.")
+        if not parts:
+            return np.empty(0)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def trajectory(self, start: int = 0, stop: int = None) -> BatchTrajectory:
+        """
+        시나리오 구간을 BatchTrajectory로 (분석 함수 입력용, 청크 하나 안이면 복사 없음).
+        """
+        columns = {name: self.read(name, start, stop) for name in STATE_FIELDS}
+        return BatchTrajectory(
+            year=self.year,
+            final=StateBatch(**{name: np.array(col[-1]) for name, col in columns.items()})
+            if self.n_years else StateBatch(**{name: np.empty(0) for name in STATE_FIELDS}),
+            **columns,
+        )
+
+    def scenario_frame(self, index: int):
+        """
+        시나리오 하나의 연도별 표 (Streamlit 표시용).
+        """
+        import pandas as pd
+
+        data = {"year": self.year}
+        for name in self.metrics:
+            data[name] = np.asarray(self.read(name, index, index + 1)[:, 0])
+        return pd.DataFrame(data)
+
+    def sample_paths(self, metric: str, max_paths: int = 200) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        전체에서 고르게 max_paths개 시나리오를 골라 (시나리오 번호, (years, k) 배열) 반환.
+        """
+        n = len(self)
+        idx = np.unique(np.linspace(0, n - 1, min(n, max_paths)).astype(np.int64)) if n else np.empty(0, np.int64)
+        return idx, self.take(metric, idx)
+
+    def summary(self, metric: str) -> Dict[str, np.ndarray]:
+        """
+        청크 단위로 누적한 연도별 평균 / 표준편차 / 최솟값 / 최댓값.
+        """
+        count = 0
+        mean = np.zeros(self.n_years)
+        m2 = np.zeros(self.n_years)
+        low = np.full(self.n_years, np.inf)
+        high = np.full(self.n_years, -np.inf)
+        m = self._metric_index(metric)
+        for chunk in self.chunks:
+            values = self._map(chunk)[m]
+            k = values.shape[1]
+            if k == 0:
+                continue
+            c_mean = values.mean(axis=1)
+            c_m2 = ((values - c_mean[:, None]) ** 2).sum(axis=1)
+            delta = c_mean - mean
+            total = count + k
+            mean = mean + delta * (k / total)
+            m2 = m2 + c_m2 + delta ** 2 * (count * k / total)
+            count = total
+            low = np.minimum(low, values.min(axis=1))
+            high = np.maximum(high, values.max(axis=1))
+        std = np.sqrt(m2 / count) if count else np.full(self.n_years, np.nan)
+        return {"year": self.year, "mean": mean, "std": std, "min": low, "max": high, "n": count}
+
+
+# -------------------------------------------------------
+# 결과 디렉터리 (앱에서 열 수 있는 저장소)
+# -------------------------------------------------------
+def results_root() -> str:
+    """
+    앱에서 열 수 있는 저장소의 상위 디렉터리 (환경 변수 ECON_SIM_RESULTS_DIR로 변경 가능, 기본 ./results).
+    """
+    return os.path.realpath(os.environ.get(RESULTS_DIR_ENV) or "results")
+
+
+def list_stores(root: str = None) -> List[str]:
+    """
+    root(기본 results_root()) 아래 meta.json이 있는 저장소 디렉터리 목록 (root 기준 상대 경로).
+    저장소 안쪽과 심볼릭 링크는 탐색하지 않는다.
+    """
+    root = os.path.realpath(root or results_root())
+    found = []
+    for directory, subdirs, files in os.walk(root):
+        if META_FILE in files:
+            found.append(os.path.relpath(directory, root))
+            subdirs[:] = []
+        else:
+            subdirs.sort()
+    return sorted(found)
+
+
+def open_in_root(name: str, root: str = None) -> EnsembleStore:
+    """
+    root(기본 results_root()) 기준 상대 경로 name의 저장소를 연다.
+    .. / 절대 경로 / 심볼릭 링크로 root 밖을 가리키면 ValueError.
+    """
+    root = os.path.realpath(root or results_root())
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"결과 디렉터리({root}) 밖의 저장소는 열 수 없습니다: {name}")
+    return EnsembleStore.open(path)
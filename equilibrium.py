@@ -0,0 +1,774 @@
+"""
+고정 정책 아래 장기 균형 탐색.
+
+엔진을 (물가상승률, 실업률, 성장률) 위의 사상 F로 본다 (GDP는 성장률로만 변하므로 제외).
+v1·v2 엔진은 물가·실업률이 누적되는 구조(야코비안 고윳값 1)라 정책이 중립에서 벗어나면
+보통 수준 고정점이 없고 일정한 연간 증분으로 발산(drift)한다. 그래서
+1) 먼저 몇 해를 진행해 증분 F(x) - x가 일정한지 본다. 일정하면 남은 기간을 x + k·d로 건너뛰고
+   도착점에서 한 번 평가해 증분이 같은지 확인한다 (다르면 k를 절반씩 줄인다).
+2) 증분이 줄고 있는 경로는 Anderson 혼합 또는 감쇠 뉴턴법으로 고정점 F(x) = x를 찾고,
+   중심 차분 야코비안의 스펙트럼 반경으로 안정(수렴)·불안정을 판정한다.
+3) 나머지는 실제 경로를 따라가며 수렴·순환을 확인한다. 증분이 변하는 경로도 한 영역 안에서는
+   F가 아핀이므로 야코비안으로 닫힌 꼴을 구해 건너뛰고 (도착 전 단계의 점들까지 평가해 확인),
+   위기 트리거가 다시 발동해 증분이 오르내리는 경로는 평균 위치·평균 속도로 준주기 순환·발산을 판정한다.
+시나리오별 엔진 평가 수는 horizon 이하 (단순 반복으로 horizon년을 따라가는 비용)이고,
+일정 증분으로 발산하는 경로는 보통 20회 안팎으로 끝난다.
+"""
+from dataclasses import dataclass
+import numpy as np
+
+from data_model import EconomicState, PolicyInput, PolicyBatch, StateBatch, POLICY_FIELDS
+from simulation import as_state_batch, resolve_engine
+from stop_rules import in_crisis
+
+
+VARIABLES = ("inflation", "unemployment", "growth")
+
+CONVERGED = "converged"    # 안정 고정점 (경로가 수렴)
+UNSTABLE = "unstable"      # 고정점이지만 스펙트럼 반경 ≥ 1 (경로가 머물지 않음)
+DRIFT = "drift"            # 고정점 없음, 일정한 연간 증분으로 발산
+CYCLE = "cycle"            # 주기 궤도 (예: 위기 트리거의 반복 발동)
+DIVERGED = "diverged"      # 수치적으로 발산 (inf/nan 또는 divergence_bound 초과)
+UNRESOLVED = "unresolved"  # horizon 안에서 판정하지 못함
+
+# 중심 차분 상대 스텝, Anderson 정규화
+JACOBIAN_STEP = 1e-6
+# 건너뛰기용 야코비안의 상대 스텝: 같은 영역 안에서는 F가 아핀이라 차분이 정확하므로 반올림 오차가 작도록 크게
+# (스텝 안에서 영역이 바뀌면 예측이 틀려 건너뛰기만 실패한다)
+PATH_JACOBIAN_STEP = 1e-4
+REGULARIZATION = 1e-12
+
+# 고정점 탐색 전에 진행해 보는 연수 (증분이 일정한지 보려면 3년)
+WARMUP_YEARS = 3
+# 건너뛴 점의 증분이 예측과 이 상대 오차 안에서 같으면 같은 영역으로 본다
+# (차분 야코비안의 반올림 오차가 건너뛴 연수에 따라 커지므로 tol보다 느슨하게)
+JUMP_RTOL = 1e-6
+# 준주기 순환: 최근 두 구간의 평균 위치 차이가 경로 폭의 이 비율 이하
+CYCLE_RTOL = 0.1
+# 준주기 발산: 기준점 이후의 평균 속도가 max_period년 전과 이 상대 오차 안에서 같음
+DRIFT_RTOL = 0.02
+
+# 보고하는 점의 잔차(1) + 중심 차분 야코비안(6)에 드는 평가 수
+FINAL_EVALUATIONS = 7
+
+
+@dataclass
+class EquilibriumResult:
+    """
+    정책(시나리오) N개의 장기 균형 분석 결과. 배열은 모두 길이 N (drift는 (N, 3)).
+    - inflation / unemployment / growth: 고정점 (drift·cycle 등은 판정 시점의 경로 상태)
+    - drift: 연간 증분 (고정점이면 0)
+    - period: 순환 주기 또는 drift 증분 패턴의 주기 (그 외 1)
+    - years: 판정 시점까지의 경로 연수 (건너뛴 연수 포함, 고정점 탐색에서 끝났으면 탐색 시작점의 연수,
+      평가 예산이 다하면 horizon보다 짧을 수 있음)
+    - iterations: 시나리오별 엔진 평가 횟수 (야코비안 평가 포함, horizon 이하)
+    - residual: |F(x) - x| 최댓값
+    - spectral_radius: 해당 점에서 F 야코비안의 스펙트럼 반경 (1 미만이면 국소 안정)
+    - crisis: 해당 점(순환이면 궤도 중 한 점이라도)에서 위기 트리거 발동 여부
+    """
+    engine: str
+    mode: object
+    horizon: int
+    status: np.ndarray
+    inflation: np.ndarray
+    unemployment: np.ndarray
+    growth: np.ndarray
+    drift: np.ndarray
+    period: np.ndarray
+    years: np.ndarray
+    iterations: np.ndarray
+    residual: np.ndarray
+    spectral_radius: np.ndarray
+    crisis: np.ndarray
+
+    def __len__(self):
+        return len(self.status)
+
+    @property
+    def evaluations(self) -> int:
+        """
+        전체 엔진 평가 횟수 (시나리오당 horizon번 이하, 단순 반복으로 horizon년을 따라가는 비용을 넘지 않음).
+        """
+        return int(self.iterations.sum())
+
+    @property
+    def stable(self) -> np.ndarray:
+        return self.status == CONVERGED
+
+    def point(self, i: int, gdp: float = 1.0) -> EconomicState:
+        return EconomicState(gdp, float(self.inflation[i]), float(self.unemployment[i]), float(self.growth[i]))
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        return pd.DataFrame({
+            "status": self.status,
+            **{name: getattr(self, name) for name in VARIABLES},
+            **{f"drift_{name}": self.drift[:, j] for j, name in enumerate(VARIABLES)},
+            "period": self.period,
+            "years": self.years,
+            "iterations": self.iterations,
+            "residual": self.residual,
+            "spectral_radius": self.spectral_radius,
+            "crisis": self.crisis,
+        })
+
+
+# -------------------------------------------------------
+# 엔진 사상 F
+# -------------------------------------------------------
+class _Map:
+    """
+    시나리오 번호 배열과 (행, 3) 점 배열로 F를 배치 평가하고 시나리오별 평가 횟수를 센다.
+    """
+
+    def __init__(self, policies: PolicyBatch, mode, n: int, engine):
+        self.update_batch = resolve_engine(engine).update_one_year_batch
+        self.policy_cols = {name: np.broadcast_to(getattr(policies, name), (n,)) for name in POLICY_FIELDS}
+        self.mode = mode if isinstance(mode, str) else np.broadcast_to(np.asarray(mode), (n,))
+        self.calls = np.zeros(n, dtype=np.int64)
+        self._rows = self._policies = self._mode = None
+
+    def __call__(self, idx: np.ndarray, x: np.ndarray) -> np.ndarray:
+        self.calls += np.bincount(idx, minlength=len(self.calls))
+        # 경로를 따라갈 때는 같은 행 배열로 매년 호출하므로 정책 부분집합을 재사용
+        if idx is not self._rows:
+            self._rows = idx
+            self._policies = PolicyBatch(**{name: col[idx] for name, col in self.policy_cols.items()})
+            self._mode = self.mode if isinstance(self.mode, str) else self.mode[idx]
+        states = StateBatch(gdp=np.ones(len(idx)), inflation=x[:, 0], unemployment=x[:, 1], growth=x[:, 2])
+        policies, mode = self._policies, self._mode
+        with np.errstate(over="ignore", invalid="ignore"):
+            out = self.update_batch(states, policies, mode)
+        return np.stack([out.inflation, out.unemployment, out.growth], axis=-1)
+
+    def jacobian(self, idx: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """
+        중심 차분 야코비안 (n, 3, 3). 점마다 6행을 한 배치로 평가.
+        """
+        points, h = _probe_points(x)
+        return _difference(self(np.repeat(idx, 6), points), h)
+
+
+def _probe_points(x: np.ndarray, step: float = JACOBIAN_STEP):
+    # 중심 차분에 쓸 점 (n·6, 3)과 스텝 (n, 3)
+    h = step * np.maximum(np.abs(x), 1.0)                  # (n, 3)
+    steps = h[:, None, :] * np.eye(3)[None, :, :]                    # (n, j, 3)
+    rows = np.concatenate([x[:, None, :] + steps, x[:, None, :] - steps], axis=1)
+    return rows.reshape(-1, 3), h
+
+
+def _difference(y: np.ndarray, h: np.ndarray) -> np.ndarray:
+    # J[:, i, j] = ∂F_i/∂x_j
+    y = y.reshape(-1, 6, 3)
+    return np.swapaxes((y[:, :3] - y[:, 3:]) / (2 * h[:, :, None]), 1, 2)
+
+
+def _spectral_radius(jac: np.ndarray) -> np.ndarray:
+    if not len(jac):
+        return np.empty(0)
+    ok = np.isfinite(jac).all(axis=(1, 2))
+    out = np.full(len(jac), np.nan)
+    if ok.any():
+        out[ok] = np.abs(np.linalg.eigvals(jac[ok])).max(axis=1)
+    return out
+
+
+def _norm(g: np.ndarray) -> np.ndarray:
+    # 길이 3 축의 max 축약보다 원소별 maximum이 훨씬 빠르다 (경로를 따라갈 때 매년 호출)
+    a = np.abs(g)
+    return np.maximum(np.maximum(a[..., 0], a[..., 1]), a[..., 2])
+
+
+# -------------------------------------------------------
+# 1단계: 고정점 탐색
+# -------------------------------------------------------
+def _escaped(x: np.ndarray, g: np.ndarray, divergence_bound: float) -> np.ndarray:
+    """
+    수치적으로 발산한 행 (inf/nan 또는 divergence_bound 초과).
+    이런 점에서는 F(x) - x가 반올림으로 0이 되어 (예: |x| ~ 1e16) 가짜 고정점처럼 보인다.
+    """
+    return ~np.isfinite(g).all(axis=1) | ~np.isfinite(x).all(axis=1) | (np.abs(x).max(axis=1) > divergence_bound)
+
+
+def _converged(x: np.ndarray, res: np.ndarray, tol: float) -> np.ndarray:
+    # 경로 분류와 같은 상대 기준 (값이 클수록 반올림 오차도 크다)
+    return res <= tol * (1.0 + np.abs(x).max(axis=1))
+
+
+def _anderson(F: _Map, idx, x, tol, max_iter, divergence_bound, budget, memory=3, damping=1.0, patience=5):
+    """
+    Anderson 혼합 (type II). 잔차가 patience번 연속 10% 이상 줄지 않으면 그 시나리오는 중단
+    (고정점이 없는 경우 잔차가 증분 크기에서 멈춘다). 잔차가 늘면 기록을 비우고 다시 시작.
+    점이 발산 범위를 벗어나거나 평가 수가 budget에 닿으면 그 시나리오도 중단한다.
+    반환: (x, 잔차 최댓값, 수렴 여부)
+    """
+    n = len(idx)
+    g = F(idx, x) - x
+    res = _norm(g)
+    best = res.copy()
+    stall = np.zeros(n, dtype=np.int64)
+    escaped = _escaped(x, g, divergence_bound)
+    done = _converged(x, res, tol) & ~escaped
+    dx = np.zeros((n, 3, memory))
+    dg = np.zeros((n, 3, memory))
+    count = np.zeros(n, dtype=np.int64)
+
+    for _ in range(max_iter):
+        # 반복 한 번에 최대 2회 평가 (잔차가 늘면 단순 반복 한 걸음 추가)
+        a = np.flatnonzero(~done & ~escaped & (stall < patience) & (F.calls[idx] + 2 <= budget))
+        if not len(a):
+            break
+        G = dg[a]
+        gram = G.transpose(0, 2, 1) @ G
+        gram += (REGULARIZATION * np.trace(gram, axis1=1, axis2=2) + 1e-300)[:, None, None] * np.eye(memory)
+        gamma = np.linalg.solve(gram, (G.transpose(0, 2, 1) @ g[a][:, :, None]))[:, :, 0]
+        step = damping * g[a] - ((dx[a] + damping * G) @ gamma[:, :, None])[:, :, 0]
+        x_new = x[a] + step
+        g_new = F(idx[a], x_new) - x_new
+        res_new = _norm(g_new)
+
+        finite = np.isfinite(res_new)
+        worse = ~finite | (res_new > res[a])
+        # 잔차가 늘거나 발산하면 기록을 비우고 단순 반복 한 걸음(F(x))으로 대신
+        if worse.any():
+            w = a[worse]
+            dx[w] = 0.0
+            dg[w] = 0.0
+            count[w] = 0
+        slot = count[a] % memory
+        keep = ~worse
+        dx[a[keep], :, slot[keep]] = (x_new - x[a])[keep]
+        dg[a[keep], :, slot[keep]] = (g_new - g[a])[keep]
+        count[a[keep]] += 1
+
+        accepted = a[keep]
+        x[accepted] = x_new[keep]
+        g[accepted] = g_new[keep]
+        res[accepted] = res_new[keep]
+        fallback = a[worse]
+        if len(fallback):
+            x[fallback] = x[fallback] + g[fallback]
+            g[fallback] = F(idx[fallback], x[fallback]) - x[fallback]
+            res[fallback] = _norm(g[fallback])
+
+        improved = res[a] < 0.9 * best[a]
+        stall[a] = np.where(improved, 0, stall[a] + 1)
+        best[a] = np.minimum(best[a], res[a])
+        escaped[a] = _escaped(x[a], g[a], divergence_bound)
+        done[a] = _converged(x[a], res[a], tol) & ~escaped[a]
+    return x, res, done
+
+
+def _newton(F: _Map, idx, x, tol, max_iter, divergence_bound, budget, patience=3):
+    """
+    감쇠 뉴턴법. (J - I) s = -(F(x) - x)를 최소제곱으로 풀고 (고윳값 1 때문에 특이할 수 있음)
+    스텝 배율 1, 1/2, 1/4, 1/8을 한 배치로 평가해 잔차가 가장 작은 점을 택한다.
+    발산 범위를 벗어난 시험점은 택하지 않고, 평가 수가 budget에 닿으면 중단한다.
+    """
+    n = len(idx)
+    g = F(idx, x) - x
+    res = _norm(g)
+    stall = np.zeros(n, dtype=np.int64)
+    escaped = _escaped(x, g, divergence_bound)
+    done = _converged(x, res, tol) & ~escaped
+    alphas = np.array([1.0, 0.5, 0.25, 0.125])
+
+    for _ in range(max_iter):
+        # 반복 한 번에 야코비안 6회 + 시험점 4회 평가
+        a = np.flatnonzero(~done & ~escaped & (stall < patience) & np.isfinite(res) & (F.calls[idx] + 10 <= budget))
+        if not len(a):
+            break
+        jac = F.jacobian(idx[a], x[a]) - np.eye(3)
+        step = -(np.linalg.pinv(jac) @ g[a][:, :, None])[:, :, 0]
+        trial = x[a][:, None, :] + alphas[None, :, None] * step[:, None, :]
+        g_trial = (F(np.repeat(idx[a], len(alphas)), trial.reshape(-1, 3)).reshape(trial.shape) - trial)
+        r_trial = _norm(g_trial)
+        out = _escaped(trial.reshape(-1, 3), g_trial.reshape(-1, 3), divergence_bound).reshape(r_trial.shape)
+        r_trial[out | ~np.isfinite(r_trial)] = np.inf
+        pick = r_trial.argmin(axis=1)
+        rows = np.arange(len(a))
+        r_best = r_trial[rows, pick]
+
+        better = r_best < res[a]
+        b = a[better]
+        x[b] = trial[rows, pick][better]
+        g[b] = g_trial[rows, pick][better]
+        stall[a] = np.where(r_best < 0.9 * res[a], 0, stall[a] + 1)
+        res[b] = r_best[better]
+        done[a] = _converged(x[a], res[a], tol)
+    return x, res, done
+
+
+# -------------------------------------------------------
+# 경로 따라가기 (일정 증분이면 건너뛰기)
+# -------------------------------------------------------
+def _affine_steps(A: np.ndarray, d: np.ndarray, k: np.ndarray):
+    """
+    같은 영역 안에서 F(x) = A·x + b이면 k년 뒤의 이동량은 S_k·d, 그때의 증분은 A^k·d
+    (S_k = I + A + … + A^(k-1), d = F(x) - x, k는 행별 정수 ≥ 1).
+    확대 행렬 M = [[A, d], [0, 1]]의 거듭제곱 M^k = [[A^k, S_k·d], [0, 1]]을 이진 거듭제곱으로 계산.
+    반환: (S_k·d, A^k·d)
+    """
+    m = len(A)
+    base = np.zeros((m, 4, 4))
+    base[:, :3, :3], base[:, :3, 3], base[:, 3, 3] = A, d, 1.0
+    power = np.broadcast_to(np.eye(4), (m, 4, 4)).copy()
+    bits = k.copy()
+    while bits.any():
+        on = (bits & 1).astype(bool)
+        power[on] = power[on] @ base[on]
+        bits >>= 1
+        if bits.any():
+            base = base @ base
+    return power[:, :3, 3], (power[:, :3, :3] @ d[:, :, None])[:, :, 0]
+
+
+class _Path:
+    """
+    시나리오별 실제 경로. 배열은 모두 전체 시나리오 기준이고 run(rows, until)이 주어진 행만 진행한다.
+    - 매년: 증분이 0이면 수렴, 직전 두 해와 같으면 남은 기간을 건너뛰기 시도
+    - 증분이 변하는 경로: 몇 해마다 야코비안 A를 구해 아핀 닫힌 꼴로 건너뛰기 시도
+      (건너뛴 연수가 쓴 평가 수보다 적으면 다음 시도까지 두 배로 기다린다)
+    - max_period년마다: 최근 증분이 주기 p로 반복되면 순환 (주기당 이동량이 0) 또는 주기적 발산,
+      정확히 반복되지 않으면 최근 2·max_period년의 평균 위치로 준주기 순환을,
+      건너뛰기가 계속 실패하는 경로는 기준점 이후의 평균 속도로 준주기 발산을 판정
+    """
+
+    def __init__(self, F: _Map, x0, horizon, tol, max_period, divergence_bound, budget):
+        n = len(x0)
+        self.F, self.horizon, self.tol = F, horizon, tol
+        self.max_period, self.divergence_bound, self.budget = max_period, divergence_bound, budget
+        self.size = 2 * max_period
+        self.x = x0.copy()                                   # 현재 경로 점
+        self.t = np.zeros(n, dtype=np.int64)                 # x의 연도
+        self.history = np.full((n, self.size, 3), np.nan)    # 최근 점 (행별 순환 버퍼, 다음 칸 = filled % size)
+        self.inc = np.full((n, self.size, 3), np.nan)        # 그때의 연간 증분
+        self.filled = np.zeros(n, dtype=np.int64)
+        self.latest = np.zeros((n, 3))                       # 마지막 연간 증분
+        self.same = np.zeros(n, dtype=np.int64)              # 증분이 직전 해와 같았던 연속 횟수
+        self.shrinking = np.zeros(n, dtype=bool)             # 증분 크기가 줄고 있는지 (고정점 탐색 후보)
+        self.recurrent = np.zeros(n, dtype=bool)             # 직전 구간 확인에서 제자리에서 맴돌았는지
+        self.anchor = np.full((n, 3), np.nan)                # 평균 속도의 기준점과 그 연도 (건너뛰어도 유지)
+        self.anchor_t = np.zeros(n, dtype=np.int64)
+        self.mark = np.zeros(n, dtype=np.int64)              # 마지막으로 평균 속도를 확인한 연도
+        self.velocity = np.full((n, 3), np.nan)              # 그때의 평균 속도
+        self.reach = np.full(n, horizon, dtype=np.int64)     # 다음 건너뛰기의 최대 연수 (지난번에 건너뛴 연수의 두 배)
+        self.hold = np.zeros(n, dtype=np.int64)              # 일정 증분 건너뛰기를 다시 시도하기까지 남은 연수
+        self.A = np.zeros((n, 3, 3))                          # 마지막으로 구한 야코비안
+        self.wait = np.full(n, WARMUP_YEARS + 1, dtype=np.int64)  # 야코비안 건너뛰기까지 남은 연수 (고정점 탐색 뒤부터)
+        self.backoff = np.full(n, 2, dtype=np.int64)
+        self.status = np.full(n, UNRESOLVED, dtype=object)
+        self.period = np.ones(n, dtype=np.int64)
+        self.drift = np.zeros((n, 3))
+        self.crisis = np.zeros(n, dtype=bool)
+        self.done = np.zeros(n, dtype=bool)
+
+    def _atol(self, x):
+        return self.tol * (1.0 + np.abs(x).max(axis=1))
+
+    def _finish(self, rows, name):
+        self.status[rows], self.done[rows] = name, True
+
+    def _recent(self, buffer, rows):
+        # 순환 버퍼를 오래된 순서로 (마지막 칸이 가장 최근)
+        order = (self.filled[rows, None] + np.arange(self.size)) % self.size
+        return buffer[rows[:, None], order]
+
+    def _forget(self, rows):
+        # 건너뛴 뒤에는 이전 기록이 실제로 연속된 경로가 아니므로 비운다
+        self.history[rows], self.inc[rows] = np.nan, np.nan
+        self.filled[rows], self.same[rows] = 0, 0
+        self.recurrent[rows] = False
+
+    def run(self, rows, until):
+        # rows를 until년까지 (또는 판정될 때까지) 진행
+        F, x, t = self.F, self.x, self.t
+        active = rows[~self.done[rows] & (t[rows] < until) & (F.calls[rows] < self.budget)]
+        step = 0
+        while len(active):
+            # 야코비안을 구할 차례인 행은 차분 점 6개를 같은 엔진 호출에서 함께 평가
+            # (같은 영역 안이면 한 해 진행한 점에서도 그대로 쓸 수 있다)
+            probe = active[(self.wait[active] <= 1) & (F.calls[active] + 8 <= self.budget)]
+            if len(probe):
+                points, h = _probe_points(x[probe], PATH_JACOBIAN_STEP)
+                y = F(np.concatenate([active, np.repeat(probe, 6)]), np.concatenate([x[active], points]))
+                y, self.A[probe] = y[:len(active)], _difference(y[len(active):], h)
+            else:
+                y = F(active, x[active])
+            d = y - x[active]
+            bad = ~np.isfinite(y).all(axis=1) | (np.abs(y).max(axis=1) > self.divergence_bound)
+            x[active[bad]] = y[bad]
+            self._finish(active[bad], DIVERGED)
+            a, y, d = active[~bad], y[~bad], d[~bad]
+
+            atol = self._atol(y)
+            size = _norm(d)
+            fixed = size <= atol
+            self.shrinking[a] = size < 0.9 * _norm(self.latest[a])
+            self.same[a] = np.where(_norm(d - self.latest[a]) <= atol, self.same[a] + 1, 0)
+            slot = self.filled[a] % self.size
+            self.history[a, slot], self.inc[a, slot] = y, d
+            self.filled[a] += 1
+            x[a], self.latest[a] = y, d
+            t[a] += 1
+            self._finish(a[fixed], CONVERGED)
+
+            moving = a[~fixed]
+            moving = moving[t[moving] < self.horizon]
+            self.hold[moving] -= 1
+            steady = (self.same[moving] >= 2) & (self.hold[moving] <= 0)
+            changing = moving[~steady]
+            self.wait[changing] -= 1
+            ready = changing[self.wait[changing] <= 0]
+            self._try_jumps(moving[steady], ready[np.isin(ready, probe)])
+            moving = moving[~self.done[moving]]
+            step += 1
+            if step % self.max_period == 0:
+                # 반복 확인은 max_period년마다 기록이 찬 행을 한꺼번에
+                check = moving[self.filled[moving] >= self.size]
+                self._pattern(check)
+                self._recurrence(check[~self.done[check]])
+                moving = moving[~self.done[moving]]
+            self._velocity(moving[t[moving] >= self.mark[moving] + self.max_period])
+
+            stop = self.done[active] | (t[active] >= until) | (F.calls[active] >= self.budget)
+            if stop.any():
+                active = active[~stop]
+
+        if until >= self.horizon:
+            self._settle(rows[~self.done[rows]])
+
+    def _jump(self, rows, A):
+        """
+        k = horizon - t년 (지난번에 건너뛴 연수의 두 배까지) 뒤의 점을 닫힌 꼴로 구해 평가하고,
+        증분이 예측과 같으면 그 점으로 건너뛴다.
+        같은 영역 안에서 F(x) = A·x + b이면 k년 뒤의 점은 x + S_k·d, 증분은 A^k·d
+        (S_k = I + … + A^(k-1), d = A·(직전 증분)은 x에서 나가는 증분). 증분이 일정한 경로는 A = I.
+        - A = I: 경로가 직선이고 엔진의 각 영역은 볼록이라 양 끝이 같은 영역이면 그 사이도 같은 영역이다.
+          끝점이 틀리면 k/2, k/4, …, 2를 한 번에 평가해 맞는 것 중 가장 먼 점으로 건너뛴다.
+        - 그 밖: 경로가 곡선이라 영역을 벗어났다 돌아올 수 있으므로 k, k/2, …, 2를 한 번에 평가해
+          그보다 가까운 점이 모두 맞는 가장 먼 점으로 건너뛴다.
+        건너뛴 점에서 다시 한 해씩 진행한다 (엔진 호출은 최대 두 번).
+        반환: 행별 건너뛴 연수
+        """
+        F = self.F
+        gained = np.zeros(len(rows), dtype=np.int64)
+        k = np.minimum(self.horizon - self.t[rows], self.reach[rows])
+        levels = np.floor(np.log2(np.maximum(k, 1))).astype(np.int64)   # k >> j ≥ 2인 j = 0 … levels - 1
+        room = self.budget - F.calls[rows]
+        straight = (A == np.eye(3)).all(axis=(1, 2))
+        # 첫 호출: 직선은 끝점 하나, 곡선은 모든 단계
+        count = np.where(straight, 1, levels)
+        count[count > room] = 0
+        pos = np.flatnonzero(count > 0)
+        owner, step, z, e, ok = self._candidates(rows, A, k, pos, count[pos], 0)
+        line = straight[owner]
+        self._land(rows[owner[ok & line]], z[ok & line], e[ok & line], step[ok & line])
+        gained[owner[ok & line]] = step[ok & line]
+        # 곡선: 가까운 점부터 처음 틀린 점 직전까지
+        j = np.arange(len(owner)) - np.repeat(np.cumsum(count[pos]) - count[pos], count[pos])
+        worst = np.full(len(rows), -1)
+        np.maximum.at(worst, owner[~ok & ~line], j[~ok & ~line])
+        pick = np.flatnonzero(~line & (j == worst[owner] + 1))
+        self._land(rows[owner[pick]], z[pick], e[pick], step[pick])
+        gained[owner[pick]] = step[pick]
+
+        # 직선에서 끝점이 틀린 행: k/2, k/4, …, 2 중 맞는 가장 먼 점
+        pos = np.flatnonzero(straight & (count > 0) & (gained == 0))
+        count = np.minimum(levels[pos] - 1, room[pos] - 1)
+        pos, count = pos[count > 0], count[count > 0]
+        if len(pos):
+            owner, step, z, e, ok = self._candidates(rows, A, k, pos, count, 1)
+            hit = np.flatnonzero(ok)
+            pick = hit[np.unique(owner[hit], return_index=True)[1]]
+            self._land(rows[owner[pick]], z[pick], e[pick], step[pick])
+            gained[owner[pick]] = step[pick]
+        # 2년도 안 되면 한 해 진행과 다를 바 없으므로 포기 (증분이 다시 두 해 같으면 재시도)
+        self.same[rows[gained == 0]] = 0
+        return gained
+
+    def _candidates(self, rows, A, k, pos, count, first):
+        # 행 pos마다 k >> first, k >> (first + 1), … (count개)를 한 번에 평가
+        owner = np.repeat(pos, count)
+        j = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        step = k[owner] >> (j + first)
+        z, e, ok = self._target(rows[owner], A[owner], step)
+        return owner, step, z, e, ok
+
+    def _target(self, rows, A, k):
+        # 건너뛸 점과 그 점의 실제 증분, 예측과 맞는지
+        d = self.latest[rows]
+        z, expected = self.x[rows] + k[:, None] * d, d.copy()
+        # A = I인 행은 위 식 그대로 (거듭제곱 생략)
+        affine = ~(A == np.eye(3)).all(axis=(1, 2))
+        if affine.any():
+            # latest는 x에 도착한 증분이므로 x에서 나가는 증분은 A·latest
+            moved, expected[affine] = _affine_steps(A[affine], (A[affine] @ d[affine][:, :, None])[:, :, 0], k[affine])
+            z[affine] = self.x[rows[affine]] + moved
+        e = self.F(rows, z) - z
+        # 변수마다 (증분이 아주 작은 변수도 예측과 맞아야 한다)
+        tolerance = JUMP_RTOL * np.abs(expected) + self._atol(z)[:, None]
+        ok = (np.isfinite(e).all(axis=1) & (np.abs(z).max(axis=1) <= self.divergence_bound)
+              & (np.abs(e - expected) <= tolerance).all(axis=1))
+        return z, e, ok
+
+    def _land(self, rows, z, e, k):
+        self.x[rows], self.t[rows], self.latest[rows] = z, self.t[rows] + k, e
+        self._forget(rows)
+        end = rows[self.t[rows] >= self.horizon]
+        still = _norm(self.latest[end]) <= self._atol(self.x[end])
+        self.drift[end[~still]] = self.latest[end[~still]]
+        self._finish(end[still], CONVERGED)
+        self._finish(end[~still], DRIFT)
+
+    def _try_jumps(self, steady, changing):
+        """
+        증분이 일정한 행(A = I)과 야코비안을 구할 차례인 행을 함께 건너뛰기 시도.
+        건너뛴 연수가 쓴 평가 수보다 적으면 다음 시도까지 두 배로 기다린다
+        (위기 트리거가 자주 다시 발동하는 경로에서 시도가 계속 손해가 되지 않도록).
+        """
+        # 고윳값이 1이 아니면서 절댓값이 1 이상인 성분(주기·팽창)이 있으면 닫힌 꼴 끝점이 경로의 성격을 가리므로
+        # 건너뛰지 않고 따라간다 (손해 본 시도로 친다)
+        eigen = np.linalg.eigvals(self.A[changing])
+        settling = ((np.abs(eigen - 1.0) <= 1e-3) | (np.abs(eigen) < 1.0)).all(axis=1)
+        skip = changing[~settling]
+        self.backoff[skip] = np.minimum(2 * self.backoff[skip], self.horizon)
+        self.wait[skip] = self.backoff[skip]
+        changing = changing[settling]
+        rows = np.concatenate([steady, changing])
+        if not len(rows):
+            return
+        # 야코비안 평가 수도 이번 시도의 비용
+        before = self.F.calls[rows] - np.concatenate([np.zeros(len(steady), dtype=np.int64), np.full(len(changing), 6)])
+        A = np.tile(np.eye(3), (len(rows), 1, 1))
+        A[len(steady):] = self.A[changing]
+        with np.errstate(invalid="ignore"):
+            gained = self._jump(rows, A)
+        paid = gained > self.F.calls[rows] - before
+        self.reach[rows[gained > 0]] = 2 * gained[gained > 0]
+        self.backoff[rows] = np.where(paid, 2, np.minimum(2 * self.backoff[rows], self.horizon))
+        lost = steady[~paid[:len(steady)]]
+        self.hold[lost] = self.backoff[lost]
+        self.wait[changing] = self.backoff[changing]
+
+    def _pattern(self, rows):
+        """
+        최근 2·max_period년의 증분이 통째로 주기 p로 반복되는 가장 짧은 p를 찾는다.
+        주기당 이동량이 0이면 순환 (예: 위기 트리거의 반복 발동), 아니면 주기적 발산.
+        """
+        if not len(rows):
+            return
+        inc = self._recent(self.inc, rows)
+        atol = self._atol(self.x[rows])
+        size = self.size
+        period = np.zeros(len(rows), dtype=np.int64)
+        for p in range(1, size // 2 + 1):
+            gap = np.abs(inc[:, p:] - inc[:, :-p]).max(axis=(1, 2))
+            period[(gap <= atol) & (period == 0)] = p
+            if period.all():
+                break
+        hit = period > 0
+        rows, period, inc, atol = rows[hit], period[hit], inc[hit], atol[hit]
+        if not len(rows):
+            return
+        back = np.arange(size)[None, :] >= size - period[:, None]   # 마지막 한 주기
+        moved = np.where(back[:, :, None], inc, 0.0).sum(axis=1)
+        orbit = self._recent(self.history, rows)
+        crisis = np.asarray(in_crisis(_Point(orbit))) & back
+        self.period[rows] = period
+        self.crisis[rows] = crisis.any(axis=1)
+        cyc = _norm(moved) <= atol
+        self.drift[rows[~cyc]] = moved[~cyc] / period[~cyc, None]
+        self._finish(rows[cyc], CYCLE)
+        self._finish(rows[~cyc], DRIFT)
+
+    def _recurrence(self, rows):
+        """
+        정확히 반복되지 않지만 제자리에서 맴도는 경로 (예: 누적 변수 때문에 위기 트리거가 준주기적으로 다시 발동):
+        최근 2·max_period년을 반으로 나눠 모든 변수에서 두 구간의 평균 위치 차이가 경로 폭에 비해 작으면
+        순환으로 본다 (두 번 연속일 때만, 주기는 가장 가깝게 돌아온 연수).
+        """
+        if not len(rows):
+            return
+        half, size = self.max_period, self.size
+        orbit = self._recent(self.history, rows)
+        first, last = orbit[:, :half].mean(axis=1), orbit[:, half:].mean(axis=1)
+        spread = orbit.max(axis=1) - orbit.min(axis=1)
+        atol = self._atol(self.x[rows])
+        bounded = (np.abs(last - first) <= CYCLE_RTOL * spread + atol[:, None]).all(axis=1)
+        recurrent = bounded & self.recurrent[rows]
+        self.recurrent[rows] = bounded
+
+        c, orbit = rows[recurrent], orbit[recurrent]
+        if len(c):
+            # gaps[:, i]: (size - 1 - i)년 전 점과의 거리 (1년 전 제외)
+            gaps = _norm(orbit[:, -1:, :] - orbit[:, :-2, :])
+            period = size - 1 - gaps.argmin(axis=1)
+            back = np.arange(size)[None, :] >= size - period[:, None]
+            self.period[c] = period
+            self.crisis[c] = (np.asarray(in_crisis(_Point(orbit))) & back).any(axis=1)
+            self._finish(c, CYCLE)
+
+    def _velocity(self, rows):
+        """
+        기준점 이후의 평균 속도가 max_period년 전 확인 때와 같으면 그 속도로 발산
+        (위기 트리거가 다시 발동하며 증분이 오르내려도 누적 이동은 일정한 경로).
+        기준점은 처음 확인할 때 정하고 건너뛰기와 무관하게 유지한다.
+        """
+        if not len(rows):
+            return
+        x, t = self.x[rows], self.t[rows]
+        fresh = np.isnan(self.anchor[rows, 0])
+        self.anchor[rows[fresh]], self.anchor_t[rows[fresh]] = x[fresh], t[fresh]
+        velocity = (x - self.anchor[rows]) / np.maximum(t - self.anchor_t[rows], 1)[:, None]
+        size = _norm(velocity)
+        # 건너뛰기가 맞아 가는 경로 (backoff가 최소)는 영역이 바뀔 때까지 건너뛰며 따라간다
+        steady = (~fresh & (self.backoff[rows] > 2) & (size > self._atol(x))
+                  & (_norm(velocity - self.velocity[rows]) <= DRIFT_RTOL * size))
+        self.velocity[rows], self.mark[rows] = np.where(fresh[:, None], np.nan, velocity), t
+        d = rows[steady]
+        self.drift[d] = velocity[steady]
+        self._finish(d, DRIFT)
+
+    def _settle(self, rows):
+        # horizon에 닿았거나 평가 예산이 다한 경로: 최근 연평균 증분 (기준점이 있으면 그 뒤의 평균 속도)이
+        # 0이 아니면 발산, 0이면 판정 불가
+        if not len(rows):
+            return
+        inc = self._recent(self.inc, rows)
+        seen = np.isfinite(inc).all(axis=2)
+        count = seen.sum(axis=1)
+        mean = np.where(seen[:, :, None], inc, 0.0).sum(axis=1) / np.maximum(count, 1)[:, None]
+        mean[count == 0] = self.latest[rows[count == 0]]
+        since = ~np.isnan(self.anchor[rows, 0]) & (self.t[rows] > self.anchor_t[rows])
+        r = rows[since]
+        mean[since] = (self.x[r] - self.anchor[r]) / (self.t[r] - self.anchor_t[r])[:, None]
+        moving = _norm(mean) > self._atol(self.x[rows])
+        self.drift[rows[moving]] = mean[moving]
+        self._finish(rows[moving], DRIFT)
+
+    def result(self, rows):
+        # 한 주기 점이 아닌 경로는 보고하는 점 자체의 위기 여부
+        single = rows[(self.period[rows] == 1) & (self.status[rows] != DIVERGED)]
+        self.crisis[single] = np.asarray(in_crisis(_Point(self.x[single])))
+        drift = np.where((self.status[rows] == DRIFT)[:, None], self.drift[rows], 0.0)
+        return self.status[rows], self.x[rows], drift, self.period[rows], self.t[rows], self.crisis[rows]
+
+
+class _Point:
+    """
+    (…, 3) 점 배열을 위기 판정(stop_rules)에 넘기기 위한 속성 뷰.
+    """
+
+    def __init__(self, x: np.ndarray):
+        self.inflation = x[..., 0]
+        self.unemployment = x[..., 1]
+        self.growth = x[..., 2]
+
+
+# -------------------------------------------------------
+# 공개 API
+# -------------------------------------------------------
+def _as_policy_batch(policies) -> PolicyBatch:
+    if isinstance(policies, PolicyInput):
+        return PolicyBatch.from_policy(policies)
+    if isinstance(policies, PolicyBatch):
+        return policies
+    return PolicyBatch.from_policies(policies)
+
+
+def find_equilibrium(
+    state,
+    policies,
+    mode,
+    engine="v1",
+    method: str = "anderson",
+    tol: float = 1e-9,
+    max_iter: int = 100,
+    horizon: int = 1000,
+    max_period: int = 32,
+    divergence_bound: float = 1e8,
+) -> EquilibriumResult:
+    """
+    정책별 장기 균형을 한 번에 분석.
+    - state: EconomicState 또는 StateBatch (경로 분류의 출발점, 고정점 탐색의 초기값)
+    - policies: PolicyInput, PolicyBatch 또는 PolicyInput 시퀀스
+    - mode: 문자열 또는 시나리오별 모드 배열
+    - method: "anderson" 또는 "newton" (고정점 탐색)
+    - horizon: 경로 분류에서 따라갈 최대 연수 (단순 반복이라면 필요한 연수)
+    시나리오별 엔진 평가 수는 horizon을 넘지 않는다 (단순 반복으로 horizon년을 따라가는 비용):
+    고정점 탐색에 최대 horizon의 10%, 보고하는 점의 잔차·야코비안에 7회를 쓰고 나머지를 경로에 쓴다.
+    """
+    if method not in ("anderson", "newton"):
+        raise ValueError(f"알 수 없는 방법: {method!r} (가능: anderson, newton)")
+    policies = _as_policy_batch(policies)
+    states = as_state_batch(state)
+    n = max(len(states), len(policies), 1 if isinstance(mode, str) else len(np.atleast_1d(mode)))
+    x0 = np.stack([np.broadcast_to(getattr(states, name), (n,)) for name in VARIABLES], axis=-1).astype(np.float64)
+
+    F = _Map(policies, mode, n, engine)
+    idx = np.arange(n)
+    budget = horizon - FINAL_EVALUATIONS
+    path = _Path(F, x0, horizon, tol, max_period, divergence_bound, budget)
+    residual = np.full(n, np.nan)
+    spectral = np.full(n, np.nan)
+    measured = np.zeros(n, dtype=bool)
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        # 1) 몇 해 진행: 수렴·일정 증분(건너뛰기)은 여기서 끝난다
+        path.run(idx, WARMUP_YEARS)
+
+        # 2) 증분이 줄고 있는 경로만 고정점 탐색 (horizon의 10% 이내)
+        found = np.zeros(n, dtype=bool)
+        point = np.zeros((n, 3))
+        rows = idx[~path.done & path.shrinking]
+        if len(rows):
+            solve = _anderson if method == "anderson" else _newton
+            limit = min(budget, WARMUP_YEARS + horizon // 10)
+            x, res, ok = solve(F, rows, path.x[rows].copy(), tol, max_iter, divergence_bound, limit)
+            rows, x, res = rows[ok], x[ok], res[ok]
+            if len(rows):
+                radius = _spectral_radius(F.jacobian(rows, x))
+                # 반경이 1이면 고정점이 (누적 변수 방향으로) 이어져 있어 경로가 머무는 점은 3)에서 정한다
+                decided = np.abs(radius - 1.0) > 1e-9
+                rows, x = rows[decided], x[decided]
+                found[rows], point[rows], measured[rows] = True, x, True
+                residual[rows], spectral[rows] = res[decided], radius[decided]
+
+        # 3) 나머지는 실제 경로를 horizon까지 따라간다
+        rest = idx[~found]
+        path.run(rest, horizon)
+
+    status = np.full(n, UNRESOLVED, dtype=object)
+    drift = np.zeros((n, 3))
+    period = np.ones(n, dtype=np.int64)
+    crisis = np.zeros(n, dtype=bool)
+    years = path.t.copy()
+    status[found] = np.where(spectral[found] < 1.0, CONVERGED, UNSTABLE)
+    crisis[found] = np.asarray(in_crisis(_Point(point[found])))
+    status[rest], point[rest], drift[rest], period[rest], years[rest], crisis[rest] = path.result(rest)
+
+    # 보고하는 점의 잔차와 스펙트럼 반경 (수치 발산 제외, horizon이 아주 짧아 예산이 없으면 생략)
+    ok = np.flatnonzero(~measured & (status != DIVERGED) & (F.calls + FINAL_EVALUATIONS <= horizon))
+    if len(ok):
+        with np.errstate(over="ignore", invalid="ignore"):
+            residual[ok] = _norm(F(ok, point[ok]) - point[ok])
+            spectral[ok] = _spectral_radius(F.jacobian(ok, point[ok]))
+
+    return EquilibriumResult(
+        engine=engine if isinstance(engine, str) else getattr(engine, "__name__", str(engine)),
+        mode=mode,
+        horizon=horizon,
+        status=status.astype(str),
+        inflation=point[:, 0],
+        unemployment=point[:, 1],
+        growth=point[:, 2],
+        drift=drift,
+        period=period,
+        years=years,
+        iterations=F.calls,
+        residual=residual,
+        spectral_radius=spectral,
+        crisis=crisis,
+    )
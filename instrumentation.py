@@ -0,0 +1,356 @@
+"""
+엔진 계측 (단계별 시간, 위기 트리거 발동 횟수, 변동폭 제한 포화 횟수).
+
+enable()을 호출하면 엔진의 update_one_year와 배치 커널을 같은 소스에서
+계측 코드를 끼워 넣어 다시 컴파일한 함수로 교체하고, disable()로 원래 함수를 되돌린다.
+원래 엔진 코드에는 계측 코드가 전혀 없으므로 비활성 상태의 비용은 0이다.
+
+엔진 함수 교체는 프로세스 전체에 적용되므로 운영자 설정으로만 켠다:
+서버를 ECON_SIM_DIAGNOSTICS=1 (또는 엔진 이름 목록, 예: "v1,v2")로 띄우면
+enable_from_env()가 시작할 때 한 번 켜고, 세션(브라우저)에서는 결과만 조회한다.
+"""
+import ast
+import inspect
+import os
+import textwrap
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict
+
+import numpy as np
+
+from engine_registry import available_engines, get_engine, SCALAR
+
+
+# 계측 함수 안에서 프로파일 객체를 가리키는 이름
+PROBE = "__engine_probe__"
+
+DIAGNOSTICS_ENV = "ECON_SIM_DIAGNOSTICS"
+
+
+# -------------------------------------------------------
+# 프로파일 (계측 결과)
+# -------------------------------------------------------
+@dataclass
+class EngineProfile:
+    """
+    한 엔진의 누적 계측 결과.
+    - calls: 스칼라 호출 + 배치 커널 호출 수
+    - stage_seconds: 단계별 누적 시간
+    - branch_hits / branch_evaluations: 위기 트리거별 발동 수 / 평가된 시나리오 수
+    - clamp_lower / clamp_upper / clamp_evaluations: 변동폭 제한별 하한·상한 포화 수 / 평가 수
+    """
+    calls: int = 0
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    branch_hits: Dict[str, int] = field(default_factory=dict)
+    branch_evaluations: Dict[str, int] = field(default_factory=dict)
+    clamp_lower: Dict[str, int] = field(default_factory=dict)
+    clamp_upper: Dict[str, int] = field(default_factory=dict)
+    clamp_evaluations: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._local = threading.local()
+        # 여러 세션(스레드)이 같은 엔진을 동시에 호출하므로 누적값 갱신은 잠금 안에서
+        self._lock = threading.Lock()
+
+    # ----- 계측 함수에서 호출 -----
+    def begin(self):
+        with self._lock:
+            self.calls += 1
+        self._local.stage = "params"
+        self._local.t = time.perf_counter()
+
+    def stage(self, name: str):
+        now = time.perf_counter()
+        prev = self._local.stage
+        with self._lock:
+            self.stage_seconds[prev] = self.stage_seconds.get(prev, 0.0) + (now - self._local.t)
+        self._local.stage = name
+        self._local.t = now
+
+    def end(self):
+        self.stage("params")
+
+    def branch(self, name: str, hit):
+        if isinstance(hit, np.ndarray):
+            hits, n = int(np.count_nonzero(hit)), hit.size
+        else:
+            hits, n = int(bool(hit)), 1
+        with self._lock:
+            self.branch_hits[name] = self.branch_hits.get(name, 0) + hits
+            self.branch_evaluations[name] = self.branch_evaluations.get(name, 0) + n
+
+    def clamp(self, name: str, value, lower, upper):
+        if isinstance(value, np.ndarray):
+            low, high, n = int(np.count_nonzero(value < lower)), int(np.count_nonzero(value > upper)), value.size
+        else:
+            low, high, n = int(value < lower), int(value > upper), 1
+        with self._lock:
+            self.clamp_lower[name] = self.clamp_lower.get(name, 0) + low
+            self.clamp_upper[name] = self.clamp_upper.get(name, 0) + high
+            self.clamp_evaluations[name] = self.clamp_evaluations.get(name, 0) + n
+
+    def clear(self):
+        with self._lock:
+            self.calls = 0
+            for counters in (
+                self.stage_seconds, self.branch_hits, self.branch_evaluations,
+                self.clamp_lower, self.clamp_upper, self.clamp_evaluations,
+            ):
+                counters.clear()
+
+    # ----- 조회 -----
+    def stage_table(self):
+        with self._lock:
+            stages = dict(self.stage_seconds)
+        total = sum(stages.values()) or 1.0
+        return [
+            {"stage": name, "seconds": sec, "share": sec / total}
+            for name, sec in sorted(stages.items(), key=lambda item: -item[1])
+        ]
+
+    def branch_table(self):
+        with self._lock:
+            hits, evaluations = dict(self.branch_hits), dict(self.branch_evaluations)
+        return [
+            {
+                "trigger": name,
+                "hits": hits[name],
+                "evaluations": evaluations[name],
+                "rate": hits[name] / evaluations[name] if evaluations[name] else 0.0,
+            }
+            for name in hits
+        ]
+
+    def clamp_table(self):
+        with self._lock:
+            lower, upper, evaluations = dict(self.clamp_lower), dict(self.clamp_upper), dict(self.clamp_evaluations)
+        return [
+            {
+                "clamp": name,
+                "lower": lower[name],
+                "upper": upper[name],
+                "evaluations": evaluations[name],
+            }
+            for name in evaluations
+        ]
+
+
+# -------------------------------------------------------
+# 소스 변환
+# -------------------------------------------------------
+def _call(method: str, *args) -> ast.stmt:
+    return ast.Expr(
+        ast.Call(
+            func=ast.Attribute(value=ast.Name(PROBE, ast.Load()), attr=method, ctx=ast.Load()),
+            args=list(args),
+            keywords=[],
+        )
+    )
+
+
+def _targets(stmt):
+    if isinstance(stmt, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+        targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+        for target in targets:
+            for node in ast.walk(target):
+                if isinstance(node, ast.Name):
+                    yield node.id
+
+
+def _func_name(node) -> str:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return ""
+
+
+def _clamp(stmt):
+    """
+    X = max(min(X, HI), LO) / np.maximum(np.minimum(X, HI), LO) 형태면 (X, LO, HI)를 반환.
+    """
+    if not (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Name)):
+        return None
+    outer = stmt.value
+    if not (isinstance(outer, ast.Call) and _func_name(outer.func) in ("max", "maximum") and len(outer.args) == 2):
+        return None
+    inner = outer.args[0]
+    if not (isinstance(inner, ast.Call) and _func_name(inner.func) in ("min", "minimum") and len(inner.args) == 2):
+        return None
+    return stmt.targets[0].id, inner.args[0], outer.args[1], inner.args[1]
+
+
+def _branch_name(test) -> str:
+    """
+    unemp_1 > cr.unemployment_threshold / unemp_1 > unemployment_threshold → "unemployment"
+    """
+    if isinstance(test, ast.Compare):
+        for node in [test.left, *test.comparators]:
+            name = node.attr if isinstance(node, ast.Attribute) else node.id if isinstance(node, ast.Name) else ""
+            if name.endswith("_threshold"):
+                return name[: -len("_threshold")]
+    return None
+
+
+def _instrument_body(body, markers):
+    out = []
+    current = "params"
+    for stmt in body:
+        stage = next((markers[name] for name in _targets(stmt) if name in markers), None)
+        if stage is not None and stage != current:
+            out.append(_call("stage", ast.Constant(stage)))
+            current = stage
+
+        clamp = _clamp(stmt)
+        if clamp is not None:
+            name, value, lower, upper = clamp
+            out.append(_call("clamp", ast.Constant(name), value, lower, upper))
+
+        if isinstance(stmt, ast.If):
+            name = _branch_name(stmt.test)
+            if name is not None:
+                out.append(_call("branch", ast.Constant(name), stmt.test))
+
+        if isinstance(stmt, ast.Return):
+            out.append(_call("end"))
+
+        out.append(stmt)
+
+        # 배치 커널: hit = <비교식> 다음에 발동 수 집계
+        if isinstance(stmt, ast.Assign) and "hit" in set(_targets(stmt)):
+            name = _branch_name(stmt.value)
+            if name is not None:
+                out.append(_call("branch", ast.Constant(name), ast.Name("hit", ast.Load())))
+    return out
+
+
+def instrument_function(func, profile: EngineProfile):
+    """
+    func의 소스를 계측 코드가 들어간 새 함수로 다시 컴파일 (원본 func은 변경하지 않음).
+    """
+    source = textwrap.dedent(inspect.getsource(func))
+    tree = ast.parse(source)
+    fdef = tree.body[0]
+
+    body = list(fdef.body)
+    head = []
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str):
+        head.append(body.pop(0))
+    # 단계 표시는 명세에서 생성된 커널만 가진다 (없으면 전체가 한 단계로 집계됨)
+    markers = getattr(func, "__stage_markers__", {})
+    fdef.body = head + [_call("begin")] + _instrument_body(body, markers)
+    fdef.decorator_list = []
+    ast.fix_missing_locations(tree)
+
+    namespace = dict(func.__globals__)
+    namespace[PROBE] = profile
+    filename = f"<instrumented {func.__module__}.{func.__name__}>"
+    exec(compile(tree, filename, "exec"), namespace)
+    return namespace[fdef.name]
+
+
+# -------------------------------------------------------
+# 활성화 / 비활성화
+# -------------------------------------------------------
+# 계측 대상 함수 이름 (스칼라 경로, 배치 커널).
+# 스칼라 커널(_scalar_kernel)이 따로 있는 엔진은 update_one_year 대신 커널을 계측한다.
+TARGETS = ("update_one_year", "_scalar_kernel", "_batch_kernel")
+
+_profiles: Dict[str, EngineProfile] = {}
+_originals: Dict[str, Dict[str, object]] = {}
+_lock = threading.Lock()
+
+
+def is_enabled(engine: str = None) -> bool:
+    if engine is None:
+        return bool(_originals)
+    return engine in _originals
+
+
+def enable(engines=None):
+    """
+    엔진(이름 목록, None이면 전체)에 계측을 켠다. 이미 켜진 엔진은 그대로 둔다.
+    """
+    names = engines or [info.name for info in available_engines(SCALAR)]
+    with _lock:
+        for name in names:
+            if name in _originals:
+                continue
+            module = get_engine(name)
+            if not inspect.ismodule(module):
+                # 계수 구성(ConfiguredEngine)은 기반 엔진 함수를 호출하므로 기반 엔진 쪽에서 계측됨
+                continue
+            profile = _profiles.setdefault(name, EngineProfile())
+            originals = {attr: getattr(module, attr) for attr in TARGETS if hasattr(module, attr)}
+            if "_scalar_kernel" in originals:
+                del originals["update_one_year"]
+            for attr, func in originals.items():
+                setattr(module, attr, instrument_function(func, profile))
+            _originals[name] = originals
+
+
+def disable(engines=None):
+    """
+    계측을 끄고 원래 함수로 되돌린다 (누적 결과는 reset() 전까지 유지).
+    """
+    with _lock:
+        for name in list(engines or _originals):
+            originals = _originals.pop(name, None)
+            if originals is None:
+                continue
+            module = get_engine(name)
+            for attr, func in originals.items():
+                setattr(module, attr, func)
+
+
+def reset(engines=None):
+    with _lock:
+        for name in list(engines or _profiles):
+            profile = _profiles.get(name)
+            if profile is not None:
+                profile.clear()
+
+
+def enable_from_env(environ=None) -> bool:
+    """
+    환경 변수 ECON_SIM_DIAGNOSTICS가 켜져 있으면 계측을 켠다 (서버 시작 시 한 번 호출).
+    - "1" / "true" / "all": 전체 엔진, 그 밖의 값은 쉼표로 구분한 엔진 이름 목록
+    반환: 계측이 켜져 있는지 여부
+    """
+    value = (environ if environ is not None else os.environ).get(DIAGNOSTICS_ENV, "").strip()
+    if value.lower() in ("", "0", "false", "no", "off"):
+        return is_enabled()
+    if value.lower() in ("1", "true", "yes", "on", "all"):
+        enable()
+    else:
+        enable([name.strip() for name in value.split(",") if name.strip()])
+    return is_enabled()
+
+
+def report() -> Dict[str, EngineProfile]:
+    """
+    엔진 이름별 누적 계측 결과.
+    """
+    return dict(_profiles)
+
+
+@contextmanager
+def profiled(engines=None):
+    """
+    with 블록 동안만 계측을 켜고, 블록 안에서 쌓인 결과를 담은 dict를 돌려준다.
+    엔진 함수를 프로세스 전체에서 교체하므로 스크립트·벤치마크용이다 (서버에서는 enable_from_env).
+
+        with profiled(["v2"]) as profiles:
+            simulate(...)
+        profiles["v2"].branch_table()
+    """
+    was_enabled = set(_originals)
+    reset(engines)
+    enable(engines)
+    try:
+        yield _profiles
+    finally:
+        disable([name for name in (engines or list(_originals)) if name not in was_enabled])
@@ -0,0 +1,637 @@
+"""
+선언형 모델 명세와 엔진 커널 생성기.
+
+엔진의 식(편차, 가중합, 변동폭 제한, 피드백, 위기 트리거)을 ModelSpec으로 적어 두면
+compile_spec이 같은 명세에서 스칼라 커널과 NumPy 배치 커널을 생성한다.
+생성한 소스는 디스크에 쓰지 않고 메모리에서 바로 컴파일하며 (프로세스 안에서는 명세 해시별로 한 번),
+소스를 linecache에 등록해 inspect.getsource(계측)와 traceback도 그대로 동작한다.
+
+식 문법 (파이썬 식):
+- state.<필드> / policy.<필드>: 이전 상태 / 정책 입력
+- c.<경로>: 계수 세트의 값 (모드 배율 미적용), 예: c.neutral.interest
+- mode.<배율>: ModeScales 값, 예: mode.expectation
+- 그 밖의 이름: 앞에서 정의한 변수 또는 Param
+- 함수: max, min, abs (배치 커널에서는 np.maximum / np.minimum / np.abs)
+
+연산 순서를 식에 적힌 그대로 유지하므로 스칼라 함수와 배치 커널의 결과가 정확히 일치한다.
+"""
+import ast
+import inspect
+import linecache
+import sys
+import types
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from data_model import POLICY_FIELDS, STATE_FIELDS
+from engine_params import DEFAULT_MODE_SCALES, ModeScales, mode_scales, run_by_mode
+from sim_cache import stable_hash
+
+
+SCALE_NAMES = tuple(f.name for f in fields(ModeScales))
+
+# 생성 코드가 내부적으로 쓰는 이름 (명세 변수로 사용 불가)
+RESERVED = frozenset({
+    "state", "policy", "states", "policies", "mode", "params", "p", "c", "s",
+    "np", "zero", "hit", "EconomicState", "StateBatch",
+})
+
+
+# -------------------------------------------------------
+# 명세
+# -------------------------------------------------------
+@dataclass(frozen=True)
+class Let:
+    """
+    name = expr
+    """
+    name: str
+    expr: str
+
+
+@dataclass(frozen=True)
+class Deviation:
+    """
+    정책 변수의 기준값 대비 편차: policy - neutral (relative면 (policy - neutral) / neutral).
+    - neutral: 기준값의 계수 경로 (예: "neutral.interest")
+    """
+    name: str
+    policy: str
+    neutral: str
+    relative: bool = False
+
+
+@dataclass(frozen=True)
+class Linear:
+    """
+    name = start + Σ (weight × expr), 왼쪽부터 순서대로 누적.
+    - terms: (가중치 계수 경로, 식) 목록. 가중치에는 모드 배율 scale이 곱해진다 (None이면 원본 값)
+    - start: 시작값 식 (None이면 첫 항부터)
+    """
+    name: str
+    terms: Tuple[Tuple[str, str], ...]
+    start: Optional[str] = None
+    scale: Optional[str] = "shock"
+
+
+@dataclass(frozen=True)
+class Effect:
+    """
+    name = weight × expr (피드백 등 단일 효과). weight에는 모드 배율 scale이 곱해진다.
+    """
+    name: str
+    weight: str
+    expr: str
+    scale: Optional[str] = "feedback"
+
+
+@dataclass(frozen=True)
+class Clamp:
+    """
+    name을 [lower, upper]로 제한 (식).
+    """
+    name: str
+    lower: str
+    upper: str
+
+
+@dataclass(frozen=True)
+class CrisisRule:
+    """
+    variable <op> threshold(계수 경로)이면 effects를 적용.
+    - effects: (누적 변수, "+" 또는 "-", 크기 계수 경로) 목록
+    """
+    name: str
+    variable: str
+    op: str
+    threshold: str
+    effects: Tuple[Tuple[str, str, str], ...]
+
+
+@dataclass(frozen=True)
+class Crisis:
+    """
+    위기 트리거 묶음. accumulators는 0에서 시작해 규칙 순서대로 효과가 누적된다.
+    효과 크기에는 모드 배율 scale이 곱해진다.
+    """
+    accumulators: Tuple[str, ...]
+    rules: Tuple[CrisisRule, ...]
+    scale: Optional[str] = "crisis_trigger"
+
+
+@dataclass(frozen=True)
+class Param:
+    """
+    모드별 파라미터 계산 시 한 번만 구하는 값 (식에는 c.<경로>와 mode.<배율>만 사용).
+    """
+    name: str
+    expr: str
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    계측 단계 이름과 그 단계의 식 목록.
+    """
+    name: str
+    equations: tuple
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """
+    엔진 모델 명세.
+    - stages: 순서대로 계산할 단계
+    - outputs: (상태 필드, 변수) — 다음 해 상태
+    - params: 모드별로 미리 계산할 파생 파라미터
+    """
+    name: str
+    stages: Tuple[Stage, ...]
+    outputs: Tuple[Tuple[str, str], ...]
+    params: Tuple[Param, ...] = ()
+
+    @property
+    def spec_hash(self) -> str:
+        return stable_hash("model-spec", generator_hash(), self)
+
+
+@dataclass(frozen=True)
+class EngineParams:
+    """
+    모드 배율까지 곱해 둔 파라미터. values 순서는 생성 모듈의 SLOTS와 같다.
+    """
+    mode: str
+    values: tuple
+
+
+# -------------------------------------------------------
+# 공통 식 블록 (v1 / v2 공용)
+# -------------------------------------------------------
+# 중립값 대비 편차 (전기요금·환율·유가는 변화율)
+DEVIATIONS = (
+    Deviation("d_interest", "interest_rate", "neutral.interest"),
+    Deviation("d_tax", "corporate_tax", "neutral.corp_tax"),
+    Deviation("d_elec", "electricity_cost", "neutral.elec_cost", relative=True),
+    Deviation("d_fx", "exchange_rate", "neutral.fx", relative=True),
+    Deviation("d_gov", "government_spending_ratio", "neutral.gov_ratio"),
+    Deviation("d_conf", "consumer_confidence", "neutral.confidence"),
+    Deviation("d_invest", "corporate_investment", "neutral.invest"),
+    Deviation("d_global", "global_demand", "neutral.global_demand"),
+    Deviation("d_oil", "oil_price", "neutral.oil", relative=True),
+    Deviation("d_prod", "productivity", "neutral.productivity"),
+)
+
+# 잠재성장률 = base + Σ w × (지수 편차 / 10), [lower, upper]로 제한
+POTENTIAL_GROWTH = (
+    Linear(
+        "potential_growth",
+        terms=(
+            ("potential.w_productivity", "(policy.productivity - c.neutral.productivity) / 10.0"),
+            ("potential.w_investment", "(policy.corporate_investment - c.neutral.invest) / 10.0"),
+            ("potential.w_global", "(policy.global_demand - c.neutral.global_demand) / 10.0"),
+        ),
+        start="c.potential.base",
+        scale="potential",
+    ),
+    Clamp("potential_growth", "c.potential.lower", "c.potential.upper"),
+)
+
+# 지표 간 피드백 (growth_1 / inflation_1 / unemp_1 기준)
+FEEDBACK = (
+    # 실업률 ↑ → 소비 ↓ → 성장률 ↓
+    Effect("fb_growth_from_unemp", "feedback.growth_from_unemp", "unemp_1 - state.unemployment"),
+    # 물가 ↑ → 실질임금 ↓ → 소비 ↓ → 성장률 ↓
+    Effect("fb_growth_from_infl", "feedback.growth_from_infl", "inflation_1 - state.inflation"),
+    # 성장률 변화의 자기 강화/조정
+    Effect("fb_growth_from_growth", "feedback.growth_from_growth", "growth_1 - state.growth"),
+    # 환율 ↑ → 수입물가 ↑ → 물가 ↑
+    Effect("fb_infl_from_fx", "feedback.infl_from_fx", "d_fx"),
+    # 실업률 ↑ → 수요 ↓ → 물가 ↓
+    Effect("fb_infl_from_unemp", "feedback.infl_from_unemp", "unemp_1 - state.unemployment"),
+    # 성장률 ↓ → 실업률 ↑ (추가 오쿤의 법칙 효과)
+    Effect("fb_unemp_from_growth", "feedback.unemp_from_growth", "growth_1 - state.growth"),
+)
+
+# 위기 트리거 (실업률·물가·성장률 임계값)
+CRISIS = Crisis(
+    accumulators=("crisis_growth_penalty", "crisis_inflation_spike", "crisis_unemployment_spike"),
+    rules=(
+        CrisisRule("unemployment", "unemp_1", ">", "crisis.unemployment_threshold", (
+            ("crisis_growth_penalty", "-", "crisis.unemp_growth_penalty"),
+            ("crisis_unemployment_spike", "+", "crisis.unemp_unemp_spike"),
+        )),
+        CrisisRule("inflation", "inflation_1", ">", "crisis.inflation_threshold", (
+            ("crisis_growth_penalty", "-", "crisis.infl_growth_penalty"),
+            ("crisis_inflation_spike", "+", "crisis.infl_infl_spike"),
+        )),
+        CrisisRule("growth", "growth_1", "<", "crisis.growth_threshold", (
+            ("crisis_growth_penalty", "-", "crisis.growth_growth_penalty"),
+            ("crisis_unemployment_spike", "+", "crisis.growth_unemp_spike"),
+        )),
+    ),
+)
+
+# 최종 지표 = 1차 값 + 피드백 + 위기 효과, 성장률 변동폭 제한 후 GDP 갱신
+FINAL = (
+    Let("final_growth", "growth_1 + fb_growth_from_unemp + fb_growth_from_infl + fb_growth_from_growth + crisis_growth_penalty"),
+    Let("final_inflation", "inflation_1 + fb_infl_from_fx + fb_infl_from_unemp + crisis_inflation_spike"),
+    Let("final_unemployment", "unemp_1 + fb_unemp_from_growth + crisis_unemployment_spike"),
+    Clamp("final_growth", "c.growth_lower", "c.growth_upper"),
+    Let("final_gdp", "state.gdp * (1 + final_growth / 100)"),
+)
+
+OUTPUTS = (
+    ("gdp", "final_gdp"),
+    ("inflation", "final_inflation"),
+    ("unemployment", "final_unemployment"),
+    ("growth", "final_growth"),
+)
+
+
+# -------------------------------------------------------
+# 코드 생성
+# -------------------------------------------------------
+def _chain(node):
+    """
+    a.b.c 속성 체인 → ["a", "b", "c"] (체인이 아니면 None).
+    """
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return parts[::-1]
+
+
+_BATCH_FUNCS = {"max": "maximum", "min": "minimum", "abs": "abs"}
+
+
+class _Generator:
+    def __init__(self, spec: ModelSpec):
+        self.spec = spec
+        self.slots: Dict[tuple, str] = {}       # 키 → 지역 변수 이름
+        self.slot_source: Dict[str, str] = {}   # 지역 변수 이름 → compile_values 식
+        self.params = {param.name: param for param in spec.params}
+        self.defined = set()
+        # 명세의 모든 변수 이름 (슬롯 이름이 나중에 정의될 변수와 겹치지 않도록)
+        self.variables = set()
+        for stage in spec.stages:
+            for eq in stage.equations:
+                self.variables.update(eq.accumulators if isinstance(eq, Crisis) else (eq.name,))
+
+    # ----- 파라미터 슬롯 -----
+    def slot(self, key: tuple, name: str, source: str) -> str:
+        local = self.slots.get(key)
+        if local is not None:
+            return local
+        local = name
+        while local in self.slot_source or local in self.variables or local in RESERVED:
+            local += "_"
+        self.slots[key] = local
+        self.slot_source[local] = source
+        return local
+
+    def coefficient(self, path: str, scale: Optional[str] = None) -> str:
+        if scale is not None and scale not in SCALE_NAMES:
+            raise ValueError(f"알 수 없는 모드 배율: {scale!r} (가능: {', '.join(SCALE_NAMES)})")
+        source = f"c.{path}" if scale is None else f"c.{path} * s.{scale}"
+        return self.slot(("c", path, scale), path.replace(".", "_"), source)
+
+    def mode_scale(self, scale: str) -> str:
+        if scale not in SCALE_NAMES:
+            raise ValueError(f"알 수 없는 모드 배율: {scale!r} (가능: {', '.join(SCALE_NAMES)})")
+        return self.slot(("mode", scale), f"mode_{scale}", f"s.{scale}")
+
+    def param(self, name: str) -> str:
+        source = self.expression(self.params[name].expr, batch=False, compile_time=True)
+        return self.slot(("param", name), name, source)
+
+    # ----- 식 변환 -----
+    def expression(self, text: str, batch: bool, compile_time: bool = False) -> str:
+        return ast.unparse(self.expression_ast(text, batch, compile_time))
+
+    def expression_ast(self, text: str, batch: bool, compile_time: bool = False):
+        gen = self
+
+        class Rewrite(ast.NodeTransformer):
+            def visit_Attribute(self, node):
+                parts = _chain(node)
+                if parts is None:
+                    raise ValueError(f"지원하지 않는 식: {text!r}")
+                root, rest = parts[0], parts[1:]
+                if compile_time:
+                    if root == "c":
+                        return ast.parse(f"c.{'.'.join(rest)}", mode="eval").body
+                    if root == "mode" and len(rest) == 1 and rest[0] in SCALE_NAMES:
+                        return ast.parse(f"s.{rest[0]}", mode="eval").body
+                    raise ValueError(f"Param 식에는 c.<경로>와 mode.<배율>만 쓸 수 있습니다: {text!r}")
+                if root in ("state", "policy") and len(rest) == 1:
+                    allowed = STATE_FIELDS if root == "state" else POLICY_FIELDS
+                    if rest[0] not in allowed:
+                        raise ValueError(f"{root}에 없는 필드: {rest[0]!r}")
+                    base = {"state": "states", "policy": "policies"}[root] if batch else root
+                    return ast.Attribute(ast.Name(base, ast.Load()), rest[0], ast.Load())
+                if root == "c" and rest:
+                    return ast.Name(gen.coefficient(".".join(rest)), ast.Load())
+                if root == "mode" and len(rest) == 1:
+                    return ast.Name(gen.mode_scale(rest[0]), ast.Load())
+                raise ValueError(f"알 수 없는 참조: {'.'.join(parts)!r} ({text!r})")
+
+            def visit_Name(self, node):
+                if compile_time:
+                    raise ValueError(f"Param 식에는 변수를 쓸 수 없습니다: {node.id!r}")
+                if node.id in gen.params:
+                    return ast.Name(gen.param(node.id), ast.Load())
+                if node.id not in gen.defined:
+                    raise ValueError(f"정의되지 않은 변수: {node.id!r} ({text!r})")
+                return node
+
+            def visit_Call(self, node):
+                name = node.func.id if isinstance(node.func, ast.Name) else None
+                if name not in _BATCH_FUNCS or node.keywords:
+                    raise ValueError(f"지원하지 않는 함수: {ast.unparse(node.func)!r}")
+                node.args = [self.visit(arg) for arg in node.args]
+                if batch:
+                    node.func = ast.Attribute(ast.Name("np", ast.Load()), _BATCH_FUNCS[name], ast.Load())
+                return node
+
+        tree = ast.parse(text.strip(), mode="eval")
+        return Rewrite().visit(tree).body
+
+    def define(self, name: str):
+        if name in RESERVED or name in self.params or not name.isidentifier():
+            raise ValueError(f"변수 이름으로 쓸 수 없습니다: {name!r}")
+        self.defined.add(name)
+
+    # ----- 식 하나 → (스칼라 줄, 배치 줄) -----
+    def equation(self, eq) -> Tuple[List[str], List[str]]:
+        if isinstance(eq, Deviation):
+            diff = f"policy.{eq.policy} - c.{eq.neutral}"
+            return self.equation(Let(eq.name, f"({diff}) / c.{eq.neutral}" if eq.relative else diff))
+
+        if isinstance(eq, Let):
+            scalar = self.expression(eq.expr, batch=False)
+            batch = self.expression(eq.expr, batch=True)
+            self.define(eq.name)
+            return [f"{eq.name} = {scalar}"], [f"{eq.name} = {batch}"]
+
+        if isinstance(eq, Linear):
+            if not eq.terms:
+                raise ValueError(f"{eq.name}: 항이 없습니다.")
+            out = []
+            for batch in (False, True):
+                items = [] if eq.start is None else [self.expression(eq.start, batch)]
+                for weight, expr in eq.terms:
+                    term = ast.BinOp(
+                        ast.Name(self.coefficient(weight, eq.scale), ast.Load()),
+                        ast.Mult(),
+                        self.expression_ast(expr, batch),
+                    )
+                    items.append(ast.unparse(term))
+                body = [f"    {items[0]}"] + [f"    + {item}" for item in items[1:]]
+                out.append([f"{eq.name} = ("] + body + [")"])
+            self.define(eq.name)
+            return out[0], out[1]
+
+        if isinstance(eq, Effect):
+            out = []
+            for batch in (False, True):
+                term = ast.BinOp(
+                    ast.Name(self.coefficient(eq.weight, eq.scale), ast.Load()),
+                    ast.Mult(),
+                    self.expression_ast(eq.expr, batch),
+                )
+                out.append([f"{eq.name} = {ast.unparse(term)}"])
+            self.define(eq.name)
+            return out[0], out[1]
+
+        if isinstance(eq, Clamp):
+            if eq.name not in self.defined:
+                raise ValueError(f"정의되지 않은 변수의 변동폭 제한: {eq.name!r}")
+            lo, hi = self.expression(eq.lower, False), self.expression(eq.upper, False)
+            return (
+                [f"{eq.name} = max(min({eq.name}, {hi}), {lo})"],
+                [f"{eq.name} = np.maximum(np.minimum({eq.name}, {hi}), {lo})"],
+            )
+
+        if isinstance(eq, Crisis):
+            return self.crisis(eq)
+
+        raise TypeError(f"알 수 없는 식 종류: {type(eq).__name__}")
+
+    def crisis(self, eq: Crisis):
+        for name in eq.accumulators:
+            self.define(name)
+        scalar = [f"{name} = 0.0" for name in eq.accumulators]
+        variables = []
+        for rule in eq.rules:
+            if rule.variable not in self.defined:
+                raise ValueError(f"{rule.name}: 정의되지 않은 변수 {rule.variable!r}")
+            if rule.variable not in variables:
+                variables.append(rule.variable)
+        batch = [f"zero = np.zeros(np.broadcast({', '.join(variables)}).shape)"]
+        batch += [f"{name} = zero" for name in eq.accumulators]
+
+        for rule in eq.rules:
+            if rule.op not in (">", "<", ">=", "<="):
+                raise ValueError(f"{rule.name}: 지원하지 않는 비교 연산 {rule.op!r}")
+            threshold = self.slot(("threshold", rule.name), f"{rule.name}_threshold", f"c.{rule.threshold}")
+            test = f"{rule.variable} {rule.op} {threshold}"
+            scalar += ["", f"# {rule.name} 위기", f"if {test}:"]
+            batch += ["", f"# {rule.name} 위기", f"hit = {test}"]
+            for target, sign, size in rule.effects:
+                if target not in eq.accumulators:
+                    raise ValueError(f"{rule.name}: 누적 변수가 아닙니다: {target!r}")
+                if sign not in ("+", "-"):
+                    raise ValueError(f"{rule.name}: 부호는 '+' 또는 '-'입니다: {sign!r}")
+                value = self.coefficient(size, eq.scale)
+                scalar.append(f"    {target} {sign}= {value}")
+                batch.append(f"{target} = np.where(hit, {target} {sign} {value}, {target})")
+        return scalar, batch
+
+    # ----- 모듈 소스 -----
+    def source(self) -> str:
+        spec = self.spec
+        scalar_body, batch_body = [], []
+        scalar_markers, batch_markers = {}, {}
+
+        for stage in spec.stages:
+            scalar_body += ["", f"# ===== {stage.name} ====="]
+            batch_body += ["", f"# ===== {stage.name} ====="]
+            first = True
+            for eq in stage.equations:
+                s_lines, b_lines = self.equation(eq)
+                if first:
+                    scalar_markers[_first_target(s_lines)] = stage.name
+                    batch_markers[_first_target(b_lines)] = stage.name
+                    first = False
+                scalar_body += s_lines
+                batch_body += b_lines
+
+        for field, name in spec.outputs:
+            if field not in STATE_FIELDS or name not in self.defined:
+                raise ValueError(f"출력 {field!r} ← {name!r}를 확인하세요.")
+        missing = set(STATE_FIELDS) - {field for field, _ in spec.outputs}
+        if missing:
+            raise ValueError(f"출력에 없는 상태 필드: {sorted(missing)}")
+        outputs = ", ".join(f"{field}={name}" for field, name in spec.outputs)
+
+        slots = list(self.slot_source)
+        unpack = _wrap(slots) + " = p.values" if len(slots) > 1 else f"{slots[0]}, = p.values"
+
+        def indent(lines):
+            return "\n".join(("    " + line) if line else "" for line in lines)
+
+        values = "\n".join(f"        {self.slot_source[name]}," for name in slots)
+        return f'''# 자동 생성 파일: model_spec.compile_spec이 명세 "{spec.name}"에서 생성 (직접 수정하지 말 것)
+# spec hash: {spec.spec_hash}
+import numpy as np
+
+from data_model import EconomicState, StateBatch
+
+SPEC_NAME = {spec.name!r}
+SPEC_HASH = {spec.spec_hash!r}
+
+# EngineParams.values 순서
+SLOTS = {_wrap([repr(name) for name in slots])}
+
+
+def compile_values(c, s):
+    """
+    계수 세트 c와 모드 배율 s로 파라미터 값 튜플을 만든다 (순서는 SLOTS).
+    """
+    return (
+{values}
+    )
+
+
+def scalar_kernel(state, policy, p):
+    """
+    명세 "{spec.name}"의 스칼라 경로.
+    """
+{indent(unpack.splitlines())}
+{indent(scalar_body)}
+
+    return EconomicState({outputs})
+
+
+def batch_kernel(states, policies, p):
+    """
+    명세 "{spec.name}"의 배치 커널 (스칼라 경로와 같은 연산 순서).
+    """
+{indent(unpack.splitlines())}
+{indent(batch_body)}
+
+    return StateBatch({outputs})
+
+
+# 계측용 단계 표시 (각 단계의 첫 번째 대입 변수 → 단계 이름)
+scalar_kernel.__stage_markers__ = {scalar_markers!r}
+batch_kernel.__stage_markers__ = {batch_markers!r}
+'''
+
+
+def _first_target(lines: List[str]) -> str:
+    return lines[0].split("=", 1)[0].strip()
+
+
+def _wrap(names: List[str], width: int = 96) -> str:
+    lines, line = [], ""
+    for name in names:
+        piece = name + ","
+        if line and len(line) + 1 + len(piece) > width:
+            lines.append(line)
+            line = piece
+        else:
+            line = f"{line} {piece}" if line else piece
+    lines.append(line)
+    return "(\n" + "\n".join("    " + line for line in lines) + "\n)"
+
+
+def generate_source(spec: ModelSpec) -> str:
+    """
+    명세에서 생성 모듈 소스를 만든다 (명세 오류는 ValueError).
+    """
+    return _Generator(spec).source()
+
+
+# -------------------------------------------------------
+# 컴파일 / 로드
+# -------------------------------------------------------
+@lru_cache(maxsize=1)
+def generator_hash() -> str:
+    """
+    생성기(이 모듈) 소스의 해시. 생성 코드 형식이 바뀌면 명세 해시도 함께 바뀐다.
+    """
+    return stable_hash("model-generator", inspect.getsource(sys.modules[__name__]))
+
+
+_modules: Dict[str, types.ModuleType] = {}
+
+
+def compile_spec(spec: ModelSpec, coefficients=None) -> types.ModuleType:
+    """
+    명세를 생성 모듈로 컴파일 (프로세스 안에서는 명세 해시별로 한 번).
+    coefficients를 주면 모든 계수 경로가 존재하는지 확인한다.
+    """
+    digest = spec.spec_hash
+    module = _modules.get(digest)
+    if module is None:
+        source = generate_source(spec)
+        name = f"_model_{spec.name}_{digest[:16]}"
+        filename = f"<model {spec.name}-{digest[:16]}>"
+        code = compile(source, filename, "exec")
+
+        module = types.ModuleType(name)
+        module.__file__ = filename
+        # inspect.getsource(계측)와 traceback이 생성 소스를 찾을 수 있게 등록
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+        sys.modules[name] = module
+        exec(code, module.__dict__)
+        _modules[digest] = module
+
+    if coefficients is not None:
+        try:
+            module.compile_values(coefficients, DEFAULT_MODE_SCALES)
+        except AttributeError as e:
+            raise ValueError(f"명세 {spec.name!r}가 참조하는 계수가 {type(coefficients).__name__}에 없습니다: {e}") from None
+    return module
+
+
+# -------------------------------------------------------
+# 명세로 엔진 만들기 (모델 변형용)
+# -------------------------------------------------------
+def build_engine(spec: ModelSpec, coefficients) -> types.ModuleType:
+    """
+    명세 + 기본 계수 세트로 엔진 모듈(update_one_year / update_one_year_batch / compile_params)을 만든다.
+    engine_registry.register_engine(name, ..., factory=partial(build_engine, spec, coefficients))로 등록.
+    """
+    model = compile_spec(spec, coefficients)
+    engine = types.ModuleType(f"engine_{spec.name}")
+
+    @lru_cache(maxsize=256)
+    def compile_params(mode: str, coefficients=coefficients) -> EngineParams:
+        return EngineParams(mode, model.compile_values(coefficients, mode_scales(mode)))
+
+    # 커널은 호출할 때마다 engine 속성에서 찾으므로 계측으로 교체할 수 있다
+    def update_one_year(state, policy, mode, params=None):
+        return engine._scalar_kernel(state, policy, params if params is not None else compile_params(mode))
+
+    def update_one_year_batch(states, policies, mode, params=None):
+        if params is not None:
+            return engine._batch_kernel(states, policies, params)
+        return run_by_mode(engine._batch_kernel, compile_params, states, policies, mode)
+
+    engine.SPEC = spec
+    engine.Coefficients = type(coefficients)
+    engine.DEFAULT_COEFFICIENTS = coefficients
+    engine.EngineParams = EngineParams
+    engine.compile_params = compile_params
+    engine.update_one_year = update_one_year
+    engine.update_one_year_batch = update_one_year_batch
+    engine._scalar_kernel = model.scalar_kernel
+    engine._batch_kernel = model.batch_kernel
+    return engine
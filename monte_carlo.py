@@ -0,0 +1,259 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from data_model import EconomicState, PolicyInput, StateBatch, PolicyBatch, POLICY_FIELDS, STATE_FIELDS
+from simulation import resolve_engine
+
+
+DEFAULT_QUANTILES = (5, 25, 50, 75, 95)
+
+# 청크별 분위수 스케치 크기 (확률 0~1을 등간격으로 나눈 점 개수)
+SKETCH_POINTS = 1025
+
+
+# -------------------------------------------------------
+# 외생 변수 충격 과정
+# -------------------------------------------------------
+@dataclass(frozen=True)
+class AR1:
+    """
+    AR(1) 과정: x_t = mean + phi * (x_{t-1} - mean) + sigma * e_t
+    - mean이 None이면 정책 입력값(시작값)을 장기 평균으로 사용
+    - lower / upper: 값의 허용 범위 (지수형 변수는 0~200 등)
+    """
+    sigma: float
+    phi: float = 0.7
+    mean: Optional[float] = None
+    lower: Optional[float] = None
+    upper: Optional[float] = None
+
+    def sample(self, rng: np.random.Generator, start: float, n_paths: int, years: int) -> np.ndarray:
+        mean = start if self.mean is None else self.mean
+        eps = rng.standard_normal((years, n_paths)) * self.sigma
+        out = np.empty((years, n_paths))
+        x = np.full(n_paths, float(start))
+        for t in range(years):
+            x = mean + self.phi * (x - mean) + eps[t]
+            if self.lower is not None or self.upper is not None:
+                x = np.clip(x, self.lower, self.upper)
+            out[t] = x
+        return out
+
+
+@dataclass(frozen=True)
+class RandomWalk:
+    """
+    랜덤워크: x_t = x_{t-1} + drift + sigma * e_t
+    """
+    sigma: float
+    drift: float = 0.0
+    lower: Optional[float] = None
+    upper: Optional[float] = None
+
+    def sample(self, rng: np.random.Generator, start: float, n_paths: int, years: int) -> np.ndarray:
+        steps = rng.standard_normal((years, n_paths)) * self.sigma + self.drift
+        if self.lower is None and self.upper is None:
+            return float(start) + np.cumsum(steps, axis=0)
+
+        # 경계에 막힌 경로가 이후에도 경계 안에서 움직이도록 순차적으로 제한
+        out = np.empty((years, n_paths))
+        x = np.full(n_paths, float(start))
+        for t in range(years):
+            x = np.clip(x + steps[t], self.lower, self.upper)
+            out[t] = x
+        return out
+
+
+def default_shocks() -> Dict[str, object]:
+    """
+    PolicyInput의 외생 변수 5종에 대한 기본 충격 과정.
+    """
+    return {
+        "oil_price": AR1(sigma=8.0, phi=0.6, lower=0.0),
+        "exchange_rate": RandomWalk(sigma=40.0, lower=500.0, upper=2500.0),
+        "global_demand": AR1(sigma=5.0, phi=0.7, lower=0.0, upper=200.0),
+        "consumer_confidence": AR1(sigma=6.0, phi=0.6, lower=0.0, upper=200.0),
+        "productivity": AR1(sigma=3.0, phi=0.8, lower=0.0, upper=200.0),
+    }
+
+
+# -------------------------------------------------------
+# 분위수 스케치 (경로 전체를 보관하지 않고 스트리밍 축약)
+# -------------------------------------------------------
+def _sketch(values: np.ndarray) -> np.ndarray:
+    """
+    (행, 경로) 배열을 행별 등간격 분위수 SKETCH_POINTS개로 요약.
+    """
+    # 분위수가 많을 때는 np.quantile의 다중 partition보다 한 번 정렬하는 편이 빠름
+    ordered = np.sort(values, axis=-1)
+    position = np.linspace(0.0, values.shape[-1] - 1, SKETCH_POINTS)
+    lo = np.floor(position).astype(np.intp)
+    hi = np.minimum(lo + 1, values.shape[-1] - 1)
+    frac = position - lo
+    return ordered[:, lo] * (1.0 - frac) + ordered[:, hi] * frac
+
+
+def _merge_sketches(a: np.ndarray, n_a: int, b: np.ndarray, n_b: int) -> np.ndarray:
+    """
+    경로 수 n_a, n_b를 대표하는 두 스케치를 가중 병합해 다시 SKETCH_POINTS개로 압축.
+    _sketch와 같이 i번째 점을 분위수 i/(k-1)로 보고 두 분포의 구간 선형 CDF를 경로 수로 가중 평균한 뒤,
+    혼합 CDF를 같은 등간격 분위수에서 역산 (병합을 반복해도 꼬리가 밀려나지 않음).
+    """
+    k = a.shape[-1]
+    grid = np.linspace(0.0, 1.0, k)
+    share = n_a / (n_a + n_b)
+    merged = np.empty_like(a)
+    for row in range(a.shape[0]):
+        values = np.sort(np.concatenate([a[row], b[row]]))
+        cdf = share * np.interp(values, a[row], grid) + (1.0 - share) * np.interp(values, b[row], grid)
+        merged[row] = np.interp(grid, cdf, values)
+    return merged
+
+
+# -------------------------------------------------------
+# 청크 실행 (워커 프로세스)
+# -------------------------------------------------------
+def _run_chunk(task):
+    state, policy, mode, years, engine, shocks, n_paths, seed = task
+    engine = resolve_engine(engine)
+    rng = np.random.default_rng(seed)
+
+    paths = {name: process.sample(rng, getattr(policy, name), n_paths, years) for name, process in shocks.items()}
+    fixed = {name: getattr(policy, name) for name in POLICY_FIELDS if name not in paths}
+
+    states = StateBatch(
+        gdp=np.full(n_paths, state.gdp),
+        inflation=np.full(n_paths, state.inflation),
+        unemployment=np.full(n_paths, state.unemployment),
+        growth=np.full(n_paths, state.growth),
+    )
+    out = np.empty((len(STATE_FIELDS), years, n_paths))
+    for t in range(years):
+        policies = PolicyBatch(**fixed, **{name: path[t] for name, path in paths.items()})
+        states = engine.update_one_year_batch(states, policies, mode)
+        for i, name in enumerate(STATE_FIELDS):
+            out[i, t] = getattr(states, name)
+
+    values = out.reshape(len(STATE_FIELDS) * years, n_paths)
+    mean = values.mean(axis=-1)
+    m2 = ((values - mean[:, None]) ** 2).sum(axis=-1)
+    return n_paths, _sketch(values), mean, m2
+
+
+# -------------------------------------------------------
+# 결과
+# -------------------------------------------------------
+@dataclass
+class FanChart:
+    """
+    몬테카를로 결과의 연도별 분포 요약.
+    - quantiles[metric]: (분위수 개수, years) 배열
+    - mean[metric] / std[metric]: (years,) 배열
+    """
+    year: np.ndarray
+    levels: Tuple[float, ...]
+    quantiles: Dict[str, np.ndarray]
+    mean: Dict[str, np.ndarray]
+    std: Dict[str, np.ndarray]
+    n_paths: int
+
+    def frame(self, metric: str):
+        """
+        한 지표의 연도별 분위수 표 (year, mean, p5, p25, ...).
+        """
+        import pandas as pd
+
+        data = {"year": self.year, "mean": self.mean[metric]}
+        for level, row in zip(self.levels, self.quantiles[metric]):
+            data[f"p{level:g}"] = row
+        return pd.DataFrame(data)
+
+
+def run_monte_carlo(
+    state: EconomicState,
+    policy: PolicyInput,
+    mode: str,
+    years: int,
+    n_paths: int,
+    shocks: Optional[Dict[str, object]] = None,
+    engine: str = "v1",
+    seed: Optional[int] = None,
+    chunk_size: int = 10_000,
+    workers: Optional[int] = None,
+    quantiles=DEFAULT_QUANTILES,
+) -> FanChart:
+    """
+    외생 변수에 확률적 충격 경로를 주고 n_paths개 경로를 시뮬레이션.
+    - shocks: {PolicyInput 필드명: AR1/RandomWalk} (None이면 default_shocks())
+    - 경로는 chunk_size 단위로 프로세스 풀에 분산되고, 청크마다
+      SeedSequence에서 파생한 독립 난수열을 사용 (워커 수와 무관하게 재현 가능)
+    - 청크 결과는 도착 순서대로 분위수 스케치에 병합되어 메모리가 경로 수에 비례하지 않음
+    - workers: 프로세스 수 (None이면 CPU 수, 0 또는 1이면 현재 프로세스에서 실행)
+    """
+    if years < 1 or n_paths < 1:
+        raise ValueError("years와 n_paths는 1 이상이어야 합니다.")
+    shocks = default_shocks() if shocks is None else dict(shocks)
+    unknown = set(shocks) - set(POLICY_FIELDS)
+    if unknown:
+        raise ValueError(f"PolicyInput에 없는 충격 변수: {sorted(unknown)}")
+    if not isinstance(engine, str):
+        raise TypeError("프로세스 풀로 전달하려면 engine은 이름 문자열이어야 합니다.")
+
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(state, policy, mode, years, engine, shocks, size, s) for size, s in zip(sizes, seeds)]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+
+    total = 0
+    sketch = mean = m2 = None
+
+    def reduce(result):
+        nonlocal total, sketch, mean, m2
+        n, chunk_sketch, chunk_mean, chunk_m2 = result
+        if total == 0:
+            total, sketch, mean, m2 = n, chunk_sketch, chunk_mean, chunk_m2
+            return
+        # 평균/분산은 Chan의 병렬 병합식으로 누적
+        delta = chunk_mean - mean
+        combined = total + n
+        mean = mean + delta * (n / combined)
+        m2 = m2 + chunk_m2 + delta ** 2 * (total * n / combined)
+        sketch = _merge_sketches(sketch, total, chunk_sketch, n)
+        total = combined
+
+    if workers <= 1:
+        for task in tasks:
+            reduce(_run_chunk(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map은 제출 순서대로 결과를 내주므로 병합 순서도 결정적
+            for result in pool.map(_run_chunk, tasks):
+                reduce(result)
+
+    levels = tuple(quantiles)
+    probs = np.asarray(levels, dtype=np.float64) / 100.0
+    grid = np.linspace(0.0, 1.0, sketch.shape[-1])
+    q = np.stack([np.interp(probs, grid, row) for row in sketch], axis=-1)
+
+    n_metrics = len(STATE_FIELDS)
+    q = q.reshape(len(levels), n_metrics, years)
+    mean = mean.reshape(n_metrics, years)
+    std = np.sqrt(m2 / total).reshape(n_metrics, years)
+
+    return FanChart(
+        year=np.arange(1, years + 1, dtype=np.int64),
+        levels=levels,
+        quantiles={name: q[:, i] for i, name in enumerate(STATE_FIELDS)},
+        mean={name: mean[i] for i, name in enumerate(STATE_FIELDS)},
+        std={name: std[i] for i, name in enumerate(STATE_FIELDS)},
+        n_paths=total,
+    )
@@ -0,0 +1,194 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from data_model import EconomicState, PolicyInput, PolicyBatch, POLICY_FIELDS
+from simulation import SimulationResult, simulate, simulate_batch
+
+
+# 정책 변수별 기본 탐색 범위 (앱 입력 범위 기준)
+DEFAULT_BOUNDS = {
+    "interest_rate": (0.0, 10.0),
+    "corporate_tax": (10.0, 40.0),
+    "electricity_cost": (50.0, 200.0),
+    "exchange_rate": (900.0, 1600.0),
+    "government_spending_ratio": (10.0, 35.0),
+    "consumer_confidence": (0.0, 200.0),
+    "corporate_investment": (0.0, 200.0),
+    "global_demand": (0.0, 200.0),
+    "oil_price": (30.0, 150.0),
+    "productivity": (0.0, 200.0),
+}
+
+# 정책으로 직접 조정할 수 없는 외생 변수
+EXOGENOUS_FIELDS = ("exchange_rate", "consumer_confidence", "global_demand", "oil_price", "productivity")
+
+# 정책으로 조정할 수 있는 변수의 탐색 범위 (optimize_policy의 기본값)
+POLICY_BOUNDS = {name: bound for name, bound in DEFAULT_BOUNDS.items() if name not in EXOGENOUS_FIELDS}
+
+
+@dataclass(frozen=True)
+class Goal:
+    """
+    최적화 목표 (가중합을 최대화).
+    - growth: 기간 평균 성장률 (높을수록 좋음)
+    - inflation_stability: 기간 평균 |물가 - inflation_target| (낮을수록 좋음)
+    - unemployment: 기간 평균 실업률 (낮을수록 좋음)
+    """
+    growth: float = 0.0
+    inflation_stability: float = 0.0
+    unemployment: float = 0.0
+    inflation_target: float = 2.0
+
+    def score(self, trajectory) -> np.ndarray:
+        """
+        (years, N) 궤적에서 시나리오별 점수 (N,)를 계산.
+        """
+        score = np.zeros(trajectory.growth.shape[1])
+        if self.growth:
+            score = score + self.growth * trajectory.growth.mean(axis=0)
+        if self.inflation_stability:
+            score = score - self.inflation_stability * np.abs(trajectory.inflation - self.inflation_target).mean(axis=0)
+        if self.unemployment:
+            score = score - self.unemployment * trajectory.unemployment.mean(axis=0)
+        return score
+
+
+GOALS = {
+    "성장률 상승": Goal(growth=1.0),
+    "물가 안정": Goal(inflation_stability=1.0),
+    "실업률 감소": Goal(unemployment=1.0),
+    "균형": Goal(growth=1.0, inflation_stability=1.0, unemployment=1.0),
+}
+
+
+@dataclass
+class OptimizationResult:
+    """
+    정책 최적화 결과.
+    - policy: 최적 정책 값
+    - score: 목표 점수 (클수록 좋음)
+    - trajectory: 최적 정책의 예상 궤적
+    """
+    policy: PolicyInput
+    score: float
+    trajectory: SimulationResult
+    evaluations: int
+    generations: int
+    elapsed: float
+
+
+def _evaluate(task) -> np.ndarray:
+    state, candidates, fixed, free, mode, years, engine, goal = task
+    columns = dict(fixed)
+    for j, name in enumerate(free):
+        columns[name] = candidates[:, j]
+    trajectory = simulate_batch(state, PolicyBatch(**columns), mode, years, engine)
+    return goal.score(trajectory)
+
+
+def optimize_policy(
+    state: EconomicState,
+    base_policy: PolicyInput,
+    goal,
+    mode: str,
+    years: int = 5,
+    engine: str = "v1",
+    bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+    population: int = 48,
+    generations: int = 80,
+    mutation: float = 0.7,
+    crossover: float = 0.9,
+    time_limit: float = 1.5,
+    seed: Optional[int] = 0,
+    workers: int = 1,
+) -> OptimizationResult:
+    """
+    차분 진화(DE/rand/1/bin)로 PolicyInput 공간에서 목표 점수를 최대화.
+    - goal: GOALS의 이름 또는 Goal
+    - bounds: {필드명: (하한, 상한)}; 하한 == 상한이면 그 값으로 고정,
+      bounds에 없는 필드는 base_policy 값으로 고정 (None이면 POLICY_BOUNDS, 즉 외생 변수는 고정)
+    - population: 후보 집단 크기 (DE/rand/1은 자신 외에 서로 다른 후보 3개가 필요하므로 4 이상)
+    - 세대마다 후보 집단 전체를 배치 엔진으로 한 번에 평가하며,
+      workers > 1이면 집단을 나눠 프로세스 풀에서 병렬 평가
+    - time_limit(초)을 넘기면 그 세대까지의 최적해를 반환
+    """
+    started = time.perf_counter()
+    goal = GOALS[goal] if isinstance(goal, str) else goal
+    if population < 4:
+        raise ValueError(f"population은 4 이상이어야 합니다: {population}")
+    bounds = POLICY_BOUNDS if bounds is None else bounds
+    unknown = set(bounds) - set(POLICY_FIELDS)
+    if unknown:
+        raise ValueError(f"PolicyInput에 없는 변수: {sorted(unknown)}")
+
+    free = tuple(name for name in POLICY_FIELDS if name in bounds and bounds[name][0] < bounds[name][1])
+    fixed = {
+        name: (bounds[name][0] if name in bounds else getattr(base_policy, name))
+        for name in POLICY_FIELDS
+        if name not in free
+    }
+    lower = np.array([bounds[name][0] for name in free])
+    upper = np.array([bounds[name][1] for name in free])
+
+    rng = np.random.default_rng(seed)
+    dim = len(free)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and dim else None
+
+    def evaluate(candidates):
+        if pool is None:
+            return _evaluate((state, candidates, fixed, free, mode, years, engine, goal))
+        chunks = np.array_split(candidates, workers)
+        tasks = [(state, chunk, fixed, free, mode, years, engine, goal) for chunk in chunks if len(chunk)]
+        return np.concatenate(list(pool.map(_evaluate, tasks)))
+
+    try:
+        pop = lower + rng.random((population, dim)) * (upper - lower)
+        # 현재 정책(범위 안으로 맞춘 값)을 초기 집단에 포함
+        pop[0] = np.clip([getattr(base_policy, name) for name in free], lower, upper)
+        fitness = evaluate(pop)
+        evaluations = population
+        generation = 0
+
+        while dim and generation < generations and time.perf_counter() - started < time_limit:
+            generation += 1
+
+            # 자기 자신을 제외한 서로 다른 후보 3개 선택
+            keys = rng.random((population, population))
+            np.fill_diagonal(keys, np.inf)
+            r1, r2, r3 = np.argsort(keys, axis=1)[:, :3].T
+
+            mutant = np.clip(pop[r1] + mutation * (pop[r2] - pop[r3]), lower, upper)
+            cross = rng.random((population, dim)) < crossover
+            cross[np.arange(population), rng.integers(0, dim, population)] = True
+            trial = np.where(cross, mutant, pop)
+
+            trial_fitness = evaluate(trial)
+            evaluations += population
+
+            better = trial_fitness >= fitness
+            pop[better] = trial[better]
+            fitness[better] = trial_fitness[better]
+
+            if np.ptp(fitness) < 1e-9:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    best = int(np.argmax(fitness))
+    values = dict(fixed)
+    values.update({name: float(pop[best, j]) for j, name in enumerate(free)})
+    policy = PolicyInput(**values)
+
+    return OptimizationResult(
+        policy=policy,
+        score=float(fitness[best]),
+        trajectory=simulate(state, policy, mode, years, engine),
+        evaluations=evaluations,
+        generations=generation,
+        elapsed=time.perf_counter() - started,
+    )
@@ -0,0 +1,210 @@
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+
+from data_model import EconomicState, PolicyInput, StateBatch, PolicyBatch, POLICY_FIELDS, STATE_FIELDS
+from engine_params import MODES
+from simulation import simulate_batch
+
+
+# 초기 상태 입력은 "initial_" 접두어로 구분
+STATE_INPUTS = tuple(f"initial_{name}" for name in STATE_FIELDS)
+INPUTS = POLICY_FIELDS + STATE_INPUTS
+OUTPUTS = STATE_FIELDS
+
+# 상대 스텝 크기와 축소 배율 (h, h/8, h/64를 한 배치에서 동시에 평가)
+BASE_STEP = 1e-4
+STEP_SHRINK = 8.0
+STEP_LEVELS = 3
+
+# 전방/후방 차분이 이 범위 안에서 일치하면 매끄러운 구간으로 판단
+RTOL = 1e-3
+NOISE = 1e-7
+
+
+@dataclass
+class Sensitivity:
+    """
+    years년 후 EconomicState 각 지표의 입력 변수별 민감도.
+    - jacobian[i, j]: ∂output_i / ∂input_j
+    - left / right: 후방·전방 편미분 (위기 트리거 등 불연속 근처에서 서로 다름)
+    - nonsmooth[i, j]: 기준점 근처에 임계값(꺾임/점프)이 있어 양쪽 미분이 다른 경우 True.
+      이때 jacobian은 값이 안정적인 한쪽 미분(전방 우선)이며, 둘 다 불안정하면 NaN
+    """
+    engine: str
+    mode: str
+    years: int
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    base_input: np.ndarray
+    base_output: np.ndarray
+    jacobian: np.ndarray
+    left: np.ndarray
+    right: np.ndarray
+    nonsmooth: np.ndarray
+
+    def elasticity(self) -> np.ndarray:
+        """
+        탄력성 (∂y/∂x) × (x / y). 기준값이 0이면 NaN.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.jacobian * self.base_input[None, :] / self.base_output[:, None]
+
+    def effect(self, name: str, delta: float) -> Dict[str, float]:
+        """
+        입력 하나를 delta만큼 바꿨을 때 지표 변화의 1차 근사.
+        """
+        j = self.inputs.index(name)
+        return {out: float(self.jacobian[i, j] * delta) for i, out in enumerate(self.outputs)}
+
+    def to_dataframe(self, elasticity: bool = False):
+        import pandas as pd
+
+        values = self.elasticity() if elasticity else self.jacobian
+        return pd.DataFrame(values, index=list(self.outputs), columns=list(self.inputs))
+
+
+def _base_vector(state: EconomicState, policy: PolicyInput) -> np.ndarray:
+    return np.array([getattr(policy, name) for name in POLICY_FIELDS] + [getattr(state, name) for name in STATE_FIELDS])
+
+
+def _perturbed_inputs(base: np.ndarray):
+    """
+    기준점 + (스텝 단계 × 입력 × ±) 섭동을 한 행렬로 구성.
+    행 순서: [기준점, (단계 k, 입력 j, +), (단계 k, 입력 j, -) ...]
+    """
+    n_inputs = len(base)
+    steps = BASE_STEP * np.maximum(np.abs(base), 1.0) / STEP_SHRINK ** np.arange(STEP_LEVELS)[:, None]
+
+    rows = np.repeat(base[None, :], 1 + 2 * STEP_LEVELS * n_inputs, axis=0)
+    eye = np.eye(n_inputs)
+    plus = (base + steps[:, None, :] * eye).reshape(-1, n_inputs)
+    minus = (base - steps[:, None, :] * eye).reshape(-1, n_inputs)
+    rows[1:] = np.concatenate([plus, minus]).reshape(-1, n_inputs)
+    # 실제로 적용된 스텝 (부동소수점 반올림 반영)
+    h_plus = plus.reshape(STEP_LEVELS, n_inputs, n_inputs).diagonal(axis1=1, axis2=2) - base
+    h_minus = base - minus.reshape(STEP_LEVELS, n_inputs, n_inputs).diagonal(axis1=1, axis2=2)
+    return rows, h_plus, h_minus
+
+
+def _run(rows: np.ndarray, mode, years: int, engine: str) -> np.ndarray:
+    n_policy = len(POLICY_FIELDS)
+    policies = PolicyBatch(**{name: rows[:, j] for j, name in enumerate(POLICY_FIELDS)})
+    states = StateBatch(**{name: rows[:, n_policy + j] for j, name in enumerate(STATE_FIELDS)})
+    trajectory = simulate_batch(states, policies, mode, years, engine)
+    return np.stack([getattr(trajectory.final, name) for name in OUTPUTS], axis=1)
+
+
+def _estimate(out: np.ndarray, h_plus: np.ndarray, h_minus: np.ndarray):
+    """
+    섭동 결과 (1 + 2·K·n, m)에서 야코비안과 비매끄러움 여부를 추정.
+    """
+    k_levels, n_inputs = h_plus.shape
+    y0 = out[0]
+    block = k_levels * n_inputs
+    y_plus = out[1:1 + block].reshape(k_levels, n_inputs, -1)
+    y_minus = out[1 + block:].reshape(k_levels, n_inputs, -1)
+
+    # (K, n_inputs, n_outputs)
+    fwd = (y_plus - y0) / h_plus[:, :, None]
+    bwd = (y0 - y_minus) / h_minus[:, :, None]
+    central = (y_plus - y_minus) / (h_plus + h_minus)[:, :, None]
+
+    noise = NOISE * (np.abs(y0) + 1.0) / np.minimum(h_plus, h_minus)[:, :, None]
+    consistent = np.abs(fwd - bwd) <= RTOL * (np.abs(fwd) + np.abs(bwd)) + noise
+
+    # 일치하는 가장 큰 스텝의 중앙 차분 사용
+    any_consistent = consistent.any(axis=0)
+    first = np.argmax(consistent, axis=0)
+    smooth_value = np.take_along_axis(central, first[None], axis=0)[0]
+
+    # 불일치: 작은 두 스텝 사이에서 값이 안정적인 쪽을 국소 미분으로 채택
+    def stable(d):
+        a, b = d[-1], d[-2]
+        return np.abs(a - b) <= RTOL * (np.abs(a) + np.abs(b)) + noise[-1]
+
+    right, left = fwd[-1], bwd[-1]
+    one_sided = np.where(stable(fwd), right, np.where(stable(bwd), left, np.nan))
+    jac = np.where(any_consistent, smooth_value, one_sided)
+
+    left = np.where(any_consistent, smooth_value, np.where(stable(bwd), left, np.nan))
+    right = np.where(any_consistent, smooth_value, np.where(stable(fwd), right, np.nan))
+    return jac.T, left.T, right.T, (~any_consistent).T
+
+
+def jacobian(
+    state: EconomicState,
+    policy: PolicyInput,
+    mode: str,
+    years: int,
+    engine: str = "v1",
+) -> Sensitivity:
+    """
+    years년 후 지표의 10개 정책 변수 + 4개 초기 상태에 대한 야코비안.
+    모든 섭동(스텝 3단계 × 14개 입력 × ±)을 한 번의 배치 실행으로 평가.
+    """
+    return jacobian_all(state, policy, years, engines=(engine,), modes=(mode,))[(engine, mode)]
+
+
+def jacobian_all(
+    state: EconomicState,
+    policy: PolicyInput,
+    years: int,
+    engines=("v1", "v2"),
+    modes=MODES,
+) -> Dict[Tuple[str, str], Sensitivity]:
+    """
+    여러 엔진 × 모드의 야코비안을 엔진당 한 번의 배치로 계산.
+    모드는 시나리오별 모드 배열로 같은 배치에 묶인다.
+    """
+    base = _base_vector(state, policy)
+    rows, h_plus, h_minus = _perturbed_inputs(base)
+    n_rows = len(rows)
+
+    all_rows = np.tile(rows, (len(modes), 1))
+    mode_array = np.repeat(np.array(modes), n_rows)
+
+    results = {}
+    for engine in engines:
+        out = _run(all_rows, mode_array, years, engine)
+        for k, mode in enumerate(modes):
+            block = out[k * n_rows:(k + 1) * n_rows]
+            jac, left, right, nonsmooth = _estimate(block, h_plus, h_minus)
+            results[(engine, mode)] = Sensitivity(
+                engine=engine,
+                mode=mode,
+                years=years,
+                inputs=INPUTS,
+                outputs=OUTPUTS,
+                base_input=base,
+                base_output=block[0],
+                jacobian=jac,
+                left=left,
+                right=right,
+                nonsmooth=nonsmooth,
+            )
+    return results
+
+
+def policy_impacts(
+    state: EconomicState,
+    policy: PolicyInput,
+    changes: Dict[str, float],
+    mode: str,
+    years: int,
+    engine: str = "v1",
+) -> Dict[str, Dict[str, float]]:
+    """
+    {입력명: 변화량} 각각을 실제로 적용해 years년 후 지표 변화를 한 배치로 계산.
+    (예: {"interest_rate": 1.0, "global_demand": 10.0}) — 위기 트리거를 넘는 큰 변화도 정확히 반영.
+    """
+    base = _base_vector(state, policy)
+    names = list(changes)
+    rows = np.repeat(base[None, :], 1 + len(names), axis=0)
+    for r, name in enumerate(names, start=1):
+        rows[r, INPUTS.index(name)] += changes[name]
+
+    out = _run(rows, mode, years, engine)
+    diff = out[1:] - out[0]
+    return {name: dict(zip(OUTPUTS, map(float, diff[r]))) for r, name in enumerate(names)}
@@ -0,0 +1,457 @@
+"""
+세션별 시뮬레이션 기록 (메모리 창 + 디스크 분리 저장)과 시나리오 저장/복원.
+
+- SessionHistory: 연도별 상태를 타입이 정해진 열 배열에 누적하는 기록.
+  최근 window년만 메모리 열 배열에 두고, 그보다 오래된 해는 세션별 바이너리 파일
+  (RECORD_DTYPE 레코드를 이어 붙인 파일)로 내보낸다. 해마다 적용한 정책도 함께 기록한다.
+- SessionRegistry: 서버 프로세스의 세션 기록을 모아 두고, 오래 쓰지 않은 세션의
+  메모리 창을 디스크로 내보낸다 (shared_sessions()).
+- save_scenario / load_scenario: 초기 상태·엔진·모드·정책 기록·궤적을 .npz 파일 하나로 저장/복원.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import numpy as np
+
+from data_model import EconomicState, PolicyInput, POLICY_FIELDS, STATE_FIELDS
+
+
+# 연도 1개 = 120바이트 (연도, 지표 4개, 정책 10개). 정책을 모르는 해는 NaN
+RECORD_DTYPE = np.dtype(
+    [("year", np.int64)]
+    + [(name, np.float64) for name in STATE_FIELDS]
+    + [(f"policy.{name}", np.float64) for name in POLICY_FIELDS]
+)
+
+SCENARIO_VERSION = 1
+SESSION_DIR_ENV = "ECON_SIM_SESSION_DIR"
+
+
+def session_dir() -> str:
+    """
+    세션 기록 파일 디렉터리 (환경 변수 ECON_SIM_SESSION_DIR로 변경 가능).
+    """
+    path = os.environ.get(SESSION_DIR_ENV) or os.path.join(tempfile.gettempdir(), "econ_sim_sessions")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# -------------------------------------------------------
+# 세션 기록
+# -------------------------------------------------------
+class SessionHistory:
+    """
+    연도별 상태·정책 기록. 메모리에는 최근 window ~ 2×window년만 유지한다.
+    - 메모리 창이 2×window년에 이르면 오래된 해를 파일로 내보내 window년으로 줄인다
+    - 파일은 기록 객체가 사라지거나 close()하면 삭제된다
+    - 열 조회(["gdp"] 등)는 파일에 내보낸 해가 없으면 복사 없는 뷰, 있으면 이어 붙인 복사본
+    """
+
+    def __init__(self, path: Optional[str] = None, window: int = 2048):
+        self.window = max(int(window), 1)
+        self.path = path or os.path.join(session_dir(), f"{uuid.uuid4().hex}.bin")
+        self._columns = {name: np.empty(0) for name in RECORD_DTYPE.names}
+        self._columns["year"] = np.empty(0, dtype=np.int64)
+        self._size = 0
+        self._spilled = 0
+        # 추가·내보내기·조회가 서로 다른 스레드(세션 스크립트, 등록부 정리)에서 올 수 있다.
+        # append → spill, close → clear 처럼 안에서 다시 잡으므로 RLock
+        self._lock = threading.RLock()
+        self._finalizer = weakref.finalize(self, _remove, self.path)
+
+    # ----- 크기 -----
+    def __len__(self):
+        return self._spilled + self._size
+
+    @property
+    def spilled(self) -> int:
+        """
+        파일로 내보낸 연도 수.
+        """
+        return self._spilled
+
+    @property
+    def resident(self) -> int:
+        """
+        메모리 창에 있는 연도 수.
+        """
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(col.nbytes for col in self._columns.values())
+
+    def _reserve(self, needed: int):
+        capacity = len(self._columns["year"])
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity, 64)
+        for name, col in self._columns.items():
+            grown = np.empty(capacity, dtype=col.dtype)
+            grown[:self._size] = col[:self._size]
+            self._columns[name] = grown
+
+    # ----- 추가 -----
+    def append(self, state, year: int = None, policy: PolicyInput = None):
+        """
+        한 해의 상태(와 그 해에 적용한 정책)를 추가. year를 생략하면 마지막 연도 + 1.
+        """
+        with self._lock:
+            if year is None:
+                year = self.last_year + 1
+            self._reserve(self._size + 1)
+            i = self._size
+            self._columns["year"][i] = year
+            for name in STATE_FIELDS:
+                self._columns[name][i] = getattr(state, name)
+            for name in POLICY_FIELDS:
+                self._columns[f"policy.{name}"][i] = np.nan if policy is None else getattr(policy, name)
+            self._size = i + 1
+            self._maybe_spill()
+
+    def extend(self, year, gdp, inflation, unemployment, growth, policy=None):
+        """
+        여러 해를 열 배열로 한 번에 추가. policy는 매년 같은 PolicyInput 또는 필드별 연도 배열을 가진 객체.
+        """
+        with self._lock:
+            year = np.asarray(year, dtype=np.int64)
+            n = len(year)
+            self._reserve(self._size + n)
+            start, end = self._size, self._size + n
+            self._columns["year"][start:end] = year
+            for name, values in zip(STATE_FIELDS, (gdp, inflation, unemployment, growth)):
+                self._columns[name][start:end] = values
+            for name in POLICY_FIELDS:
+                self._columns[f"policy.{name}"][start:end] = np.nan if policy is None else getattr(policy, name)
+            self._size = end
+            self._maybe_spill()
+
+    def extend_records(self, records: np.ndarray):
+        """
+        RECORD_DTYPE 레코드 배열을 추가 (시나리오 복원용).
+        """
+        with self._lock:
+            n = len(records)
+            self._reserve(self._size + n)
+            for name in RECORD_DTYPE.names:
+                self._columns[name][self._size:self._size + n] = records[name]
+            self._size += n
+            self._maybe_spill()
+
+    @property
+    def last_year(self) -> int:
+        with self._lock:
+            if self._size:
+                return int(self._columns["year"][self._size - 1])
+            if self._spilled:
+                return int(self._disk()["year"][-1])
+            return 0
+
+    # ----- 디스크 -----
+    def _maybe_spill(self):
+        if self._size >= 2 * self.window:
+            self.spill(keep=self.window)
+
+    def spill(self, keep: int = 0):
+        """
+        메모리 창에서 최근 keep년만 남기고 나머지를 파일 끝에 이어 쓴다.
+        keep=0이면 메모리 열 배열까지 비운다 (유휴 세션 정리).
+        """
+        with self._lock:
+            n = self._size - keep
+            if n > 0:
+                with open(self.path, "ab") as f:
+                    self._records(0, n).tofile(f)
+                # 새 배열로 옮겨 이미 반환한 열 뷰(DataFrame 등)는 바뀌지 않게 한다
+                for name, col in self._columns.items():
+                    kept = np.empty(2 * keep, dtype=col.dtype)
+                    kept[:keep] = col[n:self._size]
+                    self._columns[name] = kept
+                self._spilled += n
+                self._size = keep
+            elif keep == 0:
+                for name, col in self._columns.items():
+                    self._columns[name] = np.empty(0, dtype=col.dtype)
+
+    def _records(self, start: int, stop: int) -> np.ndarray:
+        out = np.empty(stop - start, dtype=RECORD_DTYPE)
+        for name in RECORD_DTYPE.names:
+            out[name] = self._columns[name][start:stop]
+        return out
+
+    def _disk(self) -> np.ndarray:
+        if not self._spilled:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", shape=(self._spilled,))
+
+    def clear(self):
+        with self._lock:
+            self._size = 0
+            self._spilled = 0
+            _remove(self.path)
+
+    def close(self):
+        """
+        메모리와 디스크 기록을 모두 버린다.
+        """
+        with self._lock:
+            self.clear()
+            self.spill()
+            self._finalizer()
+
+    # ----- 조회 -----
+    def __getitem__(self, name: str) -> np.ndarray:
+        """
+        열 이름("year", "gdp", ..., "policy.interest_rate")의 전체 연도 배열.
+        """
+        return self.since(name, 0)
+
+    def since(self, name: str, start: int) -> np.ndarray:
+        """
+        start번째 해부터의 열 배열. 메모리 창 안의 구간은 파일을 읽지 않는다.
+        """
+        with self._lock:
+            resident = self._columns[name][max(start - self._spilled, 0):self._size]
+            if start >= self._spilled:
+                return resident
+            return np.concatenate([self._disk()[name][start:], resident])
+
+    def state(self, index: int) -> EconomicState:
+        return EconomicState(*(float(v) for v in self._row(index, STATE_FIELDS)))
+
+    def policy(self, index: int) -> Optional[PolicyInput]:
+        """
+        index번째 해에 적용한 정책 (기록되지 않았으면 None).
+        """
+        values = self._row(index, [f"policy.{name}" for name in POLICY_FIELDS])
+        if any(np.isnan(v) for v in values):
+            return None
+        return PolicyInput(*(float(v) for v in values))
+
+    def _row(self, index: int, names):
+        with self._lock:
+            n = len(self)
+            if index < 0:
+                index += n
+            if not 0 <= index < n:
+                raise IndexError("SessionHistory 범위를 벗어났습니다.")
+            if index >= self._spilled:
+                return [self._columns[name][index - self._spilled] for name in names]
+            row = self._disk()[index]
+            return [row[name] for name in names]
+
+    def records(self) -> np.ndarray:
+        """
+        전체 기록을 RECORD_DTYPE 레코드 배열로 (복사본).
+        """
+        with self._lock:
+            return np.concatenate([np.asarray(self._disk()), self._records(0, self._size)])
+
+    def columns(self):
+        return {name: self[name] for name in ("year",) + STATE_FIELDS}
+
+    def to_dataframe(self, policy: bool = False):
+        """
+        연도·지표 열 DataFrame (policy=True이면 정책 열 포함).
+        """
+        import pandas as pd
+
+        names = RECORD_DTYPE.names if policy else ("year",) + STATE_FIELDS
+        return pd.DataFrame({name: self[name] for name in names}, copy=False)
+
+
+# -------------------------------------------------------
+# 세션 등록부 (유휴 세션 정리)
+# -------------------------------------------------------
+@dataclass
+class RegistryStats:
+    sessions: int
+    resident_years: int
+    spilled_years: int
+    resident_bytes: int
+    evictions: int
+
+
+class SessionRegistry:
+    """
+    세션 id → SessionHistory. 기록은 약한 참조로 보관하므로 세션이 끝나 기록 객체가
+    사라지면 등록부에서도 빠지고 파일도 삭제된다.
+    - idle_seconds 동안 open/touch되지 않은 세션은 evict_idle()에서 메모리 창을 디스크로 내보낸다
+    """
+
+    def __init__(self, window: int = 2048, idle_seconds: float = 900.0, directory: Optional[str] = None):
+        self.window = window
+        self.idle_seconds = idle_seconds
+        self.directory = directory
+        self.evictions = 0
+        self._histories = weakref.WeakValueDictionary()
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def open(self, session_id: str) -> SessionHistory:
+        """
+        세션 기록을 가져오거나 새로 만든다 (사용 시각 갱신).
+        """
+        with self._lock:
+            history = self._histories.get(session_id)
+            if history is None:
+                path = None
+                if self.directory:
+                    os.makedirs(self.directory, exist_ok=True)
+                    path = os.path.join(self.directory, f"{session_id}-{uuid.uuid4().hex[:8]}.bin")
+                history = SessionHistory(path, window=self.window)
+                self._histories[session_id] = history
+            self._last_used[session_id] = time.monotonic()
+            return history
+
+    def touch(self, session_id: str):
+        with self._lock:
+            self._last_used[session_id] = time.monotonic()
+
+    def evict_idle(self, idle_seconds: float = None) -> int:
+        """
+        유휴 세션의 메모리 창을 디스크로 내보내고, 사라진 세션 항목을 정리. 내보낸 세션 수를 반환.
+        """
+        idle_seconds = self.idle_seconds if idle_seconds is None else idle_seconds
+        now = time.monotonic()
+        evicted = 0
+        with self._lock:
+            for session_id, used in list(self._last_used.items()):
+                history = self._histories.get(session_id)
+                if history is None:
+                    del self._last_used[session_id]
+                elif now - used >= idle_seconds and history.nbytes:
+                    history.spill()
+                    evicted += 1
+            self.evictions += evicted
+        return evicted
+
+    def stats(self) -> RegistryStats:
+        with self._lock:
+            histories = list(self._histories.values())
+        return RegistryStats(
+            sessions=len(histories),
+            resident_years=sum(h.resident for h in histories),
+            spilled_years=sum(h.spilled for h in histories),
+            resident_bytes=sum(h.nbytes for h in histories),
+            evictions=self.evictions,
+        )
+
+
+# 같은 서버 프로세스의 모든 세션이 공유하는 등록부
+_shared_sessions = None
+_shared_lock = threading.Lock()
+
+
+def shared_sessions() -> SessionRegistry:
+    global _shared_sessions
+    with _shared_lock:
+        if _shared_sessions is None:
+            _shared_sessions = SessionRegistry()
+        return _shared_sessions
+
+
+# -------------------------------------------------------
+# 시나리오 저장 / 복원
+# -------------------------------------------------------
+@dataclass
+class Scenario:
+    """
+    저장된 시나리오.
+    - records: RECORD_DTYPE 레코드 배열 (연도별 상태와 그 해의 정책)
+    - meta: 사용자 메타데이터 (이름, 메모 등)
+    """
+    initial_state: EconomicState
+    engine: str
+    mode: str
+    records: np.ndarray
+    meta: Dict[str, object] = field(default_factory=dict)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def final_state(self) -> EconomicState:
+        if not len(self.records):
+            return self.initial_state
+        row = self.records[-1]
+        return EconomicState(*(float(row[name]) for name in STATE_FIELDS))
+
+    @property
+    def last_policy(self) -> Optional[PolicyInput]:
+        if not len(self.records):
+            return None
+        values = [float(self.records[-1][f"policy.{name}"]) for name in POLICY_FIELDS]
+        return None if any(np.isnan(values)) else PolicyInput(*values)
+
+    def to_history(self, registry: SessionRegistry = None, session_id: str = None) -> SessionHistory:
+        """
+        궤적을 세션 기록으로 복원 (registry를 주면 그 세션의 기록을 비우고 채운다).
+        """
+        history = registry.open(session_id) if registry is not None else SessionHistory()
+        history.clear()
+        history.extend_records(self.records)
+        return history
+
+
+def save_scenario(path, initial_state: EconomicState, engine: str, mode: str,
+                  history: SessionHistory, meta: dict = None):
+    """
+    시나리오 전체를 압축하지 않은 .npz 파일 하나로 저장 (레코드 배열 + JSON 헤더).
+    - path: 파일 경로 또는 바이너리 파일 객체 (예: 다운로드용 io.BytesIO)
+    반환: 저장한 경로 (파일 객체면 그 객체)
+    """
+    header = {
+        "version": SCENARIO_VERSION,
+        "initial_state": {name: getattr(initial_state, name) for name in STATE_FIELDS},
+        "engine": engine,
+        "mode": mode,
+        "meta": meta or {},
+    }
+    if hasattr(path, "write"):
+        np.savez(path, header=np.array(json.dumps(header, ensure_ascii=False)), records=history.records())
+        return path
+    if not path.endswith(".npz"):
+        path += ".npz"
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".npz")
+    with os.fdopen(fd, "wb") as f:
+        np.savez(f, header=np.array(json.dumps(header, ensure_ascii=False)), records=history.records())
+    os.replace(tmp, path)
+    return path
+
+
+def load_scenario(path) -> Scenario:
+    """
+    save_scenario로 저장한 시나리오를 읽는다 (path: 파일 경로 또는 업로드된 파일 객체).
+    """
+    with np.load(path, allow_pickle=False) as data:
+        header = json.loads(str(data["header"]))
+        records = data["records"]
+    if header.get("version") != SCENARIO_VERSION:
+        raise ValueError(f"지원하지 않는 시나리오 파일 버전: {header.get('version')}")
+    if records.dtype != RECORD_DTYPE:
+        raise ValueError("시나리오 파일의 레코드 형식이 현재 버전과 다릅니다.")
+    return Scenario(
+        initial_state=EconomicState(**header["initial_state"]),
+        engine=header["engine"],
+        mode=header["mode"],
+        records=records,
+        meta=header.get("meta", {}),
+    )
@@ -0,0 +1,244 @@
+import hashlib
+import os
+import struct
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+
+# -------------------------------------------------------
+# 안정적인 내용 해시
+# -------------------------------------------------------
+def _feed(h, value):
+    """
+    값을 타입 태그와 함께 정규화된 바이트로 해시에 넣는다.
+    (파이썬 hash()와 달리 프로세스·실행마다 같은 값을 보장)
+    """
+    if value is None:
+        h.update(b"N")
+    elif isinstance(value, bool):
+        h.update(b"B1" if value else b"B0")
+    elif isinstance(value, (int, np.integer)):
+        h.update(b"I" + str(int(value)).encode() + b";")
+    elif isinstance(value, (float, np.floating)):
+        h.update(b"F" + struct.pack("<d", float(value)))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        h.update(b"S" + str(len(data)).encode() + b":" + data)
+    elif isinstance(value, bytes):
+        h.update(b"Y" + str(len(value)).encode() + b":" + value)
+    elif isinstance(value, np.ndarray):
+        arr = np.ascontiguousarray(value)
+        h.update(b"A" + arr.dtype.str.encode() + repr(arr.shape).encode())
+        h.update(arr.tobytes() if arr.dtype != object else repr(arr.tolist()).encode())
+    elif is_dataclass(value) and not isinstance(value, type):
+        h.update(b"D" + type(value).__qualname__.encode() + b"{")
+        for f in fields(value):
+            _feed(h, f.name)
+            _feed(h, getattr(value, f.name))
+        h.update(b"}")
+    elif isinstance(value, (tuple, list)):
+        h.update(b"T(" if isinstance(value, tuple) else b"L(")
+        for item in value:
+            _feed(h, item)
+        h.update(b")")
+    elif isinstance(value, dict):
+        h.update(b"M{")
+        for key in sorted(value, key=repr):
+            _feed(h, key)
+            _feed(h, value[key])
+        h.update(b"}")
+    elif hasattr(value, "to_numpy") and hasattr(value, "columns"):
+        # DataFrame: 열 이름 + 열 데이터
+        h.update(b"P{")
+        for name in value.columns:
+            _feed(h, str(name))
+            _feed(h, value[name].to_numpy())
+        h.update(b"}")
+    else:
+        raise TypeError(f"해시할 수 없는 타입: {type(value).__name__}")
+
+
+def stable_hash(*parts) -> str:
+    """
+    EconomicState / PolicyInput 등 데이터클래스, 숫자, 문자열, 배열, DataFrame으로
+    구성된 값들의 안정적인 내용 해시 (16진수 문자열).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        _feed(h, part)
+    return h.hexdigest()
+
+
+def _sizeof(value) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, "to_plotly_json"):
+        # Plotly 그래프: 트레이스 데이터가 객체 안쪽에 있어 getsizeof로는 잡히지 않으므로 직렬화한 길이로
+        import plotly.io as pio
+
+        return len(pio.to_json(value, validate=False))
+    if hasattr(value, "memory_usage") and hasattr(value, "columns"):
+        return int(value.memory_usage(deep=False).sum())
+    if is_dataclass(value) and not isinstance(value, type):
+        return sys.getsizeof(value) + sum(_sizeof(getattr(value, f.name)) for f in fields(value))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+# -------------------------------------------------------
+# LRU 캐시
+# -------------------------------------------------------
+_UNCHANGED = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class SimulationCache:
+    """
+    내용 해시를 키로 하는 LRU 캐시 (스레드 안전).
+    - max_entries: 최대 항목 수
+    - max_bytes: 대략적인 최대 메모리 (None이면 제한 없음)
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: Optional[int] = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_or_compute(self, key_parts, compute: Callable):
+        """
+        key_parts의 해시로 값을 찾고, 없으면 compute()로 계산해 저장.
+        """
+        key = stable_hash(*key_parts) if isinstance(key_parts, tuple) else stable_hash(key_parts)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+                self._stats.hits += 1
+                return entry[0]
+            self._stats.misses += 1
+
+        # 계산은 락 밖에서 수행 (같은 키를 동시에 계산하면 나중 결과가 덮어씀)
+        value = compute()
+        size = _sizeof(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._stats.bytes -= old[1]
+            self._data[key] = (value, size)
+            self._stats.bytes += size
+            self._evict()
+        return value
+
+    def resize(self, max_entries: int = None, max_bytes: Optional[int] = _UNCHANGED):
+        """
+        크기 제한 변경 (max_bytes=None은 메모리 제한 해제, 생략하면 기존 값 유지).
+        """
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not _UNCHANGED:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and self._stats.bytes > self.max_bytes)
+        ):
+            _, (_, size) = self._data.popitem(last=False)
+            self._stats.bytes -= size
+            self._stats.evictions += 1
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            s = self._stats
+            return CacheStats(s.hits, s.misses, s.evictions, len(self._data), s.bytes)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._stats = CacheStats()
+
+
+def memoize(cache_getter: Callable[[], SimulationCache], name: str = None):
+    """
+    함수 인자를 키로 결과를 캐시하는 데코레이터.
+    cache_getter는 호출 시점의 캐시(세션별/공유)를 반환하는 함수.
+    """
+    def decorator(fn):
+        label = name or fn.__qualname__
+
+        def wrapper(*args, **kwargs):
+            key = (label, args, kwargs)
+            return cache_getter().get_or_compute(key, lambda: fn(*args, **kwargs))
+
+        wrapper.__name__ = fn.__name__
+        wrapper.__doc__ = fn.__doc__
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+    return decorator
+
+
+# -------------------------------------------------------
+# 공유 캐시 (크기는 운영자 설정)
+# -------------------------------------------------------
+CACHE_ENTRIES_ENV = "ECON_SIM_CACHE_ENTRIES"
+CACHE_MB_ENV = "ECON_SIM_CACHE_MB"
+
+
+def cache_limits_from_env(environ=None):
+    """
+    환경 변수로 공유 캐시 크기를 정한다 (서버 시작 시 한 번).
+    - ECON_SIM_CACHE_ENTRIES: 최대 항목 수 (기본 512)
+    - ECON_SIM_CACHE_MB: 대략적인 최대 메모리 MB (기본 256, 0이면 제한 없음)
+    캐시는 모든 세션이 함께 쓰므로 세션(브라우저)에서는 바꾸지 않는다.
+    반환: (max_entries, max_bytes)
+    """
+    environ = environ if environ is not None else os.environ
+    limits = []
+    for name, default in ((CACHE_ENTRIES_ENV, 512), (CACHE_MB_ENV, 256)):
+        value = environ.get(name, "").strip()
+        try:
+            limit = int(value) if value else default
+        except ValueError:
+            raise ValueError(f"{name}는 0 이상의 정수여야 합니다: {value!r}") from None
+        if limit < 0:
+            raise ValueError(f"{name}는 0 이상의 정수여야 합니다: {value!r}")
+        limits.append(limit)
+    entries, megabytes = limits
+    return max(entries, 1), (megabytes * 1024 * 1024 if megabytes else None)
+
+
+# 같은 서버 프로세스의 모든 세션이 공유하는 캐시
+_shared_cache = SimulationCache(*cache_limits_from_env())
+
+
+def shared_cache() -> SimulationCache:
+    return _shared_cache
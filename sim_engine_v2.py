@@ -1,7 +1,210 @@
-from data_model import EconomicState, PolicyInput
+from dataclasses import dataclass
+from functools import lru_cache
+
+from data_model import EconomicState, PolicyInput, StateBatch, PolicyBatch
+from engine_params import (
+    CrisisRules,
+    Feedback,
+    NeutralValues,
+    PotentialGrowth,
+    mode_scales,
+    run_by_mode,
+)
+from model_spec import (
+    CRISIS,
+    DEVIATIONS,
+    FEEDBACK,
+    FINAL,
+    OUTPUTS,
+    POTENTIAL_GROWTH,
+    Clamp,
+    EngineParams,
+    Let,
+    Linear,
+    ModelSpec,
+    Param,
+    Stage,
+    compile_spec,
+)
+
+
+@dataclass(frozen=True)
+class Coefficients:
+    """
+    v2 엔진 계수 세트 (모드 배율 적용 전 원본 값).
+    coefficients_from_dict / load_coefficients로 소스 수정 없이 교체 가능.
+    """
+    neutral: NeutralValues = NeutralValues()
+    potential: PotentialGrowth = PotentialGrowth()
+
+    # 기대 인플레이션: (w_lagged × 이전 물가 + w_anchor × max(이전 물가, 잠재성장률))
+    w_lagged_expectation: float = 0.7
+    w_anchor_expectation: float = 0.3
+
+    # 소비 함수 C (shock_scale 적용)
+    base_consumption_index: float = 100.0
+    natural_unemployment: float = 5.0     # 자연실업률 근처로 가정
+    inflation_target: float = 2.0         # 목표 물가로 가정
+    w_unemp_cons: float = -1.2
+    w_rate_cons: float = -2.0
+    w_conf_cons: float = +0.4
+    w_expinf_cons: float = +0.3
+    cons_lower: float = 40.0
+    cons_upper: float = 160.0
+
+    # 투자 함수 I (shock_scale 적용)
+    base_invest_index: float = 100.0
+    w_rate_inv: float = -3.0
+    w_growth_inv: float = +1.0
+    w_inv_policy: float = +0.8
+    w_global_inv: float = +0.5
+    inv_lower: float = 30.0
+    inv_upper: float = 180.0
+
+    # 1차 성장률: 수요 측면 (shock_scale 적용)
+    w_cons_growth: float = 0.04
+    w_inv_growth: float = 0.05
+    w_gov_growth: float = 0.12
+    w_global_growth: float = 0.08
+    w_prod_growth: float = 0.05
+
+    # 1차 성장률: 비용 측면 (shock_scale 적용)
+    w_interest_growth: float = -0.08
+    w_tax_growth: float = -0.04
+    w_elec_growth: float = -0.6
+    w_oil_growth: float = -0.8
+    w_fx_growth: float = +1.0
+
+    # 물가 (shock_scale 적용)
+    w_oil_inf: float = +1.2
+    w_elec_inf: float = +0.8
+    w_global_inf: float = +0.015
+    w_demand_inf: float = +0.22
+    w_expinf_inf: float = +0.5
+    w_interest_inflation: float = -0.25
+
+    # 실업률 (shock_scale 적용)
+    w_growth_unemp: float = -0.35
+    w_invest_unemp: float = -0.03
+    w_gov_unemp: float = -0.03
+
+    feedback: Feedback = Feedback()
+    crisis: CrisisRules = CrisisRules()
+
+    # 성장률 변동폭 제한
+    growth_lower: float = -10.0
+    growth_upper: float = 15.0
+
+
+DEFAULT_COEFFICIENTS = Coefficients()
+
+
+# -------------------------------------------------------
+# 모델 명세 (스칼라 경로와 배치 커널은 이 명세에서 생성됨)
+# -------------------------------------------------------
+SPEC = ModelSpec(
+    name="v2",
+    stages=(
+        Stage("deviations", DEVIATIONS),
+        # 잠재성장률 (장기 구조)
+        Stage("potential", POTENTIAL_GROWTH),
+        # 기대 인플레이션 (단순형): 이전 인플레이션과 잠재성장률을 섞어서 "앞으로의 물가 기대"를 만듦
+        # 모드에 따라 기대의 민감도(expectation 배율)가 달라짐
+        Stage("expectation", (
+            Let(
+                "expected_inflation",
+                "(c.w_lagged_expectation * state.inflation"
+                " + c.w_anchor_expectation * max(state.inflation, potential_growth)) * mode.expectation"
+                " + state.inflation * w_static",
+            ),
+        )),
+        # 소비 함수 C: 실업률 ↑ → 소비 ↓, 금리 ↑ → 소비 ↓, 신뢰 ↑ → 소비 ↑, 기대 인플레이션 ↑ → 미리 소비 ↑
+        Stage("consumption", (
+            Linear("cons_index", start="c.base_consumption_index", terms=(
+                ("w_unemp_cons", "state.unemployment - c.natural_unemployment"),
+                ("w_rate_cons", "d_interest"),
+                ("w_conf_cons", "d_conf / 10.0"),
+                ("w_expinf_cons", "expected_inflation - c.inflation_target"),
+            )),
+            Clamp("cons_index", "c.cons_lower", "c.cons_upper"),
+            Let("cons_gap", "cons_index - c.base_consumption_index"),
+        )),
+        # 투자 함수 I: 금리 ↑ → 투자 ↓, 성장률 ↑ → 투자 ↑, 기업 투자 지수 ↑ → 투자 ↑, 글로벌 수요 ↑ → 투자 ↑
+        Stage("investment", (
+            Linear("inv_index", start="c.base_invest_index", terms=(
+                ("w_rate_inv", "d_interest"),
+                ("w_growth_inv", "state.growth - potential_growth"),
+                ("w_inv_policy", "d_invest / 10.0"),
+                ("w_global_inv", "d_global / 10.0"),
+            )),
+            Clamp("inv_index", "c.inv_lower", "c.inv_upper"),
+            Let("inv_gap", "inv_index - c.base_invest_index"),
+        )),
+        # 1차 성장률: 수요(C, I, G, 글로벌, 생산성) + 비용(금리, 세금, 전기요금, 유가, 환율)
+        Stage("growth", (
+            Linear("delta_growth_demand", terms=(
+                ("w_cons_growth", "cons_gap / 10.0"),
+                ("w_inv_growth", "inv_gap / 10.0"),
+                ("w_gov_growth", "d_gov"),
+                ("w_global_growth", "d_global / 10.0"),
+                ("w_prod_growth", "d_prod / 10.0"),
+            )),
+            Linear("delta_growth_cost", terms=(
+                ("w_interest_growth", "d_interest"),
+                ("w_tax_growth", "d_tax"),
+                ("w_elec_growth", "d_elec"),
+                ("w_oil_growth", "d_oil"),
+                ("w_fx_growth", "d_fx"),
+            )),
+            Let("growth_1", "potential_growth + delta_growth_demand + delta_growth_cost"),
+        )),
+        # 물가 (비용 + 수요 + 금리 효과 + 기대 인플레이션)
+        Stage("inflation", (
+            Let("demand_gap", "growth_1 - potential_growth"),
+            Linear("inflation_1", start="state.inflation", terms=(
+                ("w_oil_inf", "d_oil"),
+                ("w_elec_inf", "d_elec"),
+                ("w_global_inf", "d_global / 10.0"),
+                ("w_demand_inf", "demand_gap"),
+                ("w_expinf_inf", "expected_inflation - state.inflation"),
+                ("w_interest_inflation", "d_interest"),
+            )),
+        )),
+        # 실업률: 성장률 ↑ → 실업률 ↓, 투자 ↑ → 고용 ↑, 정부지출 ↑ → 고용 ↑
+        Stage("unemployment", (
+            Linear("unemp_1", start="state.unemployment", terms=(
+                ("w_growth_unemp", "growth_1 - state.growth"),
+                ("w_invest_unemp", "inv_gap / 10.0"),
+                ("w_gov_unemp", "d_gov"),
+            )),
+        )),
+        Stage("feedback", FEEDBACK),
+        Stage("crisis", (CRISIS,)),
+        Stage("final", FINAL),
+    ),
+    outputs=OUTPUTS,
+    params=(
+        # 기대 인플레이션 중 이전 물가를 그대로 따르는 비중
+        Param("w_static", "1 - mode.expectation"),
+    ),
+)
+
+_model = compile_spec(SPEC, DEFAULT_COEFFICIENTS)
+
+
+@lru_cache(maxsize=256)
+def compile_params(mode: str, coefficients: Coefficients = DEFAULT_COEFFICIENTS) -> EngineParams:
+    """
+    계수 세트에 모드 배율을 적용해 EngineParams를 만든다 (결과는 캐시됨).
+    """
+    return EngineParams(mode, _model.compile_values(coefficients, mode_scales(mode)))
 
 
-def update_one_year(state: EconomicState, policy: PolicyInput, mode: str) -> EconomicState:
+_scalar_kernel = _model.scalar_kernel
+_batch_kernel = _model.batch_kernel
+
+
+def update_one_year(state: EconomicState, policy: PolicyInput, mode: str, params: EngineParams = None) -> EconomicState:
     """
     한국형 동태 거시경제 시뮬레이터 (상호작용 강화 완전판)
 
@@ -12,273 +215,20 @@ def update_one_year(state: EconomicState, policy: PolicyInput, mode: str) -> Eco
         3) 성장률, 실업률, 인플레이션, 환율 등이 서로 피드백
         4) 위기 트리거(고물가, 고실업, 역성장)가 악순환을 강화
         5) 기대 인플레이션(단순형)을 반영해 금리 정책의 효과를 더 현실적으로 만듦
+    - params를 주면 mode 대신 해당 파라미터(사용자 계수 세트 등)를 사용
     """
+    return _scalar_kernel(state, policy, params if params is not None else compile_params(mode))
 
-    # ===== 1. 모드별 계수 스케일 =====
-    if mode == "안정형":
-        shock_scale = 0.5
-        feedback_scale = 0.6
-        crisis_trigger_scale = 0.5
-        potential_scale = 0.7
-        expectation_scale = 0.5
-    elif mode == "현실형":
-        shock_scale = 1.0
-        feedback_scale = 1.0
-        crisis_trigger_scale = 1.0
-        potential_scale = 1.0
-        expectation_scale = 1.0
-    elif mode == "위기형":
-        shock_scale = 1.8
-        feedback_scale = 2.0
-        crisis_trigger_scale = 2.0
-        potential_scale = 1.5
-        expectation_scale = 1.5
-    else:
-        shock_scale = 1.0
-        feedback_scale = 1.0
-        crisis_trigger_scale = 1.0
-        potential_scale = 1.0
-        expectation_scale = 1.0
-
-    # ===== 2. 기준값 =====
-    neutral_interest     = 2.0
-    neutral_corp_tax     = 25.0
-    neutral_elec_cost    = 100.0
-    neutral_fx           = 1200.0
-
-    neutral_gov_ratio    = 20.0
-    neutral_confidence   = 100.0
-    neutral_invest       = 100.0
-    neutral_global       = 100.0
-    neutral_oil          = 70.0
-    neutral_productivity = 100.0
-
-    # ===== 3. 편차 계산 =====
-    d_interest   = policy.interest_rate - neutral_interest
-    d_tax        = policy.corporate_tax - neutral_corp_tax
-    d_elec       = (policy.electricity_cost - neutral_elec_cost) / neutral_elec_cost
-    d_fx         = (policy.exchange_rate   - neutral_fx)        / neutral_fx
-
-    d_gov        = policy.government_spending_ratio - neutral_gov_ratio
-    d_conf       = policy.consumer_confidence       - neutral_confidence
-    d_invest     = policy.corporate_investment      - neutral_invest
-    d_global     = policy.global_demand             - neutral_global
-    d_oil        = (policy.oil_price - neutral_oil) / neutral_oil
-    d_prod       = policy.productivity              - neutral_productivity
-
-    # ===== 4. 잠재성장률 계산 (장기 구조) =====
-    base_potential_growth = 2.5
-    potential_growth = (
-        base_potential_growth
-        + potential_scale * 0.02 * ((policy.productivity - neutral_productivity) / 10.0)
-        + potential_scale * 0.03 * ((policy.corporate_investment - neutral_invest) / 10.0)
-        + potential_scale * 0.02 * ((policy.global_demand - neutral_global) / 10.0)
-    )
-    potential_growth = max(min(potential_growth, 6.0), 0.5)
-
-    # ===== 5. 기대 인플레이션 (단순형) =====
-    # 이전 인플레이션과 잠재성장률을 섞어서 "앞으로의 물가 기대"를 만듦
-    expected_inflation = (
-        0.7 * state.inflation
-        + 0.3 * max(state.inflation, potential_growth)
-    ) * expectation_scale + state.inflation * (1 - expectation_scale)
-    # 위 식은 모드에 따라 기대의 민감도가 달라지는 효과
-
-    # ===== 6. 소비 함수 C =====
-    # 기준: 100을 "정상 소비"라고 보고, 그 주변에서 위아래로 움직인다고 생각
-    # 영향 요인:
-    #   - 실업률 ↑ → 소비 ↓
-    #   - 금리 ↑ → 소비 ↓
-    #   - 소비자 신뢰 ↑ → 소비 ↑
-    #   - 기대 인플레이션 ↑ → (미리 소비) + / 실질소득 ↓ - -> 적당히 절충
-    base_consumption_index = 100.0
-
-    w_unemp_cons   = -1.2 * shock_scale     # 실업률 1%p ↑ → 소비 지수 약 1.2 ↓
-    w_rate_cons    = -2.0 * shock_scale     # 금리 1%p ↑ → 소비 지수 2 ↓
-    w_conf_cons    = +0.4 * shock_scale     # 신뢰지수 10 ↑ → 소비 지수 4 ↑
-    w_expinf_cons  = +0.3 * shock_scale     # 기대 인플레이션 ↑ → 미리 소비 약간 ↑ (짧은 시계로 가정)
-
-    cons_index = (
-        base_consumption_index
-        + w_unemp_cons  * (state.unemployment - 5.0)      # 5%를 자연실업률 근처로 가정
-        + w_rate_cons   * d_interest
-        + w_conf_cons   * (d_conf / 10.0)
-        + w_expinf_cons * (expected_inflation - 2.0)      # 2%를 목표 물가로 가정
-    )
-    # 과도한 폭주 방지
-    cons_index = max(min(cons_index, 160.0), 40.0)
-
-    # 소비 성장 기여분 (0을 기준으로 ±)
-    cons_gap = cons_index - base_consumption_index
-
-    # ===== 7. 투자 함수 I =====
-    # 영향 요인:
-    #   - 금리 ↑ → 투자 ↓
-    #   - 성장률 ↑ → 투자 ↑
-    #   - 기업 투자 지수 ↑ → 투자 ↑
-    #   - 글로벌 수요 ↑ → 투자 ↑
-    base_invest_index = 100.0
-
-    w_rate_inv    = -3.0 * shock_scale     # 금리 1%p ↑ → 투자 지수 3 ↓
-    w_growth_inv  = +1.0 * shock_scale     # 성장률 1%p ↑ → 투자 지수 1 ↑
-    w_inv_policy  = +0.8 * shock_scale     # 기업투자지수 10 ↑ → 투자 지수 8 ↑
-    w_global_inv  = +0.5 * shock_scale     # 글로벌 수요 10 ↑ → 투자 지수 5 ↑
-
-    inv_index = (
-        base_invest_index
-        + w_rate_inv   * d_interest
-        + w_growth_inv * (state.growth - potential_growth)
-        + w_inv_policy * (d_invest / 10.0)
-        + w_global_inv * (d_global / 10.0)
-    )
-    inv_index = max(min(inv_index, 180.0), 30.0)
-
-    inv_gap = inv_index - base_invest_index
-
-    # ===== 8. 1차 성장률: C, I, G, 글로벌 수요, 생산성 반영 =====
-    # 여기서는 "총수요 성장률" 느낌으로 구성
-    w_cons_growth   = 0.04 * shock_scale   # 소비 지수 10 ↑ → 성장률 0.4%p ↑
-    w_inv_growth    = 0.05 * shock_scale   # 투자 지수 10 ↑ → 성장률 0.5%p ↑
-    w_gov_growth    = 0.12 * shock_scale   # 정부지출 1%p ↑ → 성장률 0.12%p ↑
-    w_global_growth = 0.08 * shock_scale
-    w_prod_growth   = 0.05 * shock_scale
-
-    # 비용 측면 (금리, 세금, 전기요금, 유가, 환율)
-    w_interest_growth = -0.08 * shock_scale
-    w_tax_growth      = -0.04 * shock_scale
-    w_elec_growth     = -0.6  * shock_scale
-    w_oil_growth      = -0.8  * shock_scale
-    w_fx_growth       = +1.0  * shock_scale  # 원화 약세(환율↑)가 수출을 통해 성장률 ↑
-
-    delta_growth_demand = (
-        w_cons_growth   * (cons_gap / 10.0) +
-        w_inv_growth    * (inv_gap  / 10.0) +
-        w_gov_growth    * d_gov +
-        w_global_growth * (d_global / 10.0) +
-        w_prod_growth   * (d_prod   / 10.0)
-    )
-
-    delta_growth_cost = (
-        w_interest_growth * d_interest +
-        w_tax_growth      * d_tax +
-        w_elec_growth     * d_elec +
-        w_oil_growth      * d_oil +
-        w_fx_growth       * d_fx
-    )
-
-    growth_1 = potential_growth + delta_growth_demand + delta_growth_cost
 
-    # ===== 9. 물가 (비용 + 수요 + 금리 효과 + 기대 인플레이션) =====
-    w_oil_inf      = +1.2   * shock_scale
-    w_elec_inf     = +0.8   * shock_scale
-    w_global_inf   = +0.015 * shock_scale
-    w_demand_inf   = +0.22  * shock_scale
-    w_expinf_inf   = +0.5   * shock_scale  # 기대 인플레이션이 실제 인플에 반영
-
-    demand_gap = growth_1 - potential_growth
-
-    # 금리 인상 → 수요 위축 → 물가 하락
-    w_interest_inflation = -0.25 * shock_scale
-    delta_inflation_interest = w_interest_inflation * d_interest
-
-    inflation_1 = (
-        state.inflation +
-        w_oil_inf      * d_oil +
-        w_elec_inf     * d_elec +
-        w_global_inf   * (d_global / 10.0) +
-        w_demand_inf   * demand_gap +
-        w_expinf_inf   * (expected_inflation - state.inflation) +
-        delta_inflation_interest
-    )
-
-    # ===== 10. 실업률 =====
-    # 성장률 ↑ → 실업률 ↓, 투자 ↑ → 고용 ↑, 정부지출 ↑ → 고용 ↑
-    w_growth_unemp = -0.35 * shock_scale
-    w_invest_unemp = -0.03 * shock_scale
-    w_gov_unemp    = -0.03 * shock_scale
-
-    unemp_1 = (
-        state.unemployment +
-        w_growth_unemp * (growth_1 - state.growth) +
-        w_invest_unemp * (inv_gap / 10.0) +
-        w_gov_unemp    * d_gov
-    )
-
-    # -------------------------------------------------
-    # 11. 피드백(상호작용) — feedback_scale 적용
-    # -------------------------------------------------
-
-    # 실업률 ↑ → 소비 ↓ → 성장률 ↓ (간접 효과를 단순화해서 성장률에 반영)
-    fb_growth_from_unemp = -0.05 * feedback_scale * (unemp_1 - state.unemployment)
-
-    # 물가 ↑ → 실질임금 ↓ → 소비 ↓ → 성장률 ↓
-    fb_growth_from_infl  = -0.06 * feedback_scale * (inflation_1 - state.inflation)
-
-    # 성장률 변화의 자기 강화/조정
-    fb_growth_from_growth = -0.04 * feedback_scale * (growth_1 - state.growth)
-
-    # 환율 ↑ → 수입물가 ↑ → 물가 ↑
-    fb_infl_from_fx = 0.30 * feedback_scale * d_fx
-
-    # 실업률 ↑ → 수요 ↓ → 물가 ↓
-    fb_infl_from_unemp = -0.12 * feedback_scale * (unemp_1 - state.unemployment)
-
-    # 성장률 ↓ → 실업률 ↑ (추가 오쿤의 법칙 효과)
-    fb_unemp_from_growth = -0.20 * feedback_scale * (growth_1 - state.growth)
-
-    # -------------------------------------------------
-    # 12. 위기 트리거 (crisis_trigger_scale 적용)
-    # -------------------------------------------------
-    crisis_growth_penalty = 0.0
-    crisis_inflation_spike = 0.0
-    crisis_unemployment_spike = 0.0
-
-    # 실업률 위기
-    if unemp_1 > 12:
-        crisis_growth_penalty        -= 0.5 * crisis_trigger_scale
-        crisis_unemployment_spike    += 0.3 * crisis_trigger_scale
-
-    # 물가 위기
-    if inflation_1 > 6:
-        crisis_growth_penalty        -= 0.4 * crisis_trigger_scale
-        crisis_inflation_spike       += 0.5 * crisis_trigger_scale
-
-    # 성장률 위기
-    if growth_1 < -1:
-        crisis_growth_penalty        -= 0.6 * crisis_trigger_scale
-        crisis_unemployment_spike    += 0.4 * crisis_trigger_scale
-
-    # ===== 13. 최종 지표 =====
-    final_growth = (
-        growth_1 +
-        fb_growth_from_unemp +
-        fb_growth_from_infl +
-        fb_growth_from_growth +
-        crisis_growth_penalty
-    )
-
-    final_inflation = (
-        inflation_1 +
-        fb_infl_from_fx +
-        fb_infl_from_unemp +
-        crisis_inflation_spike
-    )
-
-    final_unemployment = (
-        unemp_1 +
-        fb_unemp_from_growth +
-        crisis_unemployment_spike
-    )
-
-    # 성장률 변동폭 제한 (너무 폭주 방지)
-    final_growth = max(min(final_growth, 15.0), -10.0)
-
-    # ===== 14. GDP =====
-    final_gdp = state.gdp * (1 + final_growth / 100)
-
-    return EconomicState(
-        gdp=final_gdp,
-        inflation=final_inflation,
-        unemployment=final_unemployment,
-        growth=final_growth,
-    )
\ No newline at end of file
+def update_one_year_batch(states: StateBatch, policies: PolicyBatch, mode, params: EngineParams = None) -> StateBatch:
+    """
+    update_one_year의 배치(벡터화) 버전.
+    - states / policies: 시나리오별 배열 (길이 1 필드는 브로드캐스트)
+    - mode: 문자열 하나 또는 시나리오별 모드 배열
+    - 위기 트리거와 변동폭 제한은 마스크 연산으로 처리하며,
+      연산 순서를 스칼라 버전과 동일하게 유지해 결과가 정확히 일치함
+    - params를 주면 mode 대신 해당 파라미터를 모든 시나리오에 사용
+    """
+    if params is not None:
+        return _batch_kernel(states, policies, params)
+    return run_by_mode(_batch_kernel, compile_params, states, policies, mode)
@@ -0,0 +1,382 @@
+"""
+여러 세션이 공유하는 시뮬레이션 서비스 (프로세스 내 작업 스레드).
+
+Streamlit 세션마다 스칼라 update_one_year를 따로 호출하면 동시 사용자가 많을 때
+작은 호출들이 GIL을 두고 경쟁한다. 서비스는 모든 세션의 요청을 한 대기열에 모아
+짧은 시간 창(window) 안에 들어온 요청을 (엔진, 기간)별 마이크로 배치로 묶어
+배치 엔진으로 한 번에 실행한 뒤 각 세션에 결과를 돌려준다.
+배치 경로는 스칼라 경로와 연산 순서가 같아 결과가 정확히 일치한다.
+
+- 역압력: 대기열이 max_queue에 차면 제출이 자리가 날 때까지 기다리고,
+  제한 시간 안에 자리가 나지 않으면 ServiceOverloaded
+- 요청별 제한 시간: 실행 전에 기한이 지난 요청은 건너뛰고 TimeoutError
+- 지표: 대기열 길이, 배치 크기, 대기·전체 지연 시간 분위수 (stats())
+"""
+import atexit
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from data_model import EconomicState, PolicyInput, PolicyBatch, StateBatch, POLICY_FIELDS, STATE_FIELDS
+from simulation import SimulationResult, simulate_batch
+
+
+class ServiceOverloaded(RuntimeError):
+    """
+    대기열이 가득 차 제한 시간 안에 요청을 받지 못함.
+    """
+
+
+class ServiceClosed(RuntimeError):
+    """
+    종료된 서비스에 요청을 제출함.
+    """
+
+
+STEP = "step"          # 1년 진행 → EconomicState
+SIMULATE = "simulate"  # N년 진행 → SimulationResult
+
+
+@dataclass
+class _Request:
+    kind: str
+    engine: str
+    mode: str
+    state: EconomicState
+    policy: PolicyInput
+    years: int
+    start_year: int
+    future: Future
+    enqueued: float
+    deadline: Optional[float]
+
+
+# -------------------------------------------------------
+# 지표
+# -------------------------------------------------------
+@dataclass
+class ServiceStats:
+    """
+    서비스 지표 스냅샷 (지연 시간은 최근 latency_window개 요청 기준, 밀리초).
+    - wait: 대기열에 들어온 뒤 배치 실행이 시작될 때까지
+    - latency: 대기열에 들어온 뒤 결과가 준비될 때까지
+    """
+    submitted: int
+    completed: int
+    failed: int
+    rejected: int
+    timed_out: int
+    cancelled: int
+    batches: int
+    queue_depth: int
+    max_queue_depth: int
+    mean_batch_size: float
+    max_batch_size: int
+    wait_p50_ms: float
+    wait_p99_ms: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_p99_ms: float
+    latency_max_ms: float
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(self.__dict__)
+
+
+class _Metrics:
+    def __init__(self, window: int):
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.max_batch_size = 0
+        self.max_queue_depth = 0
+        self.wait = deque(maxlen=window)
+        self.latency = deque(maxlen=window)
+
+    def batch(self, size: int):
+        with self.lock:
+            self.batches += 1
+            self.batched_requests += size
+            self.max_batch_size = max(self.max_batch_size, size)
+
+    def done(self, enqueued: float, started: float, finished: float):
+        with self.lock:
+            self.completed += 1
+            self.wait.append(started - enqueued)
+            self.latency.append(finished - enqueued)
+
+    def count(self, name: str, n: int = 1):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + n)
+
+
+def _quantile_ms(values, q: float) -> float:
+    if not values:
+        return 0.0
+    return float(np.percentile(np.fromiter(values, float), q) * 1000.0)
+
+
+# -------------------------------------------------------
+# 서비스
+# -------------------------------------------------------
+class SimulationService:
+    """
+    마이크로 배치 시뮬레이션 서비스.
+    - window: 첫 요청이 들어온 뒤 같은 배치로 묶을 요청을 기다리는 최대 시간 (초)
+    - max_batch: 배치 하나의 최대 요청 수 (차면 창을 기다리지 않고 바로 실행)
+    - max_queue: 대기열 최대 길이 (역압력)
+    - timeout: 요청 기본 제한 시간 (초, 대기열 자리 대기 + 실행 완료까지)
+    """
+
+    def __init__(
+        self,
+        window: float = 0.002,
+        max_batch: int = 512,
+        max_queue: int = 4096,
+        timeout: float = 5.0,
+        latency_window: int = 10_000,
+    ):
+        self.window = window
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.metrics = _Metrics(latency_window)
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._has_work = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="sim-service", daemon=True)
+        self._thread.start()
+
+    # ----- 제출 -----
+    def submit(
+        self,
+        state: EconomicState,
+        policy: PolicyInput,
+        mode: str,
+        years: int = 1,
+        engine: str = "v1",
+        start_year: int = 1,
+        kind: str = SIMULATE,
+        timeout: Optional[float] = None,
+    ) -> Future:
+        """
+        요청을 대기열에 넣고 Future를 반환 (결과: kind가 STEP이면 EconomicState, 아니면 SimulationResult).
+        대기열이 가득 차면 제한 시간까지 자리를 기다린다.
+        """
+        if not isinstance(engine, str):
+            raise TypeError("서비스에는 엔진 이름(문자열)을 지정하세요.")
+        if years < 0:
+            raise ValueError("years는 0 이상이어야 합니다.")
+        timeout = self.timeout if timeout is None else timeout
+        now = time.monotonic()
+        deadline = None if timeout is None else now + timeout
+        request = _Request(kind, engine, mode, state, policy, int(years), start_year, Future(), now, deadline)
+
+        with self._lock:
+            while not self._closed and len(self._queue) >= self.max_queue:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self.metrics.count("rejected")
+                    raise ServiceOverloaded(f"시뮬레이션 대기열이 가득 찼습니다 ({self.max_queue}건).")
+                self._not_full.wait(remaining)
+            if self._closed:
+                raise ServiceClosed("시뮬레이션 서비스가 종료되었습니다.")
+            self._queue.append(request)
+            depth = len(self._queue)
+            self._has_work.notify()
+
+        with self.metrics.lock:
+            self.metrics.submitted += 1
+            self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, depth)
+        return request.future
+
+    # ----- 작업 스레드 -----
+    def _next_batch(self):
+        with self._lock:
+            while not self._queue and not self._closed:
+                self._has_work.wait()
+            if not self._queue:
+                return None
+            # 첫 요청 기준으로 창이 끝나거나 배치가 찰 때까지 더 모은다
+            until = self._queue[0].enqueued + self.window
+            while len(self._queue) < self.max_batch and not self._closed:
+                remaining = until - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._has_work.wait(remaining)
+            batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch))]
+            self._not_full.notify_all()
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._execute(batch)
+
+    def _execute(self, batch):
+        started = time.monotonic()
+        groups: Dict[tuple, list] = {}
+        for request in batch:
+            if request.deadline is not None and started > request.deadline:
+                if request.future.set_running_or_notify_cancel():
+                    request.future.set_exception(TimeoutError("시뮬레이션 요청 제한 시간이 지났습니다."))
+                self.metrics.count("timed_out")
+            elif not request.future.set_running_or_notify_cancel():
+                self.metrics.count("cancelled")
+            else:
+                groups.setdefault((request.engine, request.years), []).append(request)
+
+        for (engine, years), requests in groups.items():
+            self.metrics.batch(len(requests))
+            try:
+                trajectory = self._simulate(engine, years, requests)
+            except Exception as e:
+                for request in requests:
+                    request.future.set_exception(e)
+                self.metrics.count("failed", len(requests))
+                continue
+
+            for i, request in enumerate(requests):
+                request.future.set_result(_result(trajectory, i, request))
+                self.metrics.done(request.enqueued, started, time.monotonic())
+
+    @staticmethod
+    def _simulate(engine: str, years: int, requests):
+        states = StateBatch(**{
+            name: np.fromiter((getattr(r.state, name) for r in requests), float, len(requests))
+            for name in STATE_FIELDS
+        })
+        policies = PolicyBatch(**{
+            name: np.fromiter((getattr(r.policy, name) for r in requests), float, len(requests))
+            for name in POLICY_FIELDS
+        })
+        modes = [r.mode for r in requests]
+        mode = modes[0] if len(set(modes)) == 1 else np.array(modes)
+        return simulate_batch(states, policies, mode, years, engine)
+
+    # ----- 관리 -----
+    def stats(self) -> ServiceStats:
+        m = self.metrics
+        with self._lock:
+            depth = len(self._queue)
+        with m.lock:
+            wait, latency = list(m.wait), list(m.latency)
+            return ServiceStats(
+                submitted=m.submitted,
+                completed=m.completed,
+                failed=m.failed,
+                rejected=m.rejected,
+                timed_out=m.timed_out,
+                cancelled=m.cancelled,
+                batches=m.batches,
+                queue_depth=depth,
+                max_queue_depth=m.max_queue_depth,
+                mean_batch_size=m.batched_requests / m.batches if m.batches else 0.0,
+                max_batch_size=m.max_batch_size,
+                wait_p50_ms=_quantile_ms(wait, 50),
+                wait_p99_ms=_quantile_ms(wait, 99),
+                latency_p50_ms=_quantile_ms(latency, 50),
+                latency_p95_ms=_quantile_ms(latency, 95),
+                latency_p99_ms=_quantile_ms(latency, 99),
+                latency_max_ms=max(latency) * 1000.0 if latency else 0.0,
+            )
+
+    def close(self, wait: bool = True):
+        """
+        새 요청을 막고, 이미 들어온 요청을 처리한 뒤 작업 스레드를 끝낸다.
+        """
+        with self._lock:
+            self._closed = True
+            self._has_work.notify_all()
+            self._not_full.notify_all()
+        if wait and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+
+def _result(trajectory, i: int, request: _Request):
+    final = trajectory.final
+    final_state = EconomicState(**{name: float(getattr(final, name)[i]) for name in STATE_FIELDS})
+    if request.kind == STEP:
+        return final_state
+    return SimulationResult(
+        year=np.arange(request.start_year, request.start_year + request.years, dtype=np.int64),
+        gdp=trajectory.gdp[:, i].copy(),
+        inflation=trajectory.inflation[:, i].copy(),
+        unemployment=trajectory.unemployment[:, i].copy(),
+        growth=trajectory.growth[:, i].copy(),
+        final_state=final_state,
+    )
+
+
+# -------------------------------------------------------
+# 클라이언트
+# -------------------------------------------------------
+class SimulationClient:
+    """
+    서비스에 요청하고 결과를 기다리는 동기 클라이언트 (세션 스크립트 스레드에서 사용).
+    timeout을 넘기면 요청을 취소하고 TimeoutError.
+    """
+
+    def __init__(self, service: Optional[SimulationService] = None, timeout: Optional[float] = None):
+        self.service = service or shared_service()
+        self.timeout = self.service.timeout if timeout is None else timeout
+
+    def _wait(self, future: Future):
+        try:
+            return future.result(self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise TimeoutError(f"시뮬레이션이 {self.timeout:g}초 안에 끝나지 않았습니다.") from None
+
+    def step(self, state: EconomicState, policy: PolicyInput, mode: str, engine: str = "v1") -> EconomicState:
+        """
+        update_one_year와 같은 결과 (1년 진행).
+        """
+        return self._wait(self.service.submit(state, policy, mode, 1, engine, kind=STEP, timeout=self.timeout))
+
+    def simulate(
+        self,
+        state: EconomicState,
+        policy: PolicyInput,
+        mode: str,
+        years: int,
+        engine: str = "v1",
+        start_year: int = 1,
+    ) -> SimulationResult:
+        """
+        simulation.simulate와 같은 결과 (매년 같은 정책).
+        """
+        return self._wait(self.service.submit(state, policy, mode, years, engine, start_year, timeout=self.timeout))
+
+
+# 같은 서버 프로세스의 모든 세션이 공유하는 서비스 (처음 사용할 때 시작)
+_shared_service = None
+_shared_lock = threading.Lock()
+
+
+def shared_service() -> SimulationService:
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None or _shared_service.closed:
+            _shared_service = SimulationService()
+            atexit.register(_shared_service.close, False)
+        return _shared_service
@@ -0,0 +1,351 @@
+import itertools
+from dataclasses import dataclass, fields
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from data_model import EconomicState, PolicyInput, StateBatch, PolicyBatch, STATE_FIELDS
+from engine_registry import get_engine
+from stop_rules import as_stop_list, stop_name
+
+
+TRAJECTORY_COLUMNS = ("year",) + STATE_FIELDS
+
+
+def resolve_engine(engine):
+    """
+    엔진 이름("v1", "v2" 등 레지스트리에 등록된 이름) 또는
+    update_one_year를 가진 모듈을 엔진 모듈로 변환 (이름이면 처음 사용할 때 로드).
+    """
+    if isinstance(engine, str):
+        return get_engine(engine)
+    return engine
+
+
+def policy_schedule(policy_or_schedule, years: int):
+    """
+    단일 PolicyInput 또는 연도별 PolicyInput 시퀀스를 길이 years의 리스트로 정규화.
+    """
+    if isinstance(policy_or_schedule, PolicyInput):
+        return [policy_or_schedule] * years
+
+    schedule = list(policy_or_schedule)
+    if len(schedule) != years:
+        raise ValueError(f"정책 스케줄 길이({len(schedule)})가 시뮬레이션 기간({years}년)과 다릅니다.")
+    return schedule
+
+
+@dataclass
+class SimulationResult:
+    """
+    N년 시뮬레이션 결과 (지표별 열 배열).
+    - year: int64 배열
+    - gdp / inflation / unemployment / growth: float64 배열
+    - final_state: 마지막 해의 EconomicState
+    """
+    year: np.ndarray
+    gdp: np.ndarray
+    inflation: np.ndarray
+    unemployment: np.ndarray
+    growth: np.ndarray
+    final_state: EconomicState
+
+    def __len__(self):
+        return len(self.year)
+
+    def columns(self):
+        return {name: getattr(self, name) for name in TRAJECTORY_COLUMNS}
+
+    def to_dataframe(self):
+        """
+        열 배열을 복사하지 않고 그대로 감싸는 DataFrame으로 변환.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.columns(), copy=False)
+
+    def to_dicts(self):
+        """
+        기존 세션 결과 형식(to_series dict 리스트)으로 변환.
+        """
+        columns = [getattr(self, name).tolist() for name in TRAJECTORY_COLUMNS]
+        return [dict(zip(TRAJECTORY_COLUMNS, row)) for row in zip(*columns)]
+
+
+def simulate(
+    state: EconomicState,
+    policy_or_schedule: Union[PolicyInput, Sequence[PolicyInput]],
+    mode: str,
+    years: int,
+    engine="v1",
+    start_year: int = 1,
+) -> SimulationResult:
+    """
+    years년을 한 번에 시뮬레이션해 미리 할당된 지표별 배열에 기록.
+    - policy_or_schedule: 매년 같은 정책 또는 연도별 정책 시퀀스
+    - engine: "v1" / "v2" 또는 엔진 모듈
+    - start_year: 첫 해의 연도 번호 (기존 결과에 이어 붙일 때 사용)
+    """
+    if years < 0:
+        raise ValueError("years는 0 이상이어야 합니다.")
+
+    update_one_year = resolve_engine(engine).update_one_year
+    schedule = policy_schedule(policy_or_schedule, years)
+
+    year = np.arange(start_year, start_year + years, dtype=np.int64)
+    gdp = np.empty(years)
+    inflation = np.empty(years)
+    unemployment = np.empty(years)
+    growth = np.empty(years)
+
+    for t, policy in enumerate(schedule):
+        state = update_one_year(state, policy, mode)
+        gdp[t] = state.gdp
+        inflation[t] = state.inflation
+        unemployment[t] = state.unemployment
+        growth[t] = state.growth
+
+    return SimulationResult(
+        year=year,
+        gdp=gdp,
+        inflation=inflation,
+        unemployment=unemployment,
+        growth=growth,
+        final_state=state,
+    )
+
+
+@dataclass
+class BatchTrajectory:
+    """
+    N개 시나리오의 years년 궤적.
+    - gdp / inflation / unemployment / growth: (years, N) 배열 (행 = 연도)
+    - final: 마지막 해의 StateBatch
+    """
+    year: np.ndarray
+    gdp: np.ndarray
+    inflation: np.ndarray
+    unemployment: np.ndarray
+    growth: np.ndarray
+    final: StateBatch
+
+    def metric(self, name: str) -> np.ndarray:
+        return getattr(self, name)
+
+
+def as_state_batch(state) -> StateBatch:
+    if isinstance(state, StateBatch):
+        return state
+    return StateBatch(**{name: getattr(state, name) for name in STATE_FIELDS})
+
+
+def simulate_batch(
+    states,
+    policies,
+    mode,
+    years: int,
+    engine="v1",
+    start_year: int = 1,
+) -> BatchTrajectory:
+    """
+    시나리오 N개를 배치 엔진으로 years년 동시에 시뮬레이션.
+    - states: StateBatch 또는 EconomicState (모든 시나리오 공통 초기값)
+    - policies: PolicyBatch(매년 동일) 또는 연도별 PolicyBatch 시퀀스
+    - mode: 문자열 또는 시나리오별 모드 배열
+    """
+    update_batch = resolve_engine(engine).update_one_year_batch
+    states = as_state_batch(states)
+    if isinstance(policies, PolicyInput):
+        policies = PolicyBatch.from_policy(policies)
+    if isinstance(policies, PolicyBatch):
+        schedule = [policies] * years
+    else:
+        schedule = list(policies)
+        if len(schedule) != years:
+            raise ValueError(f"정책 스케줄 길이({len(schedule)})가 시뮬레이션 기간({years}년)과 다릅니다.")
+
+    out = None
+    for t, policy in enumerate(schedule):
+        states = update_batch(states, policy, mode)
+        if out is None:
+            out = {name: np.empty((years, len(states))) for name in STATE_FIELDS}
+        for name in STATE_FIELDS:
+            out[name][t] = getattr(states, name)
+
+    if out is None:
+        out = {name: np.empty((0, len(states))) for name in STATE_FIELDS}
+
+    return BatchTrajectory(
+        year=np.arange(start_year, start_year + years, dtype=np.int64),
+        final=states,
+        **out,
+    )
+
+
+def advance_batch(states, policies, mode, years: int, engine="v1") -> StateBatch:
+    """
+    궤적을 저장하지 않고 years년 뒤의 StateBatch만 반환 (메모리 사용 최소).
+    """
+    update_batch = resolve_engine(engine).update_one_year_batch
+    states = as_state_batch(states)
+    if isinstance(policies, PolicyInput):
+        policies = PolicyBatch.from_policy(policies)
+    for _ in range(years):
+        states = update_batch(states, policies, mode)
+    return states
+
+
+# -------------------------------------------------------
+# 조기 종료가 있는 연도 반복
+# -------------------------------------------------------
+def iter_years(state: EconomicState, policy_or_schedule, mode: str, engine="v1", stop=None, max_years: int = None):
+    """
+    update_one_year로 한 해씩 진행하며 EconomicState를 하나씩 내보내는 지연 반복자.
+    - policy_or_schedule: 매년 같은 PolicyInput 또는 연도별 PolicyInput 반복 가능 객체 (생성기 가능)
+    - stop: 종료 조건 하나 또는 시퀀스 (stop_rules 참고). 조건을 만족한 해의 상태까지 내보낸 뒤
+      멈추고, 발동한 조건 이름을 반환값(StopIteration.value)으로 남긴다.
+    - max_years: 최대 기간 (None이면 스케줄이 끝날 때까지, 단일 정책이면 종료 조건까지)
+    """
+    update_one_year = resolve_engine(engine).update_one_year
+    rules = as_stop_list(stop)
+    if isinstance(policy_or_schedule, PolicyInput):
+        schedule = itertools.repeat(policy_or_schedule)
+    else:
+        schedule = iter(policy_or_schedule)
+    if max_years is not None:
+        schedule = itertools.islice(schedule, max_years)
+
+    for policy in schedule:
+        state = update_one_year(state, policy, mode)
+        yield state
+        for rule in rules:
+            if rule(state):
+                return stop_name(rule)
+    return None
+
+
+@dataclass
+class StopEvent:
+    """
+    조기 종료 결과.
+    - years: 진행한 햇수 (종료 조건이 발동한 해 포함)
+    - state: 마지막 상태
+    - reason: 발동한 종료 조건 이름 (기간 끝까지 발동하지 않으면 None)
+    """
+    years: int
+    state: EconomicState
+    reason: Optional[str]
+
+
+def run_until(state: EconomicState, policy_or_schedule, mode: str, stop, max_years: int = None,
+              engine="v1") -> StopEvent:
+    """
+    종료 조건이 처음 발동할 때까지 시뮬레이션 (위기·회복까지 걸리는 기간 측정용).
+    """
+    years = 0
+    it = iter_years(state, policy_or_schedule, mode, engine=engine, stop=stop, max_years=max_years)
+    while True:
+        try:
+            state = next(it)
+        except StopIteration as done:
+            return StopEvent(years=years, state=state, reason=done.value)
+        years += 1
+
+
+@dataclass
+class BatchStopEvent:
+    """
+    시나리오별 조기 종료 결과.
+    - years: 시나리오별 진행한 햇수 (종료되지 않은 시나리오는 max_years)
+    - reason: 발동한 조건의 reasons 내 번호 (-1 = 발동하지 않음)
+    - reasons: 종료 조건 이름 튜플
+    - final: 시나리오별 종료 시점(또는 max_years)의 StateBatch
+    """
+    years: np.ndarray
+    reason: np.ndarray
+    reasons: Tuple[str, ...]
+    final: StateBatch
+
+    @property
+    def stopped(self) -> np.ndarray:
+        return self.reason >= 0
+
+    def reason_names(self) -> np.ndarray:
+        names = np.array(self.reasons + (None,), dtype=object)
+        return names[self.reason]
+
+
+def _take(batch, idx: np.ndarray):
+    """
+    배치의 idx 시나리오만 추려낸다 (길이 1 열은 브로드캐스트용이므로 그대로 유지).
+    """
+    return type(batch)(**{
+        f.name: col if col.shape[0] == 1 else col[idx]
+        for f in fields(batch)
+        for col in (getattr(batch, f.name),)
+    })
+
+
+def run_until_batch(states, policies, mode, stop, max_years: int, engine="v1") -> BatchStopEvent:
+    """
+    시나리오 N개를 배치로 진행하며 종료 조건을 만족한 시나리오는 매년 활성 집합에서 제외한다.
+    (남은 시나리오만 계산하므로 대부분이 일찍 끝나는 연구에서 처리량이 높게 유지됨)
+    - policies: PolicyBatch / PolicyInput(매년 동일) 또는 길이 max_years의 연도별 PolicyBatch 시퀀스
+    - mode: 문자열 또는 시나리오별 모드 배열
+    - 여러 조건이 같은 해에 발동하면 stop에서 앞에 있는 조건을 기록
+    """
+    update_batch = resolve_engine(engine).update_one_year_batch
+    rules = as_stop_list(stop)
+    states = as_state_batch(states)
+    if isinstance(policies, PolicyInput):
+        policies = PolicyBatch.from_policy(policies)
+    if isinstance(policies, PolicyBatch):
+        schedule = [policies] * max_years
+    else:
+        schedule = list(policies)
+        if len(schedule) != max_years:
+            raise ValueError(f"정책 스케줄 길이({len(schedule)})가 시뮬레이션 기간({max_years}년)과 다릅니다.")
+
+    modes = None if isinstance(mode, str) else np.atleast_1d(np.asarray(mode))
+    n = max([len(states)] + [len(p) for p in schedule[:1]] + ([len(modes)] if modes is not None else []))
+    states = StateBatch(**{name: np.broadcast_to(getattr(states, name), (n,)) for name in STATE_FIELDS})
+    if modes is not None:
+        modes = np.broadcast_to(modes, (n,))
+
+    years = np.full(n, max_years, dtype=np.int64)
+    reason = np.full(n, -1, dtype=np.int8)
+    final = {name: np.array(getattr(states, name), dtype=np.float64) for name in STATE_FIELDS}
+
+    active = np.arange(n)
+    current = states
+    for t, policy in enumerate(schedule):
+        if len(active) == 0:
+            break
+        current = update_batch(
+            current,
+            _take(policy, active),
+            mode if modes is None else modes[active],
+        )
+        hit_any = np.zeros(len(active), dtype=bool)
+        for code, rule in enumerate(rules):
+            hit = np.broadcast_to(np.asarray(rule(current), dtype=bool), hit_any.shape) & ~hit_any
+            reason[active[hit]] = code
+            hit_any |= hit
+        if hit_any.any():
+            done = active[hit_any]
+            years[done] = t + 1
+            for name in STATE_FIELDS:
+                final[name][done] = getattr(current, name)[hit_any]
+            keep = np.flatnonzero(~hit_any)
+            active = active[keep]
+            current = StateBatch(**{name: getattr(current, name)[keep] for name in STATE_FIELDS})
+
+    for name in STATE_FIELDS:
+        final[name][active] = getattr(current, name)
+
+    return BatchStopEvent(
+        years=years,
+        reason=reason,
+        reasons=tuple(stop_name(rule) for rule in rules),
+        final=StateBatch(**final),
+    )
@@ -0,0 +1,93 @@
+"""
+시뮬레이션 조기 종료 조건.
+
+각 조건은 state -> bool 함수로, EconomicState(스칼라)와 StateBatch(배열) 모두에 쓸 수 있다.
+(배치에서는 시나리오별 bool 배열을 반환)
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from engine_params import CrisisRules
+
+
+DEFAULT_CRISIS_RULES = CrisisRules()
+
+
+def crisis_flags(state, rules: CrisisRules = DEFAULT_CRISIS_RULES):
+    """
+    (실업률 위기, 물가 위기, 성장률 위기) 판정. 엔진의 위기 트리거와 같은 임계값을 사용.
+    """
+    return (
+        state.unemployment > rules.unemployment_threshold,
+        state.inflation > rules.inflation_threshold,
+        state.growth < rules.growth_threshold,
+    )
+
+
+def in_crisis(state, rules: CrisisRules = DEFAULT_CRISIS_RULES):
+    unemployment, inflation, growth = crisis_flags(state, rules)
+    return unemployment | inflation | growth
+
+
+@dataclass(frozen=True)
+class FirstCrisis:
+    """
+    위기 트리거(실업률·물가·성장률 임계값) 중 하나라도 발동하면 종료.
+    """
+    rules: CrisisRules = DEFAULT_CRISIS_RULES
+    name: str = "crisis"
+
+    def __call__(self, state):
+        return in_crisis(state, self.rules)
+
+
+@dataclass(frozen=True)
+class Recovery:
+    """
+    위기 트리거가 모두 해제되면 종료 (위기 상태에서 출발해 회복까지 걸리는 기간 측정용).
+    """
+    rules: CrisisRules = DEFAULT_CRISIS_RULES
+    name: str = "recovery"
+
+    def __call__(self, state):
+        return np.logical_not(in_crisis(state, self.rules))
+
+
+@dataclass(frozen=True)
+class UnemploymentBelow:
+    threshold: float
+    name: str = "unemployment_below"
+
+    def __call__(self, state):
+        return state.unemployment < self.threshold
+
+
+@dataclass(frozen=True)
+class Diverged:
+    """
+    값이 NaN/무한대가 되거나 |지표|가 limit를 넘거나 GDP가 0 이하가 되면 종료.
+    """
+    limit: float = 1e6
+    name: str = "diverged"
+
+    def __call__(self, state):
+        bad = state.gdp <= 0
+        for value in (state.inflation, state.unemployment, state.growth):
+            bad = bad | ~np.isfinite(value) | (np.abs(value) > self.limit)
+        return bad | ~np.isfinite(state.gdp)
+
+
+def as_stop_list(stop):
+    """
+    None / 조건 하나 / 조건 시퀀스를 조건 튜플로 정규화.
+    """
+    if stop is None:
+        return ()
+    if callable(stop):
+        return (stop,)
+    return tuple(stop)
+
+
+def stop_name(rule) -> str:
+    return getattr(rule, "name", None) or getattr(rule, "__name__", type(rule).__name__)
@@ -0,0 +1,120 @@
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+
+from data_model import EconomicState, PolicyInput, PolicyBatch, POLICY_FIELDS, STATE_FIELDS
+from engine_registry import engine_fingerprint
+from sim_cache import SimulationCache
+from simulation import advance_batch
+
+
+# 스윕 결과 캐시 크기 (500×500 격자 1개 ≈ 8MB)
+CACHE_SIZE = 16
+
+_cache = SimulationCache(max_entries=CACHE_SIZE, max_bytes=None)
+
+
+@dataclass(frozen=True)
+class GridSpec:
+    """
+    두 정책 변수에 대한 격자 정의 (x: 열 방향, y: 행 방향).
+    """
+    x_field: str
+    x_min: float
+    x_max: float
+    x_steps: int
+    y_field: str
+    y_min: float
+    y_max: float
+    y_steps: int
+
+    def __post_init__(self):
+        for name in (self.x_field, self.y_field):
+            if name not in POLICY_FIELDS:
+                raise ValueError(f"PolicyInput에 없는 변수: {name}")
+        if self.x_field == self.y_field:
+            raise ValueError("x와 y는 서로 다른 변수여야 합니다.")
+        if self.x_steps < 1 or self.y_steps < 1:
+            raise ValueError("격자 해상도는 1 이상이어야 합니다.")
+
+    @property
+    def x_values(self) -> np.ndarray:
+        return np.linspace(self.x_min, self.x_max, self.x_steps)
+
+    @property
+    def y_values(self) -> np.ndarray:
+        return np.linspace(self.y_min, self.y_max, self.y_steps)
+
+
+@dataclass
+class SweepResult:
+    """
+    격자 각 점에서 years년 후 지표 값.
+    - values[metric]: (y_steps, x_steps) 배열
+    """
+    grid: GridSpec
+    years: int
+    values: Dict[str, np.ndarray]
+
+    @property
+    def x_values(self) -> np.ndarray:
+        return self.grid.x_values
+
+    @property
+    def y_values(self) -> np.ndarray:
+        return self.grid.y_values
+
+
+def _cache_key(state, policy, mode, years, engine, grid):
+    # 격자로 움직이는 두 변수는 키에서 제외 (결과에 영향 없음).
+    # 엔진은 이름 대신 구성 해시로 (같은 이름으로 다른 계수 세트를 다시 등록하면 새로 계산)
+    fixed = tuple(
+        (name, getattr(policy, name)) for name in POLICY_FIELDS if name not in (grid.x_field, grid.y_field)
+    )
+    return ("sweep", engine_fingerprint(engine), mode, state, fixed, years, grid)
+
+
+def sweep(
+    state: EconomicState,
+    policy: PolicyInput,
+    mode: str,
+    years: int,
+    grid: GridSpec,
+    engine: str = "v1",
+    chunk_size: int = 50_000,
+    use_cache: bool = True,
+) -> SweepResult:
+    """
+    grid의 두 정책 변수를 격자로 바꿔 가며 years년 시뮬레이션하고 모든 지표를 기록.
+    - 격자 점을 chunk_size개씩 배치 엔진으로 실행해 메모리 사용량을 제한
+    - (엔진 구성, 모드, 초기 상태, 고정 입력, 기간, 격자)가 같으면 캐시된 결과를 반환
+    """
+    if use_cache:
+        key = _cache_key(state, policy, mode, years, engine, grid)
+        return _cache.get_or_compute(key, lambda: _run_sweep(state, policy, mode, years, grid, engine, chunk_size))
+    return _run_sweep(state, policy, mode, years, grid, engine, chunk_size)
+
+
+def _run_sweep(state, policy, mode, years, grid, engine, chunk_size) -> SweepResult:
+    xs, ys = grid.x_values, grid.y_values
+    total = len(xs) * len(ys)
+    flat = {name: np.empty(total) for name in STATE_FIELDS}
+    fixed = {name: getattr(policy, name) for name in POLICY_FIELDS if name not in (grid.x_field, grid.y_field)}
+
+    for start in range(0, total, chunk_size):
+        idx = np.arange(start, min(start + chunk_size, total))
+        policies = PolicyBatch(**fixed, **{grid.x_field: xs[idx % len(xs)], grid.y_field: ys[idx // len(xs)]})
+        final = advance_batch(state, policies, mode, years, engine)
+        for name in STATE_FIELDS:
+            flat[name][start:start + len(idx)] = getattr(final, name)
+
+    return SweepResult(
+        grid=grid,
+        years=years,
+        values={name: col.reshape(len(ys), len(xs)) for name, col in flat.items()},
+    )
+
+
+def clear_cache():
+    _cache.clear()
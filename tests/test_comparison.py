@@ -0,0 +1,34 @@
+"""
+엔진·모드 비교 실행 테스트.
+"""
+import dataclasses
+
+import numpy as np
+import pytest
+
+import comparison
+from batch_runner import DEFAULT_POLICY
+from comparison import compare_runs
+from data_model import EconomicState, STATE_FIELDS
+from simulation import simulate
+
+
+START = EconomicState(1e7, 1.2, 14.5, 2.5)
+SCHEDULE = [dataclasses.replace(DEFAULT_POLICY, interest_rate=DEFAULT_POLICY.interest_rate + 0.01 * t)
+            for t in range(60)]
+
+
+@pytest.mark.parametrize("policy, years", [(DEFAULT_POLICY, 80), (SCHEDULE, None)])
+def test_scalar_and_batch_paths_agree(policy, years, monkeypatch):
+    scalar = compare_runs(START, policy, years)
+    monkeypatch.setattr(comparison, "SCALAR_COMBOS", 0)
+    batch = compare_runs(START, policy, years)
+    for name in STATE_FIELDS:
+        np.testing.assert_array_equal(scalar.values[name], batch.values[name])
+
+
+def test_combo_matches_single_run():
+    result = compare_runs(START, SCHEDULE, engines=("v2",), modes=("위기형",))
+    alone = simulate(START, SCHEDULE, "위기형", len(SCHEDULE), "v2")
+    for name in STATE_FIELDS:
+        np.testing.assert_array_equal(result.series(name, ("v2", "위기형")), getattr(alone, name))
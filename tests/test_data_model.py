@@ -0,0 +1,89 @@
+"""
+데이터 모델 테스트 (레코드 뷰, 불변 버전, TrajectoryBuffer).
+"""
+import dataclasses
+
+import numpy as np
+import pytest
+
+import sim_engine
+from batch_runner import DEFAULT_POLICY
+from data_model import (
+    EconomicState, EconomicStateView, PolicyInputView, StateBatch, PolicyBatch, TrajectoryBuffer,
+    STATE_FIELDS, policies_to_records, states_to_records,
+)
+from simulation import simulate
+
+
+START = EconomicState(1e7, 1.2, 14.5, 2.5)
+
+
+def test_record_views_read_without_copy():
+    records = states_to_records([START, EconomicState(2e7, 3.0, 4.0, 5.0)])
+    view = EconomicStateView(records, 1)
+    assert view.to_state() == EconomicState(2e7, 3.0, 4.0, 5.0)
+    records["inflation"][1] = 9.0
+    assert view.inflation == 9.0
+
+    policies = policies_to_records([DEFAULT_POLICY])
+    assert PolicyInputView(policies, 0).to_policy() == DEFAULT_POLICY
+    # 엔진은 뷰를 EconomicState / PolicyInput처럼 그대로 받는다
+    assert (sim_engine.update_one_year(EconomicStateView(states_to_records([START]), 0), PolicyInputView(policies, 0), "현실형")
+            == sim_engine.update_one_year(START, DEFAULT_POLICY, "현실형"))
+
+
+def test_batches_wrap_record_fields():
+    records = states_to_records([START] * 3)
+    batch = StateBatch.from_records(records)
+    for name in STATE_FIELDS:
+        assert np.shares_memory(getattr(batch, name), records)
+    policies = PolicyBatch.from_records(policies_to_records([DEFAULT_POLICY] * 3))
+    assert policies.to_policies() == [DEFAULT_POLICY] * 3
+
+
+def test_frozen_variants():
+    frozen = START.freeze()
+    assert frozen.thaw() == START
+    assert {frozen, START.freeze()} == {frozen}
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        frozen.gdp = 0.0
+    policy = DEFAULT_POLICY.freeze()
+    assert hash(policy) == hash(DEFAULT_POLICY.freeze())
+    assert sim_engine.update_one_year(frozen, policy, "위기형") == sim_engine.update_one_year(START, DEFAULT_POLICY, "위기형")
+
+
+def test_trajectory_buffer_grows_geometrically():
+    buffer = TrajectoryBuffer(capacity=1)
+    state, grown = START, 0
+    for _ in range(1000):
+        capacity = buffer.capacity
+        state = sim_engine.update_one_year(state, DEFAULT_POLICY, "현실형")
+        buffer.append(state)
+        grown += buffer.capacity != capacity
+    assert len(buffer) == 1000
+    assert grown == 10          # 1 → 2 → … → 1024
+    assert buffer.state(-1).to_state() == state
+    assert list(buffer["year"][:3]) == [1, 2, 3]
+
+    expected = simulate(START, DEFAULT_POLICY, "현실형", 1000)
+    for name in STATE_FIELDS:
+        np.testing.assert_array_equal(buffer[name], getattr(expected, name))
+
+
+def test_trajectory_buffer_extend_and_dataframe():
+    result = simulate(START, DEFAULT_POLICY, "현실형", 50)
+    buffer = TrajectoryBuffer()
+    buffer.extend(result.year, *(getattr(result, name) for name in STATE_FIELDS))
+    buffer.append(START)
+    assert len(buffer) == 51
+    assert buffer["year"][-1] == 51
+
+    frame = buffer.to_dataframe()
+    assert list(frame.columns) == ["year", *STATE_FIELDS]
+    for column in frame.columns:
+        assert np.shares_memory(frame[column].to_numpy(), buffer[column])
+
+    buffer.clear()
+    assert len(buffer) == 0
+    with pytest.raises(IndexError):
+        buffer.state(0)
@@ -0,0 +1,110 @@
+"""
+엔진 기준 궤적 테스트.
+
+golden_trajectories.json은 명세 기반으로 바꾸기 전의 원래 엔진(sim_engine.py / sim_engine_v2.py의
+손으로 작성한 update_one_year)으로 만든 v1·v2 × 3개 모드 × 대표 시나리오 4개의 25년 궤적이다.
+스칼라 경로, 배치 경로, 명세에서 생성한 커널이 모두 이 궤적과 같아야 한다.
+"""
+import json
+import os
+
+import numpy as np
+import pytest
+
+import sim_engine
+import sim_engine_v2
+from data_model import EconomicState, PolicyInput, PolicyBatch, StateBatch, STATE_FIELDS
+from engine_params import MODES
+from simulation import simulate, simulate_batch
+
+
+with open(os.path.join(os.path.dirname(__file__), "golden_trajectories.json"), encoding="utf-8") as f:
+    GOLDEN = json.load(f)
+
+YEARS = GOLDEN["years"]
+CASES = tuple(GOLDEN["cases"])
+ENGINES = {"v1": sim_engine, "v2": sim_engine_v2}
+
+# 원래 엔진과 연산 순서가 같으므로 차이는 없어야 하지만, 플랫폼별 libm 차이는 허용
+RTOL = 1e-12
+
+
+def _case(name):
+    case = GOLDEN["cases"][name]
+    return EconomicState(**case["state"]), PolicyInput(**case["policy"])
+
+
+def _expected(case: str, engine: str, mode: str) -> np.ndarray:
+    return np.array(GOLDEN["cases"][case]["trajectories"][f"{engine}/{mode}"])
+
+
+def _rows(states) -> np.ndarray:
+    return np.array([[getattr(s, name) for name in STATE_FIELDS] for s in states])
+
+
+def _batch_inputs(cases):
+    pairs = [_case(name) for name in cases]
+    return StateBatch.from_states([s for s, _ in pairs]), PolicyBatch.from_policies([p for _, p in pairs])
+
+
+def test_golden_covers_all_engines_and_modes():
+    for case in CASES:
+        assert set(GOLDEN["cases"][case]["trajectories"]) == {f"{e}/{m}" for e in ENGINES for m in MODES}
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+@pytest.mark.parametrize("case", CASES)
+def test_scalar_path(case, engine, mode):
+    state, policy = _case(case)
+    result = simulate(state, policy, mode, YEARS, engine)
+    actual = np.column_stack([getattr(result, name) for name in STATE_FIELDS])
+    np.testing.assert_allclose(actual, _expected(case, engine, mode), rtol=RTOL, atol=0)
+
+    # update_one_year를 직접 반복해도 같아야 함
+    states = []
+    for _ in range(YEARS):
+        state = ENGINES[engine].update_one_year(state, policy, mode)
+        states.append(state)
+    np.testing.assert_allclose(_rows(states), _expected(case, engine, mode), rtol=RTOL, atol=0)
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_batch_path(engine, mode):
+    states, policies = _batch_inputs(CASES)
+    trajectory = simulate_batch(states, policies, mode, YEARS, engine)
+    for i, case in enumerate(CASES):
+        actual = np.column_stack([getattr(trajectory, name)[:, i] for name in STATE_FIELDS])
+        np.testing.assert_allclose(actual, _expected(case, engine, mode), rtol=RTOL, atol=0)
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_batch_path_mixed_modes(engine):
+    # 시나리오마다 다른 모드 (run_by_mode 분할 경로)
+    pairs = [(case, mode) for case in CASES for mode in MODES]
+    states, policies = _batch_inputs([case for case, _ in pairs])
+    modes = np.array([mode for _, mode in pairs], dtype=object)
+    trajectory = simulate_batch(states, policies, modes, YEARS, engine)
+    for i, (case, mode) in enumerate(pairs):
+        actual = np.column_stack([getattr(trajectory, name)[:, i] for name in STATE_FIELDS])
+        np.testing.assert_allclose(actual, _expected(case, engine, mode), rtol=RTOL, atol=0)
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_generated_kernels(engine, mode):
+    module = ENGINES[engine]
+    params = module.compile_params(mode)
+    for case in CASES:
+        state, policy = _case(case)
+        states, policies = StateBatch.from_states([state]), PolicyBatch.from_policy(policy)
+        scalar, batch = [], []
+        for _ in range(YEARS):
+            state = module._model.scalar_kernel(state, policy, params)
+            states = module._model.batch_kernel(states, policies, params)
+            scalar.append(state)
+            batch.extend(states.to_states())
+        expected = _expected(case, engine, mode)
+        np.testing.assert_allclose(_rows(scalar), expected, rtol=RTOL, atol=0)
+        np.testing.assert_allclose(_rows(batch), expected, rtol=RTOL, atol=0)
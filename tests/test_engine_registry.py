@@ -0,0 +1,24 @@
+"""
+엔진 등록·구성 해시 테스트.
+"""
+import dataclasses
+
+import sim_engine
+from engine_registry import engine_fingerprint, register_configured
+
+
+def test_fingerprint_follows_configuration():
+    base = sim_engine.DEFAULT_COEFFICIENTS
+    assert engine_fingerprint("v1") != engine_fingerprint("v2")
+    assert engine_fingerprint("v1") == engine_fingerprint(sim_engine)
+
+    register_configured("test-calibrated", "v1", base)
+    first = engine_fingerprint("test-calibrated")
+    assert first != engine_fingerprint("v1")
+
+    # 같은 이름으로 다른 계수 세트를 다시 등록하면 해시도 바뀐다
+    changed = dataclasses.replace(base, potential=dataclasses.replace(base.potential, base=3.0))
+    register_configured("test-calibrated", "v1", changed)
+    assert engine_fingerprint("test-calibrated") != first
+    register_configured("test-calibrated", "v1", base)
+    assert engine_fingerprint("test-calibrated") == first
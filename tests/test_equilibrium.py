@@ -0,0 +1,99 @@
+"""
+장기 균형 탐색 테스트.
+
+아핀 사상 F(x) = A·x + b를 엔진으로 넘겨 고정점·순환·일정 증분 발산을 만들고,
+판정과 함께 엔진 평가 수가 단순 반복(horizon년)보다 훨씬 적은지 확인한다.
+"""
+import types
+
+import numpy as np
+import pytest
+
+from batch_runner import DEFAULT_POLICY
+from data_model import EconomicState, PolicyBatch, StateBatch, POLICY_FIELDS
+from equilibrium import CONVERGED, CYCLE, DRIFT, find_equilibrium
+from simulation import simulate_batch
+
+
+START = EconomicState(1e7, 1.2, 14.5, 2.5)
+HORIZON = 1000
+
+
+def _affine_engine(A, b):
+    A, b = np.asarray(A, dtype=np.float64), np.asarray(b, dtype=np.float64)
+
+    def update_one_year_batch(states, policies, mode):
+        x = np.stack([states.inflation, states.unemployment, states.growth], axis=-1)
+        y = x @ A.T + b
+        return StateBatch(gdp=states.gdp, inflation=y[:, 0], unemployment=y[:, 1], growth=y[:, 2])
+
+    return types.SimpleNamespace(update_one_year_batch=update_one_year_batch)
+
+
+def _path(A, b, years):
+    # 같은 사상을 한 해씩 따라간 기준값
+    x = np.array([START.inflation, START.unemployment, START.growth])
+    for _ in range(years):
+        x = np.asarray(A) @ x + np.asarray(b)
+    return x
+
+
+def _point(result):
+    return np.array([result.inflation[0], result.unemployment[0], result.growth[0]])
+
+
+def test_fixed_point():
+    target = np.array([2.0, 5.0, 3.0])
+    result = find_equilibrium(START, DEFAULT_POLICY, "현실형", _affine_engine(0.5 * np.eye(3), 0.5 * target),
+                              horizon=HORIZON)
+    assert result.status[0] == CONVERGED
+    np.testing.assert_allclose(_point(result), target, atol=1e-8)
+    assert result.iterations[0] <= 20
+
+
+def test_two_cycle():
+    # 중심에 대한 반사: 두 해마다 제자리로 돌아온다
+    center = np.array([2.0, 5.0, 3.0])
+    result = find_equilibrium(START, DEFAULT_POLICY, "현실형", _affine_engine(-np.eye(3), 2 * center),
+                              horizon=HORIZON)
+    assert result.status[0] == CYCLE
+    assert result.period[0] == 2
+    assert result.iterations[0] <= 150
+
+
+def test_constant_drift():
+    step = np.array([0.1, -0.2, 0.0])
+    result = find_equilibrium(START, DEFAULT_POLICY, "현실형", _affine_engine(np.eye(3), step), horizon=HORIZON)
+    assert result.status[0] == DRIFT
+    np.testing.assert_allclose(result.drift[0], step, atol=1e-12)
+    np.testing.assert_allclose(_point(result), _path(np.eye(3), step, HORIZON), rtol=1e-10)
+    assert result.iterations[0] <= 20
+
+
+def test_affine_drift():
+    # 물가·성장률은 수렴하고 실업률만 누적: 증분이 기하급수로 줄다가 일정해진다
+    A, b = np.diag([0.95, 1.0, 0.9]), np.array([0.1, 0.3, 0.3])
+    result = find_equilibrium(START, DEFAULT_POLICY, "현실형", _affine_engine(A, b), horizon=HORIZON)
+    assert result.status[0] == DRIFT
+    np.testing.assert_allclose(result.drift[0], [0.0, 0.3, 0.0], atol=1e-9)
+    np.testing.assert_allclose(_point(result), _path(A, b, result.years[0]), rtol=1e-8)
+    assert result.iterations[0] <= 50
+
+
+@pytest.mark.parametrize("engine", ["v1", "v2"])
+def test_engine_paths_match_simulation(engine):
+    rng = np.random.default_rng(0)
+    n = 200
+    policies = PolicyBatch(**{name: getattr(DEFAULT_POLICY, name) * rng.uniform(0.3, 1.7, n) for name in POLICY_FIELDS})
+    result = find_equilibrium(START, policies, "현실형", engine, horizon=HORIZON)
+
+    assert result.iterations.max() <= HORIZON
+    assert np.median(result.iterations) <= HORIZON // 5
+    # 건너뛰어 도착한 점도 한 해씩 따라간 경로 위에 있어야 한다
+    trajectory = simulate_batch(START, policies, "현실형", HORIZON, engine)
+    x = np.stack([trajectory.inflation, trajectory.unemployment, trajectory.growth], axis=-1)
+    drift = np.flatnonzero(result.status == DRIFT)
+    assert len(drift) > n // 2
+    expected = x[result.years[drift] - 1, drift]
+    actual = np.stack([result.inflation, result.unemployment, result.growth], axis=-1)[drift]
+    np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-6)
@@ -0,0 +1,51 @@
+"""
+몬테카를로 분위수 스케치 병합 테스트.
+"""
+import numpy as np
+import pytest
+
+from monte_carlo import DEFAULT_QUANTILES, _merge_sketches, _sketch
+
+
+def _stream(chunks):
+    sketch, total = None, 0
+    for chunk in chunks:
+        if sketch is None:
+            sketch, total = _sketch(chunk), chunk.shape[-1]
+        else:
+            sketch = _merge_sketches(sketch, total, _sketch(chunk), chunk.shape[-1])
+            total += chunk.shape[-1]
+    return sketch
+
+
+@pytest.mark.parametrize("shape", ["normal", "skewed", "clipped"])
+def test_streamed_quantiles_match_pooled(shape):
+    rng = np.random.default_rng(3)
+    chunks = []
+    for i in range(300):
+        size = 10_000 if i % 7 else 3_000     # 크기가 다른 청크도 섞음
+        x = rng.standard_normal((2, size))
+        if shape == "skewed":
+            x = np.exp(x)
+        elif shape == "clipped":
+            x = np.clip(x, -1.0, None)        # 경계에 몰린 값 (동점)
+        chunks.append(x)
+    sketch = _stream(chunks)
+    pooled = np.concatenate(chunks, axis=-1)
+
+    levels = np.asarray(DEFAULT_QUANTILES, dtype=np.float64)
+    grid = np.linspace(0.0, 1.0, sketch.shape[-1])
+    for row in range(pooled.shape[0]):
+        streamed = np.interp(levels / 100.0, grid, sketch[row])
+        expected = np.percentile(pooled[row], levels)
+        np.testing.assert_allclose(streamed, expected, atol=5e-3 * pooled[row].std())
+
+
+def test_merge_keeps_extremes():
+    rng = np.random.default_rng(4)
+    a, b = rng.standard_normal((1, 5_000)), rng.standard_normal((1, 20_000)) + 1.0
+    merged = _merge_sketches(_sketch(a), 5_000, _sketch(b), 20_000)
+    pooled = np.concatenate([a, b], axis=-1)
+    assert merged[0, 0] == pooled.min()
+    assert merged[0, -1] == pooled.max()
+    assert np.all(np.diff(merged[0]) >= 0)
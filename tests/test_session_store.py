@@ -0,0 +1,40 @@
+"""
+세션 기록 테스트: 추가와 유휴 정리(spill)가 다른 스레드에서 겹쳐도 기록이 빠지거나 섞이지 않는다.
+"""
+import threading
+
+import numpy as np
+
+from data_model import EconomicState
+from session_store import SessionHistory, SessionRegistry
+
+
+def test_history_window_and_records(tmp_path):
+    history = SessionHistory(str(tmp_path / "h.bin"), window=8)
+    for year in range(1, 41):
+        history.append(EconomicState(float(year), 1.0, 2.0, 3.0), year)
+    assert len(history) == 40
+    assert history.resident < 16 and history.spilled == 40 - history.resident
+    np.testing.assert_array_equal(history["year"], np.arange(1, 41))
+    np.testing.assert_array_equal(history["gdp"], np.arange(1, 41, dtype=np.float64))
+    assert history.state(3).gdp == 4.0 and history.policy(3) is None
+
+
+def test_eviction_during_appends(tmp_path):
+    registry = SessionRegistry(window=16, idle_seconds=0.0, directory=str(tmp_path))
+    history = registry.open("s")
+    years = 20_000
+
+    def writer():
+        for year in range(1, years + 1):
+            history.append(EconomicState(float(year), 1.0, 2.0, 3.0), year)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    while thread.is_alive():
+        registry.evict_idle()
+    thread.join()
+
+    assert len(history) == years
+    np.testing.assert_array_equal(history["year"], np.arange(1, years + 1))
+    np.testing.assert_array_equal(history["gdp"], np.arange(1, years + 1, dtype=np.float64))
@@ -0,0 +1,24 @@
+"""
+시뮬레이션 캐시 테스트 (운영자 크기 설정, 그래프 크기 산정).
+"""
+import numpy as np
+import pytest
+
+from sim_cache import CACHE_ENTRIES_ENV, CACHE_MB_ENV, SimulationCache, cache_limits_from_env
+
+
+def test_cache_limits_from_env():
+    assert cache_limits_from_env({}) == (512, 256 * 1024 * 1024)
+    assert cache_limits_from_env({CACHE_ENTRIES_ENV: "64", CACHE_MB_ENV: "0"}) == (64, None)
+    with pytest.raises(ValueError, match=CACHE_MB_ENV):
+        cache_limits_from_env({CACHE_MB_ENV: "lots"})
+    with pytest.raises(ValueError, match=CACHE_ENTRIES_ENV):
+        cache_limits_from_env({CACHE_ENTRIES_ENV: "-1"})
+
+
+def test_figures_count_their_trace_data():
+    go = pytest.importorskip("plotly.graph_objects")
+    cache = SimulationCache(max_entries=8, max_bytes=None)
+    y = np.random.default_rng(0).standard_normal(100_000)
+    cache.get_or_compute(("figure",), lambda: go.Figure(go.Scattergl(y=y)))
+    assert cache.stats().bytes >= y.nbytes
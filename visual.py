@@ -1,23 +1,74 @@
+import numpy as np
 import plotly.graph_objs as go
 import pandas as pd
 
+from sim_cache import SimulationCache
 
-def plot_time_series(df: pd.DataFrame):
+
+# 한 선에 그릴 최대 점 수 (넘으면 구간별 최솟값/최댓값만 남김)
+POINT_BUDGET = 2000
+# 점이 이보다 많으면 WebGL(Scattergl)로 그림
+WEBGL_THRESHOLD = 1000
+# 점이 이보다 적을 때만 마커 표시
+MARKER_THRESHOLD = 200
+# 스파게티 그래프에 그릴 최대 경로 수
+MAX_PATHS = 200
+
+
+# -------------------------------------------------------
+# 점 수 줄이기 / 트레이스 선택
+# -------------------------------------------------------
+def decimate_minmax(x, y, max_points: int = POINT_BUDGET):
+    """
+    y의 구간별 최솟값과 최댓값 점만 남겨 max_points 이하로 줄인다 (첫 점·마지막 점 유지).
+    급등락 같은 극값이 사라지지 않으므로 선 모양이 원래와 같게 보인다.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= max_points or n <= 2:
+        return x, y
+
+    buckets = max(1, (max_points - 2) // 2)
+    inner = n - 2
+    size = -(-inner // buckets)
+    padded_low = np.full(buckets * size, np.inf)
+    padded_high = np.full(buckets * size, -np.inf)
+    values = y[1:-1]
+    valid = ~np.isnan(values)
+    padded_low[:inner] = np.where(valid, values, np.inf)
+    padded_high[:inner] = np.where(valid, values, -np.inf)
+
+    offset = np.arange(buckets) * size
+    low = offset + padded_low.reshape(buckets, size).argmin(axis=1)
+    high = offset + padded_high.reshape(buckets, size).argmax(axis=1)
+    picked = np.concatenate([low, high])
+    keep = np.unique(np.concatenate([[0], 1 + picked[picked < inner], [n - 1]]))
+    return x[keep], y[keep]
+
+
+def _line(x, y, name: str, max_points: int, webgl, **kwargs):
+    """
+    점 수에 따라 Scatter/Scattergl, 마커 표시 여부, 점 줄이기를 정해 선 트레이스를 만든다.
+    """
+    n = len(y)
+    x, y = decimate_minmax(x, y, max_points)
+    use_webgl = n > WEBGL_THRESHOLD if webgl is None else webgl
+    trace = go.Scattergl if use_webgl else go.Scatter
+    mode = "lines+markers" if n <= MARKER_THRESHOLD else "lines"
+    return trace(x=x, y=y, name=name, mode=mode, **kwargs)
+
+
+def plot_time_series(df: pd.DataFrame, max_points: int = POINT_BUDGET, webgl: bool = None):
     """
     여러 지표를 한 그래프에 그리는 통합 그래프.
     필요하면 메인 화면에서 호출해서 사용할 수 있다.
     """
     fig = go.Figure()
     metrics = ["gdp", "inflation", "unemployment", "growth"]
+    x = df["year"].to_numpy()
     for m in metrics:
-        fig.add_trace(
-            go.Scatter(
-                x=df["year"],
-                y=df[m],
-                name=m,
-                mode="lines+markers",
-            )
-        )
+        fig.add_trace(_line(x, df[m].to_numpy(), m, max_points, webgl))
     fig.update_layout(
         title="시뮬레이션 결과 추이 (통합)",
         xaxis_title="Year",
@@ -32,18 +83,22 @@ def plot_metric(
     metric: str,
     title: str = None,
     color: str = "blue",
+    max_points: int = POINT_BUDGET,
+    webgl: bool = None,
 ):
     """
     단일 지표 라인+마커 그래프.
     color 파라미터로 선과 마커 색 지정 가능.
+    점이 많으면 WebGL로 그리고 max_points를 넘는 부분은 최솟값/최댓값만 남긴다.
     """
     title = title or f"{metric} 추이"
     fig = go.Figure(
-        data=go.Scatter(
-            x=df["year"],
-            y=df[metric],
-            mode="lines+markers",
-            name=metric,
+        data=_line(
+            df["year"].to_numpy(),
+            df[metric].to_numpy(),
+            metric,
+            max_points,
+            webgl,
             line=dict(color=color),
             marker=dict(color=color),
         )
@@ -53,4 +108,222 @@ def plot_metric(
         xaxis_title="Year",
         yaxis_title=metric,
     )
-    return fig
\ No newline at end of file
+    return fig
+
+
+def append_points(fig, x, y, trace: int = 0, max_points: int = POINT_BUDGET) -> bool:
+    """
+    plot_metric으로 만든 그래프의 트레이스 끝에 새 점만 이어 붙인다 (그래프 전체를 다시 만들지 않음).
+    점 수가 늘어 트레이스 종류(Scattergl)·마커 표시·점 줄이기 기준이 바뀌면
+    붙이지 않고 False를 반환하므로, 그때는 plot_metric으로 다시 그린다.
+    """
+    line = fig.data[trace]
+    old = 0 if line.x is None else len(line.x)
+    n = old + len(x)
+    if n > max_points:
+        return False
+    if isinstance(line, go.Scattergl) != (n > WEBGL_THRESHOLD):
+        return False
+    if (line.mode == "lines+markers") != (n <= MARKER_THRESHOLD):
+        return False
+    with fig.batch_update():
+        line.x = np.concatenate([np.asarray(line.x if old else [], dtype=np.asarray(x).dtype), x])
+        line.y = np.concatenate([np.asarray(line.y if old else [], dtype=np.float64), y])
+    return True
+
+
+def plot_heatmap(
+    x,
+    y,
+    z,
+    title: str = None,
+    x_title: str = None,
+    y_title: str = None,
+    colorbar_title: str = None,
+    colorscale: str = "RdBu",
+):
+    """
+    2차원 스윕 결과 히트맵.
+    z는 (len(y), len(x)) 배열.
+    """
+    fig = go.Figure(
+        data=go.Heatmap(
+            x=x,
+            y=y,
+            z=z,
+            colorscale=colorscale,
+            colorbar=dict(title=colorbar_title),
+        )
+    )
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+    )
+    return fig
+
+
+def plot_overlay(
+    x,
+    series,
+    title: str = None,
+    y_title: str = None,
+    markers=None,
+    max_points: int = POINT_BUDGET,
+    webgl: bool = None,
+):
+    """
+    여러 선을 한 그래프에 겹쳐 그린다. series는 {이름: y 배열} (엔진·모드 비교 등).
+    markers를 주면 {이름: x 값}마다 해당 선 위에 점을 찍는다 (예: 기준과 갈라지는 연도).
+    """
+    x = np.asarray(x)
+    fig = go.Figure()
+    for name, y in series.items():
+        fig.add_trace(_line(x, np.asarray(y), name, max_points, webgl, legendgroup=name))
+    for name, at in (markers or {}).items():
+        hit = np.flatnonzero(x == at)
+        if not len(hit):
+            continue
+        fig.add_trace(go.Scatter(
+            x=[at], y=[np.asarray(series[name])[hit[0]]], mode="markers",
+            marker=dict(symbol="x", size=10, color="black"),
+            name=f"{name} 분기", legendgroup=name, showlegend=False,
+            hovertemplate=f"{name} 분기: %{{x}}년<extra></extra>",
+        ))
+    fig.update_layout(title=title, xaxis_title="Year", yaxis_title=y_title)
+    return fig
+
+
+# -------------------------------------------------------
+# 몬테카를로: 분위수 팬 차트 / 스파게티 그래프
+# -------------------------------------------------------
+def plot_fan_chart(
+    fan,
+    metric: str,
+    title: str = None,
+    color: str = "royalblue",
+    max_points: int = POINT_BUDGET,
+):
+    """
+    분위수 팬 차트. fan은 monte_carlo.FanChart (year, levels, quantiles, mean).
+    바깥 분위수 쌍부터 안쪽 쌍까지 띠를 겹쳐 칠하고, 중앙값과 평균을 선으로 그린다.
+    연도가 max_points보다 많으면 구간별로 하한은 최솟값, 상한은 최댓값을 남긴다.
+    """
+    year = np.asarray(fan.year)
+    levels = list(fan.levels)
+    rows = np.asarray(fan.quantiles[metric])
+    order = np.argsort(levels)
+    levels = [levels[i] for i in order]
+    rows = rows[order]
+
+    step = -(-len(year) // max(1, max_points))
+    if step > 1:
+        cut = len(year) // step * step
+        tail = slice(cut, None)
+
+        def reduce(values, how):
+            head = how(values[:cut].reshape(-1, step), axis=1)
+            return np.concatenate([head, [how(values[tail])]]) if cut < len(year) else head
+
+        x = np.concatenate([year[:cut:step], year[cut:cut + 1]]) if cut < len(year) else year[:cut:step]
+        lows = [reduce(row, np.min) for row in rows]
+        highs = [reduce(row, np.max) for row in rows]
+        centers = [reduce(row, np.mean) for row in rows]
+        mean = reduce(np.asarray(fan.mean[metric]), np.mean)
+    else:
+        x = year
+        lows = highs = centers = list(rows)
+        mean = np.asarray(fan.mean[metric])
+
+    fig = go.Figure()
+    pairs = len(levels) // 2
+    for i in range(pairs):
+        lo, hi = i, len(levels) - 1 - i
+        opacity = 0.15 + 0.25 * (i + 1) / max(pairs, 1)
+        fig.add_trace(go.Scatter(
+            x=x, y=lows[lo], mode="lines", line=dict(width=0, color=color),
+            showlegend=False, hoverinfo="skip",
+        ))
+        fig.add_trace(go.Scatter(
+            x=x, y=highs[hi], mode="lines", line=dict(width=0, color=color),
+            fill="tonexty", fillcolor=color, opacity=opacity,
+            name=f"p{levels[lo]:g}–p{levels[hi]:g}",
+        ))
+    if len(levels) % 2:
+        mid = len(levels) // 2
+        fig.add_trace(go.Scatter(
+            x=x, y=centers[mid],
+            mode="lines", line=dict(color=color, width=2), name=f"p{levels[mid]:g}",
+        ))
+    fig.add_trace(go.Scatter(x=x, y=mean, mode="lines", line=dict(color=color, dash="dot"), name="평균"))
+    fig.update_layout(
+        title=title or f"{metric} 분포 ({fan.n_paths:,}개 경로)",
+        xaxis_title="Year",
+        yaxis_title=metric,
+    )
+    return fig
+
+
+def plot_spaghetti(
+    year,
+    paths,
+    title: str = None,
+    color: str = "royalblue",
+    max_paths: int = MAX_PATHS,
+    opacity: float = 0.25,
+    show_median: bool = True,
+    y_title: str = None,
+):
+    """
+    경로별 궤적을 겹쳐 그린 스파게티 그래프. paths는 (years, N) 배열.
+    경로가 max_paths보다 많으면 고르게 max_paths개만 골라 그리고,
+    모든 경로를 NaN으로 구분한 WebGL 트레이스 하나로 그린다. (중앙값은 전체 경로 기준)
+    """
+    year = np.asarray(year, dtype=np.float64)
+    paths = np.asarray(paths, dtype=np.float64)
+    if paths.ndim == 1:
+        paths = paths[:, None]
+    n = paths.shape[1]
+    idx = np.unique(np.linspace(0, n - 1, min(n, max_paths)).astype(np.intp)) if n else np.empty(0, np.intp)
+
+    chosen = paths[:, idx]
+    x = np.tile(np.append(year, np.nan), len(idx))
+    y = np.vstack([chosen, np.full((1, len(idx)), np.nan)]).T.ravel()
+
+    fig = go.Figure(go.Scattergl(
+        x=x, y=y, mode="lines",
+        line=dict(color=color, width=1), opacity=opacity,
+        name=f"경로 {len(idx):,}/{n:,}개", connectgaps=False,
+    ))
+    if show_median and n:
+        fig.add_trace(go.Scattergl(
+            x=year, y=np.median(paths, axis=1), mode="lines",
+            line=dict(color="black", width=2), name="중앙값",
+        ))
+    fig.update_layout(title=title, xaxis_title="Year", yaxis_title=y_title)
+    return fig
+
+
+# -------------------------------------------------------
+# 그래프 캐시
+# -------------------------------------------------------
+_figure_cache = SimulationCache(max_entries=64, max_bytes=None)
+
+
+def figure_cache() -> SimulationCache:
+    return _figure_cache
+
+
+def cached_figure(builder, *args, cache: SimulationCache = None, **kwargs):
+    """
+    builder(*args, **kwargs)로 만든 그래프를 입력 데이터의 내용 해시로 캐시.
+    데이터가 바뀌지 않았으면 Streamlit이 다시 실행되어도 그래프를 새로 만들지 않는다.
+    캐시는 프로세스 전체가 공유하므로 반환한 그래프는 수정하지 말고 st.plotly_chart에 그대로 넘길 것
+    (복사하면 적중할 때마다 그래프를 새로 만드는 만큼 든다. 고쳐 쓰려면 go.Figure(fig)로 복사).
+    dict(to_plotly_json)로 캐시하지 않는 이유: st.plotly_chart가 dict는 Figure로 다시 만들어 검증한다.
+    """
+    cache = _figure_cache if cache is None else cache
+    return cache.get_or_compute(
+        (builder.__module__, builder.__qualname__, args, kwargs),
+        lambda: builder(*args, **kwargs),
+    )